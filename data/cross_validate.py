@@ -4,7 +4,13 @@
 import json
 import pdfplumber
 import re
+import sys
 from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'scripts'))
+from competition_registry import CompetitionRegistry
+from skater_identity import spellings
 
 # Load the athlete data
 with open('/Users/garychen/clawd/us_junior_athletes_history.json', 'r') as f:
@@ -22,19 +28,9 @@ athletes_to_validate = [
     'brandon_liao'
 ]
 
-# Athlete name mapping for PDF matching
-name_map = {
-    'julius_kazanecki': ['KAZANECKI Julius', 'Julius KAZANECKI', 'KAZANECKI, Julius', 'J. KAZANECKI', 'Julius Kazanecki'],
-    'olimpia_kazanecka': ['KAZANECKA Olimpia', 'Olimpia KAZANECKA', 'KAZANECKA, Olimpia', 'O. KAZANECKA', 'Olimpia Kazanecka'],
-    'caleb_park': ['PARK Caleb', 'Caleb PARK', 'PARK, Caleb', 'C. PARK', 'Caleb Park'],
-    'justin_liu': ['LIU Justin', 'Justin LIU', 'LIU, Justin', 'J. LIU', 'Justin Liu'],
-    'sofia_koons': ['KOONS Sofia', 'Sofia KOONS', 'KOONS, Sofia', 'S. KOONS', 'Sofia Koons'],
-    'elizabeth_rhodehamel': ['RHODEHAMEL Elizabeth', 'Elizabeth RHODEHAMEL', 'RHODEHAMEL, Elizabeth', 'E. RHODEHAMEL', 'Elizabeth Rhodehamel'],
-    'noah_troppe': ['TROPPE Noah', 'Noah TROPPE', 'TROPPE, Noah', 'N. TROPPE', 'Noah Troppe'],
-    'brandon_liao': ['LIAO Brandon', 'Brandon LIAO', 'LIAO, Brandon', 'B. LIAO', 'Brandon Liao'],
-    'sean_shuai': ['SHUAI Sean', 'Sean SHUAI', 'SHUAI, Sean', 'S. SHUAI', 'Sean Shuai'],
-    'isabella_chen': ['CHEN Isabella', 'Isabella CHEN', 'CHEN, Isabella', 'I. CHEN', 'Isabella Chen']
-}
+# Athlete name spellings for PDF matching: 'julius_kazanecki' -> 'KAZANECKI Julius', ...
+name_map = {key: spellings(' '.join(part.title() for part in key.split('_')))
+            for key in athletes_to_validate + ['sean_shuai', 'isabella_chen']}
 
 def extract_pdf_text(pdf_path):
     """Extract all text from PDF with page numbers."""
@@ -83,6 +79,15 @@ def parse_result_line(line):
             }
     return None
 
+# The competition the PDF covers, by canonical ID; the ID has no year, so
+# the results are also checked for the 2024 edition
+registry = CompetitionRegistry()
+CHAMPIONSHIP_ID = registry.lookup('2024 US Short Track Championships')
+
+def is_championship_2024(result):
+    competition = result.get('competition', '')
+    return registry.lookup(competition) == CHAMPIONSHIP_ID and '2024' in competition
+
 # Main extraction
 pdf_path = '/Users/garychen/clawd/shorttrack-analytics/data/2024_US_ST_Championships.pdf'
 print("Extracting text from 2024 US Short Track Championship PDF...")
@@ -105,8 +110,7 @@ for athlete_key in athletes_to_validate + ['sean_shuai', 'isabella_chen']:
     names_to_search = name_map.get(athlete_key, [athlete_name])
     
     # Get JSON results for 2024 US Short Track Championship
-    json_results = [r for r in athlete_data.get('results', []) 
-                   if '2024 US Short Track Championship' in r.get('competition', '')]
+    json_results = [r for r in athlete_data.get('results', []) if is_championship_2024(r)]
     
     print(f"\n{'='*60}")
     print(f"Athlete: {athlete_name}")
@@ -5,14 +5,17 @@ Extracts race results from US Speed Skating PDF archives (2022-2026)
 """
 
 import json
-import os
 import re
-import tempfile
-import urllib.request
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
-import pdfplumber
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+import pdf_format
+import pdf_store
+import text_cache
 
 # Standard distances to include
 STANDARD_DISTANCES = ['500m', '1000m', '1500m', '3000m']
@@ -176,41 +179,34 @@ def dedupe_results(results):
     return deduped
 
 
-def download_pdf(url, temp_dir):
-    """Download PDF to temp directory."""
-    filename = os.path.join(temp_dir, 'temp.pdf')
-    try:
-        req = urllib.request.Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-        with urllib.request.urlopen(req, timeout=30) as response:
-            with open(filename, 'wb') as f:
-                f.write(response.read())
-        return filename
-    except Exception as e:
-        return None
-
-
 def parse_pdf(pdf_path):
-    """Parse a PDF and extract all results."""
+    """Parse a PDF and extract all results. Returns (results, format).
+    
+    Time Classification pages go to their parser in every format. The
+    detected format only picks the parser for the other pages: in Event
+    Time Results printouts every page is an EVT page, elsewhere only the
+    pages that say so are.
+    """
     all_results = []
+    fmt = None
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text() or ''
-                
-                if 'Time Classification' in text:
-                    results = parse_time_classification_page(text)
-                    all_results.extend(results)
-                elif 'Event Time Results' in text:
-                    results = parse_event_time_results_page(text)
-                    all_results.extend(results)
+        fmt = pdf_format.detect_format(pdf_path)
+        
+        for page in text_cache.iter_pages(pdf_path):
+            text = page['text']
+            
+            if 'Time Classification' in text:
+                all_results.extend(parse_time_classification_page(text))
+            elif fmt == pdf_format.EVENT_TIME_RESULTS or 'Event Time Results' in text:
+                all_results.extend(parse_event_time_results_page(text))
     except Exception as e:
         pass
     
     all_results = dedupe_results(all_results)
     all_results = [r for r in all_results if r['distance'] in STANDARD_DISTANCES]
     
-    return all_results
+    return all_results, fmt
 
 
 def main():
@@ -225,55 +221,59 @@ def main():
     all_competitions = []
     processed_seasons = set()
     failed = []
+    format_stats = pdf_format.new_stats()
     
     priority_seasons = ['2024-2025', '2023-2024', '2025-2026', '2022-2023']
     
-    with tempfile.TemporaryDirectory() as temp_dir:
-        for season_data in catalog['seasons']:
-            season = season_data['season']
+    for season_data in catalog['seasons']:
+        season = season_data['season']
+        
+        if season not in priority_seasons:
+            continue
             
-            if season not in priority_seasons:
+        processed_seasons.add(season)
+        print(f"\n=== Processing {season} ===", flush=True)
+        
+        for comp in season_data['competitions']:
+            if comp['type'] != 'short_track':
                 continue
-                
-            processed_seasons.add(season)
-            print(f"\n=== Processing {season} ===", flush=True)
             
-            for comp in season_data['competitions']:
-                if comp['type'] != 'short_track':
-                    continue
-                
-                comp_name = comp['name']
-                comp_date = comp.get('date')
-                pdf_url = comp['pdf_url']
-                
-                print(f"  {comp_name}...", end='', flush=True)
-                
-                pdf_path = download_pdf(pdf_url, temp_dir)
-                if not pdf_path:
-                    print(" [download failed]")
-                    failed.append({'name': comp_name, 'error': 'download'})
-                    continue
+            comp_name = comp['name']
+            comp_date = comp.get('date')
+            pdf_url = comp['pdf_url']
+            
+            print(f"  {comp_name}...", end='', flush=True)
+            
+            pdf_path = pdf_store.fetch_one(pdf_url, comp_name, comp_date, season)
+            if not pdf_path:
+                print(" [download failed]")
+                failed.append({'name': comp_name, 'error': 'download'})
+                continue
+            
+            started = time.perf_counter()
+            results, fmt = parse_pdf(pdf_path)
+            if fmt:
+                pdf_format.record(format_stats, fmt, time.perf_counter() - started, len(results))
+            
+            if results:
+                print(f" {len(results)} results")
                 
-                results = parse_pdf(pdf_path)
+                for r in results:
+                    r['competition'] = comp_name
+                    r['date'] = comp_date
+                    r['season'] = season
                 
-                if results:
-                    print(f" {len(results)} results")
-                    
-                    for r in results:
-                        r['competition'] = comp_name
-                        r['date'] = comp_date
-                        r['season'] = season
-                    
-                    all_results.extend(results)
-                    all_competitions.append({
-                        'name': comp_name,
-                        'date': comp_date,
-                        'season': season,
-                        'result_count': len(results)
-                    })
-                else:
-                    print(" [no results]")
-                    failed.append({'name': comp_name, 'error': 'parse'})
+                all_results.extend(results)
+                all_competitions.append({
+                    'name': comp_name,
+                    'date': comp_date,
+                    'season': season,
+                    'format': fmt,
+                    'result_count': len(results)
+                })
+            else:
+                print(" [no results]")
+                failed.append({'name': comp_name, 'error': 'parse', 'format': fmt})
     
     output = {
         'source': 'US Speed Skating PDF archives',
@@ -295,6 +295,7 @@ def main():
     print(f"Total results: {len(all_results)}")
     print(f"Failed: {len(failed)}")
     print(f"Output: {output_path}")
+    pdf_format.print_stats(format_stats)
 
 
 if __name__ == '__main__':
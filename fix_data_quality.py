@@ -6,10 +6,14 @@ Based on Phase 4 validation report
 
 import json
 import re
+import sys
 from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent / 'scripts'))
+import event_times
+
 DATA_FILE = Path("public/data/us_historical_results.json")
 
 def load_data():
@@ -20,29 +24,9 @@ def save_data(data):
     with open(DATA_FILE, 'w') as f:
         json.dump(data, f, indent=2)
 
-def parse_time_to_seconds(time_str):
-    """Convert time string to seconds"""
-    if not time_str:
-        return None
-    
-    time_str = str(time_str).strip()
-    
-    # Handle MM:SS.mmm format
-    if ':' in time_str:
-        parts = time_str.split(':')
-        if len(parts) == 2:
-            try:
-                minutes = int(parts[0])
-                seconds = float(parts[1])
-                return minutes * 60 + seconds
-            except ValueError:
-                return None
-    
-    # Handle SS.mmm format
-    try:
-        return float(time_str)
-    except ValueError:
-        return None
+def parse_seconds(results):
+    """Seconds of every result's time, None where there is no valid time"""
+    return event_times.parse_times_masked(r.get('time') for r in results).tolist()
 
 def fix_trailing_dash(results):
     """Fix skater names with trailing ' -' """
@@ -65,12 +49,7 @@ def fix_distance_classification(results):
     fixed_count = 0
     relay_count = 0
     
-    for result in results:
-        time_str = result.get('time')
-        if not time_str:
-            continue
-            
-        seconds = parse_time_to_seconds(time_str)
+    for result, seconds in zip(results, parse_seconds(results)):
         if seconds is None:
             continue
         
@@ -236,7 +215,7 @@ def analyze_issues(results):
         'missing_date': 0
     }
     
-    for i, result in enumerate(results):
+    for result, seconds in zip(results, parse_seconds(results)):
         skater = result.get('skater', '')
         if skater.endswith(' -'):
             issues['trailing_dash'].append(skater)
@@ -244,7 +223,6 @@ def analyze_issues(results):
         time_str = result.get('time')
         distance = result.get('distance', '')
         if time_str and distance == '500m':
-            seconds = parse_time_to_seconds(time_str)
             if seconds and seconds > 65:
                 issues['distance_mismatch'].append({
                     'skater': skater,
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Time line_classifier's compiled alternations against per-pattern searching.
+
+Every non-empty text line of the given PDFs (pages from the text_cache
+store, so extraction is not timed) is searched with each ordered pattern
+list twice: one re.search() per pattern in turn, as the parsers did, and
+once through ordered_search(). Both must give the same answer. The full
+classify_*_line() throughput per grammar is reported as well.
+
+Usage: python3 scripts/bench_line_classifier.py [PDF ...] [--repeat N]
+"""
+
+import argparse
+import re
+import time
+from pathlib import Path
+
+import line_classifier as lc
+import text_cache
+
+DEFAULT_PDFS = [Path(__file__).parent.parent / 'data' / 'test_2026.pdf']
+
+# (name, patterns, flags, prefilter) as the classifier compiles them
+PATTERN_LISTS = [
+    ('us distance', lc.US_DISTANCE_PATTERNS, 0, None),
+    ('us category', lc.US_CATEGORY_PATTERNS, re.IGNORECASE, r'Men|Ladies|Boys|Girls|U(?:nder)?\s*\d'),
+    ('batch distance', [p for p, _ in lc.BATCH_DISTANCE_PATTERNS], re.IGNORECASE, r'\d\s*m'),
+    ('batch category', [p for p, _ in lc.BATCH_CATEGORY_PATTERNS], re.IGNORECASE, r'Open|Masters|U\d'),
+    ('update category', lc.UPDATE_CATEGORY_PATTERNS, re.IGNORECASE, None),
+]
+
+GRAMMARS = [
+    ('parse_us_pdfs', lc.classify_us_line),
+    ('parse_uss_batch', lc.classify_batch_line),
+    ('update_uss_data', lc.classify_update_line),
+]
+
+
+def per_pattern(patterns: list[str], flags: int):
+    """The search the parsers used to do: each pattern in turn."""
+    def search(text: str):
+        for index, pattern in enumerate(patterns):
+            match = re.search(pattern, text, flags)
+            if match:
+                return index, match.group(1) if match.re.groups else None
+        return None
+    return search
+
+
+def load_lines(pdf_paths: list[Path]) -> list[str]:
+    lines = []
+    for pdf_path in pdf_paths:
+        for page in text_cache.read_pages(pdf_path):
+            lines.extend(line.strip() for line in page['text'].split('\n') if line.strip())
+    return lines
+
+
+def best_time(function, lines: list[str], repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for line in lines:
+            function(line)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the compiled line classifier')
+    parser.add_argument('pdfs', nargs='*', type=Path, default=DEFAULT_PDFS)
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='timing runs per version; the best one is reported')
+    args = parser.parse_args()
+
+    lines = load_lines(args.pdfs)
+    print(f"{len(lines)} lines from {len(args.pdfs)} PDFs, best of {args.repeat}\n")
+    print(f"  {'patterns':<16} {'per-pattern':>12} {'compiled':>10} {'speedup':>8}  answers")
+    for name, patterns, flags, prefilter in PATTERN_LISTS:
+        old, new = per_pattern(patterns, flags), lc.ordered_search(patterns, flags, prefilter)
+        mismatches = sum(1 for line in lines if old(line) != new(line))
+        status = 'identical' if not mismatches else f'{mismatches} MISMATCHES'
+        old_time, new_time = best_time(old, lines, args.repeat), best_time(new, lines, args.repeat)
+        print(f"  {name:<16} {old_time * 1000:>10.1f}ms {new_time * 1000:>8.1f}ms "
+              f"{old_time / new_time:>7.1f}x  {status}")
+
+    print(f"\n  {'grammar':<16} {'classify':>12}")
+    for name, classify in GRAMMARS:
+        print(f"  {name:<16} {best_time(classify, lines, args.repeat) * 1000:>10.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
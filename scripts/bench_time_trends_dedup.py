@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Time build_time_trends.dedupe_results on the real per-skater result lists.
+
+The per-skater, per-distance result lists come from load_uss_results()
+(USS PDFs if present, USS history and the STL season files in dist/data).
+Timings cover the dedup alone, for every list and for the heaviest
+skaters' lists. --scale N repeats each list N times with shifted dates, to
+see how the dedup grows with history length; it should stay linear.
+
+Usage: python3 scripts/bench_time_trends_dedup.py [--top 10] [--scale N] [--repeat N]
+"""
+
+import argparse
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import build_time_trends as btt
+
+
+def load_lists(scale: int) -> dict:
+    """(skater, distance) -> results, as build_time_trends() dedupes them."""
+    lists = defaultdict(list)
+    for skater, results in btt.load_uss_results().items():
+        for r in results:
+            lists[(skater, r['distance'])].append(r)
+    if scale > 1:
+        for key, results in lists.items():
+            scaled = list(results)
+            for k in range(1, scale):
+                shift = timedelta(days=400 * k)
+                for r in results:
+                    date = r['date'] and (datetime.fromisoformat(r['date']) + shift).isoformat()
+                    scaled.append({**r, 'date': date, 'competition': f"{r['competition']} ({k})"})
+            lists[key] = scaled
+    return lists
+
+
+def best_time(lists: list, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for results in lists:
+            btt.dedupe_results(results)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time the time trend dedup')
+    parser.add_argument('--top', type=int, default=10, help='heaviest lists to time separately')
+    parser.add_argument('--scale', type=int, default=1, help='repeat each history N times')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='timing runs; the best one is reported')
+    args = parser.parse_args()
+
+    lists = load_lists(args.scale)
+    heaviest = sorted(lists.values(), key=len, reverse=True)[:args.top]
+    print(f"{len(lists)} skater/distance lists, {sum(map(len, lists.values()))} results, "
+          f"largest {len(heaviest[0]) if heaviest else 0}\n")
+
+    for label, group in [('all', list(lists.values())), (f'top {args.top}', heaviest)]:
+        elapsed = best_time(group, args.repeat)
+        results = sum(map(len, group))
+        print(f"  {label:<10} {elapsed * 1000:>8.1f}ms  ({elapsed / max(results, 1) * 1e6:.2f} us/result)")
+
+
+if __name__ == '__main__':
+    main()
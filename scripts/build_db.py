@@ -8,6 +8,8 @@ import sqlite3
 import os
 from datetime import datetime
 
+import record_stream
+
 def main():
     base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     data_dir = os.path.join(base_dir, 'public/data')
@@ -62,9 +64,6 @@ def main():
     # Load data
     print("Loading data files...")
     
-    with open(os.path.join(data_dir, 'us_historical_results.json')) as f:
-        results_data = json.load(f)
-    
     with open(os.path.join(data_dir, 'skaters.json')) as f:
         skaters_data = json.load(f)
     
@@ -83,9 +82,10 @@ def main():
                 (skater_id_map[name], distance, time)
             )
     
-    # Insert results
+    # Insert results, streamed from the file one record at a time
     print("Inserting results...")
-    for result in results_data['results']:
+    results_path = os.path.join(data_dir, 'us_historical_results.json')
+    for result in record_stream.iter_records(results_path):
         skater_name = result['skater']
         if skater_name not in skater_id_map:
             continue
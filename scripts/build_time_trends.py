@@ -2,15 +2,32 @@
 """
 Build time trend data by merging USS results (primary) with STL personal bests (fallback).
 Outputs: dist/data/skater_time_trends.json
+
+With --incremental, only the skaters whose results or skaters.json entries
+changed since the last build are recomputed and patched into the output
+(the sources and per-skater rows of that build are kept in trend_state).
+
+With --shards, the trends are also written per hash bucket of skater ids
+with an index (trend_shards.py), so the app can load a single skater.
+
+Usage: python3 scripts/build_time_trends.py [--incremental] [--shards]
 """
 
+import argparse
 import json
 import os
 import re
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime
+from itertools import islice
 from typing import Optional
 
+import event_times
+import record_stream
+from skater_identity import name_key
+import trend_shards
+from trend_state import TrendState, fingerprint, state_path
+
 DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'dist', 'data')
 
 def parse_date(date_str: str) -> Optional[datetime]:
@@ -44,425 +61,374 @@ def parse_date(date_str: str) -> Optional[datetime]:
     
     return None
 
-def parse_time(time_str: str) -> Optional[float]:
-    """Parse time string to seconds"""
-    if not time_str:
-        return None
-    
-    time_str = time_str.strip()
-    
-    # Handle MM:SS.mmm format
-    if ':' in time_str:
-        parts = time_str.split(':')
-        try:
-            mins = float(parts[0])
-            secs = float(parts[1])
-            return mins * 60 + secs
-        except:
-            return None
-    
-    # Handle SS.mmm format
-    try:
-        return float(time_str)
-    except:
-        return None
+USS_PDF_PATH = os.path.expanduser('~/clawd/shorttrack-knowledge-base/processed_data/uss_all_results.json')
+STL_FILES = [
+    'scraped_us_results_s16.json',
+    'scraped_us_results_s17.json',
+    'scraped_us_results_s18.json',
+    'scraped_us_results_s19.json',
+    'scraped_us_results_s20.json',
+]
 
-def normalize_distance(distance: int) -> int:
-    """Map non-standard distances to standard event distances.
-    
-    Different rinks have different track lengths (107m, 111m, 100m).
-    STL stores actual distance skated, need to map to standard events.
-    Standard short track is 111.12m per lap.
-    """
-    if not distance:
-        return None
-    
-    # Standard distances and their common variations
-    # Being generous with ranges to catch different track sizes
-    mappings = {
-        # 222m (2 laps) - tracks from 100m to 115m
-        (200, 240): 222,
-        # 333m (3 laps)  
-        (300, 360): 333,
-        # 400m (special event, rare)
-        (390, 430): 500,  # Map 400m variants to 500m
-        # 500m (4.5 laps)
-        (450, 550): 500,
-        # 600m (special, rare) - map to 500m or 777m based on time validation later
-        (580, 620): 500,
-        # 666m (6 laps on 111m track) - map to 777m
-        (640, 700): 777,
-        # 777m (7 laps)
-        (740, 820): 777,
-        # 1000m (9 laps)
-        (900, 1100): 1000,
-        # 1500m (13.5 laps)
-        (1400, 1600): 1500,
-        # 2000m (rare) - could be misclassified 1500m
-        (1900, 2100): 1500,
-        # 3000m (27 laps)
-        (2800, 3200): 3000,
-    }
-    
-    for (low, high), standard in mappings.items():
-        if low <= distance <= high:
-            return standard
-    
-    # Return as-is if it's already a standard distance
-    if distance in [222, 333, 500, 777, 1000, 1500, 3000]:
-        return distance
-    
-    # Filter out clearly wrong distances (under 200m or over 4000m)
-    if distance < 200 or distance > 4000:
-        return None
-    
-    return None  # Don't keep unusual distances that don't map
-
-def is_valid_time_for_distance(time_secs: float, distance: int) -> bool:
-    """Check if time is plausible for the given distance.
-    
-    Filters out obvious data errors like 47s for 1000m.
-    Uses conservative bounds for youth skating (most skaters aren't elite).
-    """
-    if not time_secs or not distance:
-        return False
-    
-    # Minimum times set conservatively for youth skating
-    # (elite times are rare and often data errors at local meets)
-    # Maximum times for slow recreational skaters
-    bounds = {
-        222: (18, 90),      # 222m: 18s - 1.5min
-        333: (25, 120),     # 333m: 25s - 2min  
-        500: (38, 150),     # 500m: 38s - 2.5min
-        777: (60, 210),     # 777m: 60s - 3.5min
-        1000: (80, 300),    # 1000m: 1:20 - 5min (filter suspicious <1:20 times)
-        1500: (130, 420),   # 1500m: 2:10 - 7min
-        3000: (280, 720),   # 3000m: 4:40 - 12min
-    }
-    
-    if distance in bounds:
-        min_time, max_time = bounds[distance]
-        return min_time <= time_secs <= max_time
-    
-    # Unknown distance - accept if reasonable overall
-    return 25 <= time_secs <= 600
-
-def normalize_name(name: str) -> str:
-    """Normalize skater name for matching: 'CHEN Daniel USA-PSSP' -> 'chen daniel'"""
-    # Replace non-breaking spaces and normalize
-    name = name.replace('\xa0', ' ').replace('  ', ' ').strip().lower()
-    
-    # Remove club/country suffixes like "USA-PSSP", "USA-SCSC", "CAN-XXXXXX"
-    # Pattern: 3-letter country code followed by dash and club code
-    name = re.sub(r'\s+[a-z]{2,3}-[a-z0-9]+$', '', name, flags=re.IGNORECASE)
-    
-    # Remove standalone country codes at end
-    name = re.sub(r'\s+(usa|can|chn|kor|jpn|ned|ita|rus|gbr|ger|fra|aus)$', '', name, flags=re.IGNORECASE)
-    
-    # Remove leading numbers (e.g., "44CHEN Daniel" -> "chen daniel")  
-    name = re.sub(r'^\d+', '', name)
-    
-    # Remove trailing asterisks
-    name = re.sub(r'\*+$', '', name)
-    
-    # Clean up extra spaces
-    name = ' '.join(name.split())
-    
-    return name
-
-def load_uss_results() -> dict:
-    """Load all USS results from multiple sources, return dict keyed by normalized name.
-    
-    Data sources (in priority order):
-    1. uss_all_results.json - Parsed from USS PDFs (official times)
-    2. us_historical_results.json - Historical USS data (2017-2023)
-    3. scraped_us_results_s*.json - STL scraped data (fallback)
-    """
+def load_pdf_results(path: str) -> dict:
+    """uss_all_results.json (parsed from USS PDFs), as name key -> results"""
     results_by_skater = defaultdict(list)
-    
-    # 1. Load uss_all_results.json (from USS PDFs - highest priority)
-    # Path relative to clawd workspace
-    uss_pdf_path = os.path.expanduser('~/clawd/shorttrack-knowledge-base/processed_data/uss_all_results.json')
-    if os.path.exists(uss_pdf_path):
-        print(f"  Loading USS PDF results from {uss_pdf_path}")
-        with open(uss_pdf_path) as f:
-            data = json.load(f)
+    print(f"  Loading USS PDF results from {path}")
+    for records in record_stream.batched(record_stream.iter_records(path)):
+        # Parse and validate whole columns; PDF distances are exact ("500m" -> 500)
+        times_ms = event_times.parse_times_ms(r.get('time') for r in records)
+        distances = event_times.distance_meters(r.get('distance', '') for r in records)
+        valid = event_times.valid_times(times_ms, distances)
         
-        for result in data.get('results', []):
+        for result, ok, time_ms, distance in zip(records, valid.tolist(), times_ms.tolist(), distances.tolist()):
             name = result.get('skater', '')
-            time_str = result.get('time')
-            time_secs = parse_time(time_str)
-            distance_str = result.get('distance', '')
-            
-            # Parse distance (e.g., "500m" -> 500)
-            dist_match = re.search(r'(\d+)', distance_str)
-            distance = int(dist_match.group(1)) if dist_match else None
-            
-            if not name or not time_secs or not distance:
+            if not ok or not name:
                 continue
             
-            # Validate time is plausible for the distance (filter parsing errors)
-            if not is_valid_time_for_distance(time_secs, distance):
-                continue
-            
-            norm_name = normalize_name(name)
+            norm_name = name_key(name)
             result_date = parse_date(result.get('date', ''))
             
             results_by_skater[norm_name].append({
                 'distance': distance,
-                'time': time_secs,
-                'time_str': time_str,
+                'time': time_ms / 1000,
+                'time_str': result.get('time'),
                 'competition': result.get('competition', 'Unknown'),
                 'date': result_date.isoformat() if result_date else None,
                 'place': result.get('rank'),
                 'source': 'uss_pdf',
             })
-        print(f"    Loaded {sum(len(v) for v in results_by_skater.values())} results")
-    
-    # 2. Load us_historical_results.json (older seasons)
-    hist_path = os.path.join(DATA_DIR, 'us_historical_results.json')
-    if os.path.exists(hist_path):
-        print(f"  Loading historical results from {hist_path}")
-        with open(hist_path) as f:
-            data = json.load(f)
+    print(f"    Loaded {sum(len(v) for v in results_by_skater.values())} results")
+    return results_by_skater
+
+def load_hist_results(path: str) -> dict:
+    """us_historical_results.json (older seasons), as name key -> results"""
+    results_by_skater = defaultdict(list)
+    print(f"  Loading historical results from {path}")
+    hist_count = 0
+    for records in record_stream.batched(record_stream.iter_records(path)):
+        times_ms = event_times.parse_times_ms(r.get('time') for r in records)
+        distances = event_times.normalize_distances(
+            event_times.distance_meters(r.get('distance', '') for r in records))
+        valid = event_times.valid_times(times_ms, distances)
         
-        hist_count = 0
-        for result in data.get('results', []):
+        for result, ok, time_ms, distance in zip(records, valid.tolist(), times_ms.tolist(), distances.tolist()):
             name = result.get('skater', '')
-            time_str = result.get('time')
-            if not time_str:
-                continue
-            time_secs = parse_time(time_str)
-            distance_str = result.get('distance', '')
-            
-            dist_match = re.search(r'(\d+)', distance_str)
-            raw_distance = int(dist_match.group(1)) if dist_match else None
-            distance = normalize_distance(raw_distance)
-            
-            if not name or not time_secs or not distance:
+            if not ok or not name:
                 continue
             
-            # Validate time is plausible for the distance
-            if not is_valid_time_for_distance(time_secs, distance):
-                continue
-            
-            norm_name = normalize_name(name)
+            norm_name = name_key(name)
             result_date = parse_date(result.get('date', ''))
             
             results_by_skater[norm_name].append({
                 'distance': distance,
-                'time': time_secs,
-                'time_str': time_str,
+                'time': time_ms / 1000,
+                'time_str': result.get('time'),
                 'competition': result.get('competition', 'Unknown'),
                 'date': result_date.isoformat() if result_date else None,
                 'place': result.get('place'),
                 'source': 'uss_hist',
             })
             hist_count += 1
-        print(f"    Loaded {hist_count} historical results")
-    
-    # 3. Load STL scraped results (fallback for coverage)
-    stl_files = [
-        'scraped_us_results_s16.json',
-        'scraped_us_results_s17.json', 
-        'scraped_us_results_s18.json',
-        'scraped_us_results_s19.json',
-        'scraped_us_results_s20.json',
-    ]
-    
+    print(f"    Loaded {hist_count} historical results")
+    return results_by_skater
+
+def load_stl_results(path: str) -> dict:
+    """One scraped_us_results_s*.json season file (STL), as name key -> results"""
+    results_by_skater = defaultdict(list)
+    comp_dates = {}  # Competition name -> ISO date
     stl_count = 0
-    for filename in stl_files:
-        filepath = os.path.join(DATA_DIR, filename)
-        if not os.path.exists(filepath):
-            continue
-            
-        with open(filepath) as f:
-            data = json.load(f)
+    for rows in record_stream.batched(record_stream.iter_event_results(path)):
+        # One row per result, with its competition and event distance
+        times_ms = event_times.parse_times_ms(result.get('time') for _, _, result in rows)
+        distances = event_times.normalize_distances(
+            event_times.distance_meters(event.get('distance') for _, event, _ in rows))
+        valid = event_times.valid_times(times_ms, distances)
         
-        for comp in data.get('competitions', []):
+        for (comp, _, result), ok, time_ms, distance in zip(
+                rows, valid.tolist(), times_ms.tolist(), distances.tolist()):
+            name = result.get('name', '')
+            if not ok or not name:
+                continue
+            
             comp_name = comp.get('name', 'Unknown')
-            comp_date = parse_date(comp_name)
+            if comp_name not in comp_dates:
+                comp_date = parse_date(comp_name)
+                comp_dates[comp_name] = comp_date.isoformat() if comp_date else None
             
-            for event in comp.get('events', []):
-                raw_distance = event.get('distance')
-                distance = normalize_distance(raw_distance)
-                if not distance:
-                    continue
-                
-                for result in event.get('results', []):
-                    name = result.get('name', '')
-                    time_str = result.get('time')
-                    time_secs = parse_time(time_str)
-                    
-                    if not name or not time_secs:
-                        continue
-                    
-                    # Validate time is plausible for the distance
-                    if not is_valid_time_for_distance(time_secs, distance):
-                        continue
-                    
-                    norm_name = normalize_name(name)
-                    results_by_skater[norm_name].append({
-                        'distance': distance,
-                        'time': time_secs,
-                        'time_str': time_str,
-                        'competition': comp_name,
-                        'date': comp_date.isoformat() if comp_date else None,
-                        'place': result.get('place'),
-                        'source': 'stl',
-                    })
-                    stl_count += 1
-    
-    print(f"    Loaded {stl_count} STL results")
+            norm_name = name_key(name)
+            results_by_skater[norm_name].append({
+                'distance': distance,
+                'time': time_ms / 1000,
+                'time_str': result.get('time'),
+                'competition': comp_name,
+                'date': comp_dates[comp_name],
+                'place': result.get('place'),
+                'source': 'stl',
+            })
+            stl_count += 1
+    print(f"    Loaded {stl_count} STL results from {os.path.basename(path)}")
+    return results_by_skater
+
+def result_sources() -> list:
+    """(name, path, loader) of every results source, in priority order.
+    
+    1. uss_all_results.json - Parsed from USS PDFs (official times)
+    2. us_historical_results.json - Historical USS data (2017-2023)
+    3. scraped_us_results_s*.json - STL scraped data (fallback)
+    """
+    sources = [
+        ('uss_pdf', USS_PDF_PATH, load_pdf_results),
+        ('uss_hist', os.path.join(DATA_DIR, 'us_historical_results.json'), load_hist_results),
+    ]
+    sources.extend((filename, os.path.join(DATA_DIR, filename), load_stl_results) for filename in STL_FILES)
+    return sources
+
+def load_source(path: str, loader) -> dict:
+    """A source's results by name key, empty if the file does not exist."""
+    if not os.path.exists(path):
+        return {}
+    return loader(path)
+
+def load_uss_results() -> dict:
+    """Load all USS results from multiple sources, return dict keyed by skater_identity.name_key.
     
+    Each skater's results are in source order (see result_sources()).
+    """
+    results_by_skater = defaultdict(list)
+    for _, path, loader in result_sources():
+        for norm_name, results in load_source(path, loader).items():
+            results_by_skater[norm_name].extend(results)
     return results_by_skater
 
+def _day_number(date: str) -> Optional[int]:
+    try:
+        return datetime.fromisoformat(date).toordinal()
+    except (TypeError, ValueError):
+        return None
+
+def dedupe_results(results: list) -> list:
+    """Keep only the best time per competition, for one skater and distance.
+    
+    Results are sorted by date, then by time (fastest first). A dated result
+    within 2 days of a result already kept is the same competition: the
+    faster of the two is kept, in the earlier one's place. Undated results
+    (sorted last) are matched on the first 30 characters of the competition
+    name instead, against dated and undated results alike; a faster one
+    replaces its match and moves to the end.
+    
+    One sort and a sweep: dates are parsed once, and only the kept results
+    of the last 2 days are candidates (dates only grow along the sweep, so
+    an older result can never match again).
+    """
+    results = sorted(results, key=lambda x: (x['date'] or '9999', x['time']))
+    
+    kept = []
+    window = []  # Indexes into kept of dated results within 2 days, in order
+    day_of = {}  # Index into kept -> day number of that result's date
+    first_undated = len(results)
+    for n, r in enumerate(results):
+        if not r['date']:
+            first_undated = n
+            break
+        day = _day_number(r['date'])
+        if day is not None:
+            window = [i for i in window if day - day_of[i] <= 2]
+            if window:
+                i = window[0]
+                if r['time'] < kept[i]['time']:
+                    kept[i] = r
+                    day_of[i] = day
+                continue
+            day_of[len(kept)] = day
+            window.append(len(kept))
+        kept.append(r)
+    
+    if first_undated == len(results):
+        return kept
+    
+    # Undated: the first kept result (in list order) with the same prefix.
+    # A replacement moves to the end, so track order with a dict of
+    # sequence number -> result and, per prefix, that prefix's sequence
+    # numbers in order.
+    ordered = dict(enumerate(kept))
+    by_prefix = defaultdict(deque)
+    for seq, r in ordered.items():
+        by_prefix[r.get('competition', '')[:30]].append(seq)
+    seq = len(ordered)
+    for r in results[first_undated:]:
+        if r['date']:
+            # An unparseable date sorting after '9999': matches nothing
+            ordered[seq] = r
+            seq += 1
+            continue
+        prefix = by_prefix[r.get('competition', '')[:30]]
+        if prefix:
+            first = prefix[0]
+            if r['time'] < ordered[first]['time']:
+                del ordered[first]
+                prefix.popleft()
+                ordered[seq] = r
+                prefix.append(seq)
+                seq += 1
+            continue
+        ordered[seq] = r
+        prefix.append(seq)
+        seq += 1
+    return list(ordered.values())
+
+class CompetitionOverlap:
+    """Which of a fixed set of competition names overlap a given name.
+    
+    Two names overlap when one is a substring of the other. The set is every
+    competition in the USS results; the names overlapping a PB competition
+    are worked out once per distinct name, so checking a PB against one
+    skater's competitions is a set intersection instead of a substring scan.
+    """
+    
+    def __init__(self, names):
+        self.names = set(names)
+        self._overlapping = {}
+    
+    def overlapping(self, name: str) -> frozenset:
+        found = self._overlapping.get(name)
+        if found is None:
+            found = frozenset(c for c in self.names if name in c or c in name)
+            self._overlapping[name] = found
+        return found
+    
+    def any_overlap(self, name: str, competitions: set) -> bool:
+        """any(name in c or c in name for c in competitions), for competitions within the set."""
+        return not self.overlapping(name).isdisjoint(competitions)
+
 def load_skaters() -> list:
     """Load skaters.json"""
     with open(os.path.join(DATA_DIR, 'skaters.json')) as f:
         return json.load(f)
 
-def build_time_trends():
-    """Build time trend data for all skaters"""
+def group_skaters(skaters: list) -> tuple:
+    """(id -> entries, id -> name keys) of skaters.json, in file order"""
+    entries_by_id = {}
+    keys_by_id = defaultdict(set)
+    for skater in skaters:
+        skater_id = skater.get('id')
+        entries_by_id.setdefault(skater_id, []).append(skater)
+        keys_by_id[skater_id].add(name_key(skater.get('name', '')))
+    return entries_by_id, keys_by_id
+
+def valid_pbs(skaters: list) -> list:
+    """Per skater, the STL personal bests with a time plausible for the distance: [(pb, ms, distance)]
+    
+    The PBs of all the skaters are parsed and validated as one column.
+    """
+    pbs = [(skater.get('profile') or {}).get('personal_bests_detail', []) or [] for skater in skaters]
+    column = [pb for skater_pbs in pbs for pb in skater_pbs]
+    times_ms = event_times.parse_times_ms(pb.get('time') for pb in column)
+    distances = event_times.normalize_distances(event_times.distance_meters(pb.get('distance') for pb in column))
+    valid = event_times.valid_times(times_ms, distances)
+    
+    parsed = iter(zip(column, valid.tolist(), times_ms.tolist(), distances.tolist()))
+    return [[(pb, time_ms, distance) for pb, ok, time_ms, distance in islice(parsed, len(skater_pbs)) if ok]
+            for skater_pbs in pbs]
+
+def skater_trends(uss_rows: list, pbs: list, comp_overlap: CompetitionOverlap) -> dict:
+    """One skater's results by distance: their USS results plus the STL PBs (from valid_pbs()) they do not cover.
+    
+    comp_overlap must contain at least the competitions of uss_rows.
+    """
+    # 1. USS results (primary source)
+    all_results = list(uss_rows)
+    
+    # 2. STL personal_bests as fallback (only add if no USS data for that competition)
+    uss_comps = {r['competition'] for r in all_results}
+    
+    for pb, time_ms, distance in pbs:
+        # Check if we already have USS data for this competition
+        pb_comp = pb.get('competition', '')
+        if comp_overlap.any_overlap(pb_comp, uss_comps):
+            continue  # Skip, we have USS data
+        
+        pb_date = parse_date(pb.get('date'))
+        all_results.append({
+            'distance': distance,
+            'time': time_ms / 1000,
+            'time_str': pb.get('time'),
+            'competition': pb_comp,
+            'date': pb_date.isoformat() if pb_date else None,
+            'place': None,
+            'source': 'stl',
+        })
+    
+    # Organize by distance and sort by date
+    by_distance = defaultdict(list)
+    for r in all_results:
+        by_distance[r['distance']].append(r)
+    
+    # Keep only the BEST time per competition (per date within 2 days)
+    for dist in by_distance:
+        by_distance[dist] = dedupe_results(by_distance[dist])
+    return dict(by_distance)
+
+def save_trends(time_trends: dict, output_path: str, shards: bool = False):
+    output = {
+        'generated': datetime.now().isoformat(),
+        'total_skaters': len(time_trends),
+        'sources': ['uss', 'stl'],
+        'trends': time_trends,
+    }
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(output, f)
+    os.replace(tmp_path, output_path)
+    print(f"  Saved to {output_path}")
+    if shards:
+        save_shards(time_trends, output_path)
+    elif trend_shards.remove_shards(trend_shards.shard_dir(output_path)):
+        print("  Removed the shards of an earlier build")
+
+def save_shards(time_trends: dict, output_path: str):
+    directory = trend_shards.shard_dir(output_path)
+    counts = trend_shards.write_shards(time_trends, directory)
+    print(f"  Shards in {directory}: {counts['written']} written, {counts['unchanged']} unchanged, "
+          f"{counts['removed']} removed")
+
+def build_all_trends(state: TrendState, output_path: str, shards: bool = False):
+    """Build time trend data for all skaters, and record the state it was built from"""
+    state.reset()
     print("Loading USS results...")
-    uss_results = load_uss_results()
+    uss_results = defaultdict(list)
+    for position, (source, path, loader) in enumerate(result_sources()):
+        stat = fingerprint(path)
+        results = load_source(path, loader)
+        state.set_file(source, position, stat)
+        state.replace_results(source, results)
+        for norm_name, rows in results.items():
+            uss_results[norm_name].extend(rows)
     print(f"  Loaded results for {len(uss_results)} unique skaters")
+    comp_overlap = CompetitionOverlap(r['competition'] for results in uss_results.values() for r in results)
     
     print("Loading skaters...")
+    stat = fingerprint(os.path.join(DATA_DIR, 'skaters.json'))
     skaters = load_skaters()
+    state.set_file('skaters.json', -1, stat)
+    state.replace_skaters(*group_skaters(skaters))
     print(f"  Loaded {len(skaters)} skaters")
     
     time_trends = {}
     matched = 0
     
-    for skater in skaters:
-        skater_id = skater.get('id')
-        name = skater.get('name', '')
-        norm_name = normalize_name(name)
-        
-        # Collect all results for this skater
-        all_results = []
-        
-        # 1. USS results (primary source)
+    for skater, pbs in zip(skaters, valid_pbs(skaters)):
+        norm_name = name_key(skater.get('name', ''))
         if norm_name in uss_results:
-            all_results.extend(uss_results[norm_name])
             matched += 1
-        
-        # 2. Also try reversed name format (LAST FIRST vs FIRST LAST)
-        name_parts = norm_name.split()
-        if len(name_parts) >= 2:
-            reversed_name = f"{name_parts[-1]} {' '.join(name_parts[:-1])}"
-            if reversed_name in uss_results and reversed_name != norm_name:
-                all_results.extend(uss_results[reversed_name])
-        
-        # 3. STL personal_bests as fallback (only add if no USS data for that competition)
-        profile = skater.get('profile') or {}
-        stl_pbs = profile.get('personal_bests_detail', []) or []
-        uss_comps = {r['competition'] for r in all_results}
-        
-        for pb in stl_pbs:
-            # Check if we already have USS data for this competition
-            pb_comp = pb.get('competition', '')
-            if any(pb_comp in c or c in pb_comp for c in uss_comps):
-                continue  # Skip, we have USS data
-            
-            time_secs = parse_time(pb.get('time'))
-            raw_distance = pb.get('distance')
-            distance = normalize_distance(raw_distance)
-            
-            # Validate time is plausible for the distance
-            if not time_secs or not distance:
-                continue
-            if not is_valid_time_for_distance(time_secs, distance):
-                continue
-                
-            pb_date = parse_date(pb.get('date'))
-            all_results.append({
-                'distance': distance,
-                'time': time_secs,
-                'time_str': pb.get('time'),
-                'competition': pb_comp,
-                'date': pb_date.isoformat() if pb_date else None,
-                'place': None,
-                'source': 'stl',
-            })
-        
-        if all_results:
-            # Organize by distance and sort by date
-            by_distance = defaultdict(list)
-            for r in all_results:
-                dist = r['distance']
-                by_distance[dist].append(r)
-            
-            # Sort and deduplicate each distance
-            # Keep only the BEST time per competition (per date within 2 days)
-            source_priority = {'uss_pdf': 0, 'uss_hist': 1, 'stl': 2}
-            
-            for dist in by_distance:
-                # Sort by date, then by time (fastest first)
-                by_distance[dist].sort(key=lambda x: (x['date'] or '9999', x['time']))
-                
-                # Keep only best time per competition (group by date within 2 days)
-                deduped = []
-                
-                for r in by_distance[dist]:
-                    if not r['date']:
-                        # No date - check if same competition name exists
-                        dominated = False
-                        for existing in deduped:
-                            if existing.get('competition', '')[:30] == r.get('competition', '')[:30]:
-                                # Same competition, keep faster time
-                                if r['time'] < existing['time']:
-                                    deduped.remove(existing)
-                                    deduped.append(r)
-                                dominated = True
-                                break
-                        if not dominated:
-                            deduped.append(r)
-                        continue
-                    
-                    # Check if we already have a result for this competition (within 2 days)
-                    dominated = False
-                    for i, existing in enumerate(deduped):
-                        if not existing['date']:
-                            continue
-                        try:
-                            r_date = datetime.fromisoformat(r['date'])
-                            e_date = datetime.fromisoformat(existing['date'])
-                            diff = abs((r_date - e_date).days)
-                            # Same competition if within 2 days
-                            if diff <= 2:
-                                # Keep the faster time
-                                if r['time'] < existing['time']:
-                                    deduped[i] = r
-                                dominated = True
-                                break
-                        except:
-                            pass
-                    
-                    if not dominated:
-                        deduped.append(r)
-                
-                by_distance[dist] = deduped
-            
-            time_trends[skater_id] = dict(by_distance)
+        trends = skater_trends(uss_results.get(norm_name, []), pbs, comp_overlap)
+        if trends:
+            time_trends[skater.get('id')] = trends
     
     print(f"  Matched {matched} skaters to USS results")
     print(f"  Generated time trends for {len(time_trends)} skaters")
     
-    # Save output
-    output = {
-        'generated': datetime.now().isoformat(),
-        'total_skaters': len(time_trends),
-        'sources': ['uss', 'stl'],
-        'trends': time_trends,
-    }
-    
-    output_path = os.path.join(DATA_DIR, 'skater_time_trends.json')
-    with open(output_path, 'w') as f:
-        json.dump(output, f)
-    
-    print(f"  Saved to {output_path}")
+    save_trends(time_trends, output_path, shards)
+    state.commit(output_path)
     
     # Print sample for Daniel Chen
     daniel_id = 'daniel-chen-usa'
@@ -471,5 +437,87 @@ def build_time_trends():
         for r in time_trends[daniel_id].get(500, []):
             print(f"  {r['date']} | {r['time_str']} | {r['competition'][:40]} | {r['source']}")
 
+def update_trends(state: TrendState, output_path: str, shards: bool = False):
+    """Recompute only the skaters whose results or skaters.json entries changed since the last build"""
+    print("Checking sources...")
+    dirty_keys = set()
+    for position, (source, path, loader) in enumerate(result_sources()):
+        stored = state.file(source)
+        stat = fingerprint(path, stored)
+        if stat == stored:
+            continue
+        changed = state.replace_results(source, load_source(path, loader))
+        state.set_file(source, position, stat)
+        print(f"  {source}: {len(changed)} skaters with new or removed results")
+        dirty_keys |= changed
+    
+    dirty_ids = set()
+    skaters_path = os.path.join(DATA_DIR, 'skaters.json')
+    stored = state.file('skaters.json')
+    stat = fingerprint(skaters_path, stored)
+    if stat != stored:
+        dirty_ids = state.replace_skaters(*group_skaters(load_skaters()))
+        state.set_file('skaters.json', -1, stat)
+        print(f"  skaters.json: {len(dirty_ids)} changed skaters")
+    dirty_ids |= state.ids_for_keys(dirty_keys)
+    
+    if not dirty_ids:
+        state.commit(output_path)
+        print("Time trends are up to date")
+        if shards and trend_shards.load_index(trend_shards.shard_dir(output_path)) is None:
+            with open(output_path) as f:
+                save_shards(json.load(f)['trends'], output_path)
+        return
+    
+    print(f"Rebuilding time trends for {len(dirty_ids)} skaters...")
+    entries = {skater_id: state.skater_entries(skater_id) or [] for skater_id in dirty_ids}
+    uss_results = {}
+    for skaters in entries.values():
+        for skater in skaters:
+            norm_name = name_key(skater.get('name', ''))
+            if norm_name not in uss_results:
+                uss_results[norm_name] = state.rows(norm_name)
+    # Every competition a dirty skater has is in here, which is all skater_trends() needs
+    comp_overlap = CompetitionOverlap(r['competition'] for results in uss_results.values() for r in results)
+    
+    with open(output_path) as f:
+        time_trends = json.load(f)['trends']
+    for skater_id, skaters in entries.items():
+        time_trends.pop(skater_id, None)
+        for skater, pbs in zip(skaters, valid_pbs(skaters)):
+            trends = skater_trends(uss_results[name_key(skater.get('name', ''))], pbs, comp_overlap)
+            if trends:
+                time_trends[skater_id] = trends
+    # Same order as a full build: skaters.json order
+    time_trends = {skater_id: time_trends[skater_id] for skater_id in state.skater_order()
+                   if skater_id in time_trends}
+    print(f"  Time trends for {len(time_trends)} skaters")
+    
+    save_trends(time_trends, output_path, shards)
+    state.commit(output_path)
+
+def build_time_trends(incremental: bool = False, shards: bool = False):
+    """Build time trend data, for all skaters or (incremental) only for those whose data changed"""
+    output_path = os.path.join(DATA_DIR, 'skater_time_trends.json')
+    state = TrendState(state_path(output_path))
+    try:
+        if incremental and state.is_current(output_path):
+            update_trends(state, output_path, shards)
+        else:
+            if incremental:
+                print("No state from a previous build of this output, building everything")
+            build_all_trends(state, output_path, shards)
+    finally:
+        state.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Build skater_time_trends.json')
+    parser.add_argument('--incremental', action='store_true',
+                        help='recompute only skaters whose results changed since the last build')
+    parser.add_argument('--shards', action='store_true',
+                        help='also write per-bucket shards and an index for the app')
+    args = parser.parse_args()
+    build_time_trends(incremental=args.incremental, shards=args.shards)
+
 if __name__ == '__main__':
-    build_time_trends()
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Columnar encoding of the result and trend JSON files.
+
+Row records ({'skater', 'competition', 'date', ...} per result) become one
+array per field. Each column is stored in the most compact of three forms:
+
+    {'values': [...]}                             as is (times, places)
+    {'table': ['Senior', ...], 'codes': [0, ...]} repeated strings (competition,
+                                                  source, ...), -1 for null
+    {'base': '2017-10-15', 'suffix': '',          ISO dates as day offsets
+     'days': [0, 0, 7, ...]}                      from the earliest, null for null
+
+A field that some records do not have also lists those rows in 'absent',
+so decoding gives back exactly the records that were encoded.
+
+skater_time_trends.json nests its entries by skater and distance; the
+nesting is kept as three group columns (skater index, distance key,
+entry count) over the flattened entries. Other top-level keys are kept
+in 'meta'.
+
+    python3 scripts/columnar.py [FILE ...]
+
+writes FILE's columnar form next to it as <name>.columnar.json, checks
+that it decodes back to FILE's contents, and reports sizes and parse times.
+"""
+
+import argparse
+import json
+import time
+from datetime import date
+from pathlib import Path
+
+FORMAT_VERSION = 1
+DATA_DIR = Path(__file__).parent.parent / 'dist' / 'data'
+DEFAULT_FILES = [DATA_DIR / 'skater_time_trends.json', DATA_DIR / 'us_historical_results.json']
+
+# Dictionary-encode a string column if it has at most this share of distinct values
+MAX_DISTINCT_SHARE = 0.5
+DATE_SUFFIXES = ['', 'T00:00:00']
+
+
+def _day_column(values: list):
+    """The 'days' form of a column of ISO dates (all with one suffix), None if it is not one."""
+    dates = [v for v in values if v is not None]
+    if not dates or not all(isinstance(v, str) for v in dates):
+        return None
+    for suffix in DATE_SUFFIXES:
+        days = []
+        for value in values:
+            if value is None:
+                days.append(None)
+                continue
+            try:
+                day = date.fromisoformat(value[:10])
+            except ValueError:
+                return None
+            if day.isoformat() + suffix != value:
+                break
+            days.append(day.toordinal())
+        else:
+            base = min(d for d in days if d is not None)
+            return {'base': date.fromordinal(base).isoformat(), 'suffix': suffix,
+                    'days': [None if d is None else d - base for d in days]}
+    return None
+
+
+def _dict_column(values: list):
+    """The 'table' form of a column of strings (and nulls), None if it is not worth it."""
+    if not all(v is None or isinstance(v, str) for v in values):
+        return None
+    table = {}
+    for value in values:
+        if value is not None and value not in table:
+            table[value] = len(table)
+    if len(table) > MAX_DISTINCT_SHARE * len(values):
+        return None
+    return {'table': list(table), 'codes': [-1 if v is None else table[v] for v in values]}
+
+
+def encode_column(values: list) -> dict:
+    return _day_column(values) or _dict_column(values) or {'values': values}
+
+
+def decode_column(column: dict) -> list:
+    if 'days' in column:
+        base = date.fromisoformat(column['base']).toordinal()
+        suffix = column['suffix']
+        return [None if d is None else date.fromordinal(base + d).isoformat() + suffix
+                for d in column['days']]
+    if 'codes' in column:
+        table = column['table']
+        return [None if code < 0 else table[code] for code in column['codes']]
+    return column['values']
+
+
+def encode_records(records: list) -> dict:
+    """Row records -> {'n', 'columns': {field: column}}, fields in first-seen order."""
+    fields = {}
+    for record in records:
+        for field in record:
+            fields.setdefault(field, None)
+    columns = {}
+    for field in fields:
+        column = encode_column([record.get(field) for record in records])
+        absent = [i for i, record in enumerate(records) if field not in record]
+        if absent:
+            column['absent'] = absent
+        columns[field] = column
+    return {'n': len(records), 'columns': columns}
+
+
+def decode_records(encoded: dict) -> list:
+    records = [{} for _ in range(encoded['n'])]
+    for field, column in encoded['columns'].items():
+        absent = set(column.get('absent', ()))
+        for i, value in enumerate(decode_column(column)):
+            if i not in absent:
+                records[i][field] = value
+    return records
+
+
+def encode_trends(trends: dict) -> dict:
+    """skater id -> distance -> entries, as flattened entry columns plus group columns."""
+    entries = []
+    groups = {'skater': [], 'distance': [], 'count': []}
+    for n, (skater_id, by_distance) in enumerate(trends.items()):
+        for distance, distance_entries in by_distance.items():
+            groups['skater'].append(n)
+            groups['distance'].append(distance)
+            groups['count'].append(len(distance_entries))
+            entries.extend(distance_entries)
+    encoded = encode_records(entries)
+    encoded['skaters'] = list(trends)
+    encoded['groups'] = {
+        'skater': groups['skater'],
+        'distance': encode_column(groups['distance']),
+        'count': groups['count'],
+    }
+    return encoded
+
+
+def decode_trends(encoded: dict) -> dict:
+    entries = decode_records(encoded)
+    trends = {skater_id: {} for skater_id in encoded['skaters']}
+    groups = encoded['groups']
+    start = 0
+    for skater, distance, count in zip(groups['skater'], decode_column(groups['distance']), groups['count']):
+        trends[encoded['skaters'][skater]][distance] = entries[start:start + count]
+        start += count
+    return trends
+
+
+def encode(doc: dict) -> dict:
+    """A trends file ({'trends': ...}) or results file ({'results': [...]}) in columnar form."""
+    if 'trends' in doc:
+        kind, body = 'trends', encode_trends(doc['trends'])
+    elif 'results' in doc:
+        kind, body = 'results', encode_records(doc['results'])
+    else:
+        raise ValueError("expected a 'trends' or 'results' document")
+    meta = {key: value for key, value in doc.items() if key != kind}
+    return {'format': 'columnar', 'version': FORMAT_VERSION, 'kind': kind, 'meta': meta, **body}
+
+
+def decode(encoded: dict) -> dict:
+    """The document encode() was given (top-level keys in their original order, data last)."""
+    if encoded.get('format') != 'columnar' or encoded.get('version') != FORMAT_VERSION:
+        raise ValueError('not a columnar document of this version')
+    kind = encoded['kind']
+    data = decode_trends(encoded) if kind == 'trends' else decode_records(encoded)
+    return {**encoded['meta'], kind: data}
+
+
+def columnar_path(path: Path) -> Path:
+    """'us_historical_results.json' -> 'us_historical_results.columnar.json'"""
+    return path.with_suffix('.columnar.json')
+
+
+def _parse_time(text: str, repeat: int = 3) -> float:
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        json.loads(text)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def export(path: Path) -> Path:
+    """Write path's columnar form next to it, after checking it decodes back to path's contents."""
+    text = path.read_text()
+    doc = json.loads(text)
+    encoded_text = json.dumps(encode(doc), separators=(',', ':'))
+    if decode(json.loads(encoded_text)) != doc:
+        raise SystemExit(f"{path.name}: columnar form does not decode to the original")
+    out_path = columnar_path(path)
+    out_path.write_text(encoded_text)
+
+    size, encoded_size = len(text.encode('utf-8')), len(encoded_text.encode('utf-8'))
+    parse, encoded_parse = _parse_time(text), _parse_time(encoded_text)
+    print(f"{path.name}: {size / 1024:.0f} KB -> {out_path.name}: {encoded_size / 1024:.0f} KB "
+          f"({size / encoded_size:.1f}x smaller), json.loads {parse * 1000:.0f} ms -> "
+          f"{encoded_parse * 1000:.0f} ms; round trip OK")
+    return out_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export result/trend JSON in columnar form')
+    parser.add_argument('files', nargs='*', type=Path, default=DEFAULT_FILES,
+                        help='trend or result files (default: the dist/data trend and history files)')
+    args = parser.parse_args()
+
+    for path in args.files:
+        export(path)
+
+
+if __name__ == '__main__':
+    main()
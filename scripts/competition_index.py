@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Inverted keyword index for matching competition names across sources.
+
+Names are reduced to keyword sets (venue/series identifiers and the year),
+and the index maps each keyword to the competitions that have it. A lookup
+only touches the competitions sharing at least one keyword with the query,
+instead of comparing against every name:
+
+    index = KeywordIndex()
+    for doc in pdf_store.documents():
+        index.add(doc['filename'], Path(doc['filename']).stem)
+    index.candidates('Buffalo Championships 2024', k=3)
+    # -> [(3, 'Buffalo ST Championships ... 2024.pdf'), ...]
+"""
+
+import heapq
+import re
+from collections import Counter
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Hashable, Optional
+
+KEYWORD_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), keyword) for pattern, keyword in [
+        (r'great lakes', 'great_lakes'),
+        (r'buffalo', 'buffalo'),
+        (r'chicago|silver skate', 'silver_skates'),
+        (r'bay\s*state', 'baystate'),
+        (r'heartland', 'heartland'),
+        (r'nest', 'nest'),
+        (r'saratoga', 'saratoga'),
+        (r'park ridge', 'park_ridge'),
+        (r'franklin park|barrel buster', 'barrel_buster'),
+        (r'land of lincoln', 'land_of_lincoln'),
+        (r'presidential', 'presidential'),
+        (r'gateway', 'gateway'),
+        (r'age group|agn', 'age_group'),
+        (r'junior', 'junior'),
+        (r'championship', 'championship'),
+        (r'desert classic', 'desert'),
+        (r'badger', 'badger'),
+        (r'ohio', 'ohio'),
+        (r'masa|middle atlantic', 'masa'),
+    ]
+]
+YEAR = re.compile(r'20(\d{2})')
+STL_DATES = re.compile(r'\d{2}\.\d{2}\.\s*-\s*\d{2}\.\d{2}\.\d{4},?\s*')
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+STATE_SUFFIX = re.compile(r',?\s*(usa|wi|il|ny|ma|ut|ct)$', re.IGNORECASE)
+
+
+def normalize_name(name: str) -> str:
+    """Normalize competition name for matching."""
+    name = name.lower()
+    # Remove dates
+    name = STL_DATES.sub('', name)
+    name = ISO_DATE.sub('', name)
+    # Remove common suffixes
+    name = STATE_SUFFIX.sub('', name)
+    # Normalize whitespace
+    name = ' '.join(name.split())
+    return name
+
+
+@lru_cache(maxsize=None)
+def extract_keywords(name: str) -> frozenset:
+    """Extract key words from competition name."""
+    name = normalize_name(name)
+    keywords = {keyword for pattern, keyword in KEYWORD_PATTERNS if pattern.search(name)}
+    year_match = YEAR.search(name)
+    if year_match:
+        keywords.add(f"20{year_match.group(1)}")
+    return frozenset(keywords)
+
+
+def is_match(query: frozenset, overlap: int) -> bool:
+    """The matching rule: two shared keywords, or the only keyword of a one-keyword name."""
+    return overlap >= 2 or (len(query) == 1 and overlap == 1)
+
+
+class KeywordIndex:
+    """keyword -> competitions, with top-k lookup by keyword overlap.
+
+    Competitions with the same keyword set share one entry in the postings
+    (most names reduce to one of a few hundred sets), so a lookup counts
+    overlaps per distinct set rather than per competition.
+    """
+
+    def __init__(self):
+        self.keywords = {}   # item -> keyword set
+        self.groups = {}     # keyword set -> items, in insertion order
+        self.postings = {}   # keyword -> keyword sets containing it
+        self._order = {}     # Insertion order, the tie-break between equal scores
+
+    def add(self, item: Hashable, name: str, keywords: Optional[frozenset] = None):
+        """Index item under the keywords of name (or the given keywords)."""
+        if item in self.keywords:
+            return
+        keywords = extract_keywords(name) if keywords is None else frozenset(keywords)
+        self.keywords[item] = keywords
+        self._order[item] = len(self._order)
+        if keywords not in self.groups:
+            self.groups[keywords] = []
+            for keyword in keywords:
+                self.postings.setdefault(keyword, []).append(keywords)
+        self.groups[keywords].append(item)
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def overlaps(self, keywords: frozenset) -> Counter:
+        """Indexed keyword set -> number of keywords shared with keywords."""
+        return Counter(chain.from_iterable(self.postings.get(keyword, ()) for keyword in keywords))
+
+    def candidates(self, name: str, k: int = 5, keywords: Optional[frozenset] = None) -> list[tuple[int, Hashable]]:
+        """The k items sharing the most keywords with name, as (overlap, item).
+
+        Equal overlaps keep the order the items were added in.
+        """
+        keywords = extract_keywords(name) if keywords is None else frozenset(keywords)
+        by_overlap = {}
+        for group, overlap in self.overlaps(keywords).items():
+            by_overlap.setdefault(overlap, []).append(self.groups[group])
+
+        found = []
+        for overlap in sorted(by_overlap, reverse=True):
+            items = heapq.merge(*by_overlap[overlap], key=self._order.__getitem__)
+            found.extend((overlap, item) for item in islice(items, k - len(found)))
+            if len(found) >= k:
+                break
+        return found
+
+    def best_match(self, name: str, keywords: Optional[frozenset] = None) -> Optional[tuple[int, Hashable]]:
+        """The top candidate if it passes is_match(), else None."""
+        keywords = extract_keywords(name) if keywords is None else frozenset(keywords)
+        top = self.candidates(name, k=1, keywords=keywords)
+        if top and is_match(keywords, top[0][0]):
+            return top[0]
+        return None
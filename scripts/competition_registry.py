@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Competition registry: one canonical ID per competition across USS and STL names.
+
+USS PDFs call a meet 'Great Lakes Short Track & Heartland #2', shorttracklive
+'11.11. - 11.11.2022, Great Lakes ST & Heartland #2 Milwaukee, WI'. Both
+are reduced to a normalised key once ('ST' read as 'short track'), and the
+key's slug is the canonical ID ('great-lakes-short-track-heartland'). IDs
+depend on the name alone, so registries built by different scripts from
+different data agree on them. Years are dropped from the key: the same
+meet in different seasons shares an ID, and joins that must tell the
+editions apart add the season or date to their key.
+
+    registry = CompetitionRegistry()
+    for r in results:
+        registry.add(r['competition'], date=r.get('date'), source='uss')
+    registry.lookup('2023 Park Ridge Open')  # -> 'park-ridge-open'
+    registry['park-ridge-open']              # -> {'key', 'aliases', 'dates', 'sources'}
+"""
+
+import re
+from functools import lru_cache
+from typing import Optional
+
+STL_DATES = re.compile(r'\d{2}\.\d{2}\.\s*-\s*\d{2}\.\d{2}\.\d{4},?\s*')
+STL_END_DATE = re.compile(r'\d{1,2}\.\d{1,2}\.\s*-\s*(\d{1,2})\.(\d{1,2})\.(\d{4})')
+YEAR = re.compile(r'\d{4}')
+ORDINAL = re.compile(r'\d+(st|nd|rd|th)', re.IGNORECASE)
+SERIES_NUMBER = re.compile(r'#\d+')
+PUNCTUATION = re.compile(r'[,\-]')
+# Stripped in this order, so 'Salt Lake City UT USA' loses all three
+LOCATION_SUFFIXES = [re.compile(rf'\s{loc}\s*$', re.IGNORECASE) for loc in
+                     ['usa', 'ut', 'il', 'ny', 'wi', 'ma', 'nj', 'ct', 'nh', 'salt lake city', 'milwaukee']]
+NON_WORD = re.compile(r'[^a-z0-9]+')
+# Word forms folded into one spelling after lower-casing ('St.' is a saint)
+WORD_FORMS = [
+    (re.compile(r'\bst\b(?!\.)'), 'short track'),
+    (re.compile(r'\bchampionships\b'), 'championship'),
+]
+
+
+@lru_cache(maxsize=None)
+def normalize_comp_name(name: str) -> str:
+    """Normalize competition name for matching."""
+    name = STL_DATES.sub('', name)
+    name = YEAR.sub('', name)
+    name = ORDINAL.sub('', name)
+    name = SERIES_NUMBER.sub('', name)
+    name = PUNCTUATION.sub(' ', name)
+    name = ' '.join(name.split()).lower()
+    for form, spelling in WORD_FORMS:
+        name = form.sub(spelling, name)
+    for suffix in LOCATION_SUFFIXES:
+        name = suffix.sub('', name)
+    return name.strip()
+
+
+def comp_id(key: str) -> str:
+    """Canonical ID of a normalised name: 'park ridge open' -> 'park-ridge-open'."""
+    return NON_WORD.sub('-', key).strip('-')
+
+
+def stl_date(name: str) -> Optional[str]:
+    """ISO end date of an STL competition name ('..., 16.10. - 16.10.2021' -> '2021-10-16')."""
+    match = STL_END_DATE.search(name)
+    if not match:
+        return None
+    day, month, year = match.groups()
+    return f"{year}-{int(month):02d}-{int(day):02d}"
+
+
+class CompetitionRegistry:
+    """Canonical competitions with their aliases, dates and sources."""
+
+    def __init__(self):
+        self.competitions = {}  # id -> {'key', 'aliases', 'dates', 'sources'}
+        self._ids = {}          # raw name -> id
+
+    def add(self, name: str, date: Optional[str] = None, source: Optional[str] = None) -> Optional[str]:
+        """Register a competition name and return its ID (None for an empty name)."""
+        cid = self.lookup(name)
+        if cid is None:
+            return None
+        entry = self.competitions.get(cid)
+        if entry is None:
+            entry = self.competitions[cid] = {'key': normalize_comp_name(name), 'aliases': set(),
+                                              'dates': set(), 'sources': set()}
+        entry['aliases'].add(name)
+        date = date or stl_date(name)
+        if date:
+            entry['dates'].add(date[:10])
+        if source:
+            entry['sources'].add(source)
+        return cid
+
+    def lookup(self, name: str) -> Optional[str]:
+        """The ID a name maps to, whether or not it has been registered."""
+        cid = self._ids.get(name)
+        if cid is None and name:
+            cid = comp_id(normalize_comp_name(name)) or None
+            self._ids[name] = cid
+        return cid
+
+    def has_source(self, cid: Optional[str], source: str) -> bool:
+        entry = self.competitions.get(cid)
+        return entry is not None and source in entry['sources']
+
+    def __getitem__(self, cid: str) -> dict:
+        return self.competitions[cid]
+
+    def __contains__(self, cid: str) -> bool:
+        return cid in self.competitions
+
+    def __len__(self):
+        return len(self.competitions)
+
+    def to_json(self) -> dict:
+        """id -> entry with sorted lists, for writing out."""
+        return {
+            cid: {'key': entry['key'], 'aliases': sorted(entry['aliases']),
+                  'dates': sorted(entry['dates']), 'sources': sorted(entry['sources'])}
+            for cid, entry in sorted(self.competitions.items())
+        }
@@ -5,55 +5,11 @@ Checks: name, competition, date, time (where available)
 """
 
 import json
-import re
 from collections import defaultdict
 from pathlib import Path
 
-def normalize_name(name):
-    """Normalize skater name for matching."""
-    if not name:
-        return ""
-    # Handle "LAST First" format
-    parts = name.strip().split()
-    if len(parts) >= 2:
-        # Check if first part is all caps (likely last name)
-        if parts[0].isupper() and not parts[1].isupper():
-            # Convert "SEARS Liam" -> "Liam Sears"
-            name = " ".join(parts[1:]) + " " + parts[0].title()
-    name = name.lower().strip()
-    name = re.sub(r'\s+', ' ', name)
-    return name
-
-def normalize_comp_name(name):
-    """Normalize competition name for matching."""
-    name = re.sub(r'\d{2}\.\d{2}\.\s*-\s*\d{2}\.\d{2}\.\d{4},?\s*', '', name)
-    name = re.sub(r'\d{4}', '', name)
-    name = re.sub(r'\d+(st|nd|rd|th)', '', name, flags=re.IGNORECASE)
-    name = re.sub(r'#\d+', '', name)
-    name = re.sub(r'[,\-]', ' ', name)
-    name = re.sub(r'\s+', ' ', name).strip().lower()
-    for loc in ['usa', 'ut', 'il', 'ny', 'wi', 'ma', 'nj', 'ct', 'nh', 'salt lake city', 'milwaukee']:
-        name = re.sub(rf'\s{loc}\s*$', '', name, flags=re.IGNORECASE)
-    return name.strip()
-
-def parse_time(time_str):
-    """Parse time string to seconds."""
-    if not time_str:
-        return None
-    try:
-        time_str = str(time_str).strip()
-        if ':' in time_str:
-            parts = time_str.split(':')
-            if len(parts) == 2:
-                mins, secs = parts
-                return float(mins) * 60 + float(secs)
-            elif len(parts) == 3:
-                hours, mins, secs = parts
-                return float(hours) * 3600 + float(mins) * 60 + float(secs)
-        else:
-            return float(time_str)
-    except:
-        return None
+from competition_registry import CompetitionRegistry
+from skater_identity import name_key
 
 def main():
     data_dir = Path(__file__).parent.parent / "dist" / "data"
@@ -79,20 +35,24 @@ def main():
                         result['race_date'] = race.get('date', '')
                         stl_results.append(result)
     
-    # Build USS lookup: (normalized_name, normalized_comp, distance) -> results
+    # Register every competition once; results join on its canonical ID
+    registry = CompetitionRegistry()
+    
+    # Build USS lookup: (normalized_name, competition ID, distance) -> results
     uss_lookup = defaultdict(list)
     for r in uss_data.get('results', []):
         key = (
-            normalize_name(r.get('skater', '')),
-            normalize_comp_name(r.get('competition', '')),
+            name_key(r.get('skater', '')),
+            registry.add(r.get('competition', ''), r.get('date'), 'uss'),
             r.get('distance', '').lower()
         )
         uss_lookup[key].append(r)
     
     print(f"USS results: {len(uss_data.get('results', []))}")
-    print(f"USS unique skaters: {len(set(normalize_name(r.get('skater','')) for r in uss_data.get('results',[])))}")
+    print(f"USS unique skaters: {len(set(name_key(r.get('skater','')) for r in uss_data.get('results',[])))}")
     print(f"STL skater facts: {len(stl_facts)}")
     print(f"STL raw results: {len(stl_results)}")
+    print(f"Competitions: {len(registry)}")
     print()
     
     # Cross-validate: check STL facts against USS results
@@ -101,17 +61,17 @@ def main():
     not_found = []
     
     for skater_id, skater in stl_facts.items():
-        stl_name = normalize_name(skater.get('name', ''))
+        stl_name = name_key(skater.get('name', ''))
         
         for event in skater.get('events', []):
             event_name = event.get('name', '')
-            norm_comp = normalize_comp_name(event_name)
+            comp_id = registry.add(event_name, source='stl')
             
             # Check if this competition exists in USS data
             # We don't have distance info in facts, so check any match
             found_any = False
             for dist in ['500m', '1000m', '1500m', '3000m']:
-                key = (stl_name, norm_comp, dist)
+                key = (stl_name, comp_id, dist)
                 if key in uss_lookup:
                     found_any = True
                     uss_results = uss_lookup[key]
@@ -128,9 +88,7 @@ def main():
             
             if not found_any:
                 # Check if competition exists at all
-                comp_exists = any(normalize_comp_name(r.get('competition','')) == norm_comp 
-                                  for r in uss_data.get('results', []))
-                if comp_exists:
+                if registry.has_source(comp_id, 'uss'):
                     not_found.append({
                         'skater': skater.get('name'),
                         'stl_event': event_name[:60],
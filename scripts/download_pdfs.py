@@ -1,14 +1,14 @@
 #!/usr/bin/env python3
-"""Download all USS Short Track PDFs from the catalog."""
+"""Download all USS Short Track PDFs from the catalog into the PDF store."""
 
+import argparse
 import json
 import os
-import subprocess
 import re
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
-BASE_DIR = Path("/Users/garychen/dev/shorttrack-analytics/data/pdfs")
+import pdf_store
+
 CATALOG_PATH = Path("/Users/garychen/dev/shorttrack-analytics/data/us_pdf_catalog.json")
 
 def sanitize_filename(name: str) -> str:
@@ -20,35 +20,12 @@ def sanitize_filename(name: str) -> str:
     name = name.strip('_.')
     return name[:100]  # Limit length
 
-def download_pdf(url: str, output_path: Path) -> tuple[bool, str, int]:
-    """Download a PDF using curl. Returns (success, message, size_bytes)."""
-    if output_path.exists():
-        size = output_path.stat().st_size
-        return True, f"Already exists: {output_path.name}", size
-    
-    # Check for malformed URLs
-    if "https://assets" in url and url.count("http") > 1:
-        # Fix URLs like https://www.usspeedskating.org/...https://assets...
-        url = "https://assets" + url.split("https://assets")[1]
-    
-    try:
-        result = subprocess.run(
-            ["curl", "-sL", "-o", str(output_path), url],
-            capture_output=True,
-            timeout=60
-        )
-        if result.returncode == 0 and output_path.exists():
-            size = output_path.stat().st_size
-            if size > 1000:  # Valid PDF should be > 1KB
-                return True, f"Downloaded: {output_path.name}", size
-            else:
-                output_path.unlink()
-                return False, f"Too small (likely error): {output_path.name}", 0
-        return False, f"Failed: {output_path.name}", 0
-    except Exception as e:
-        return False, f"Error: {output_path.name} - {e}", 0
-
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--refresh', action='store_true',
+                        help='revalidate PDFs that are already stored')
+    args = parser.parse_args()
+    
     # Load catalog
     with open(CATALOG_PATH) as f:
         catalog = json.load(f)
@@ -68,49 +45,48 @@ def main():
     
     print(f"Found {len(downloads)} short_track PDFs to download\n")
     
-    # Create directories and prepare download tasks
-    tasks = []
+    # Index entries keep the season/date/name file naming this script used
+    items = []
     for item in downloads:
-        season_dir = BASE_DIR / item["season"]
-        season_dir.mkdir(parents=True, exist_ok=True)
-        
         date_str = item["date"] if item["date"] else "unknown"
         safe_name = sanitize_filename(item["name"])
-        filename = f"{date_str}_{safe_name}.pdf"
-        output_path = season_dir / filename
-        
-        tasks.append((item["url"], output_path))
+        items.append({
+            "url": item["url"],
+            "name": item["name"],
+            "date": item["date"],
+            "season": item["season"],
+            "filename": f"{date_str}_{safe_name}.pdf",
+        })
     
-    # Download with parallel workers
+    # URLs already in the store are skipped; the rest are downloaded over
+    # pooled connections and stored once per distinct content
     success_count = 0
     fail_count = 0
     total_size = 0
+    status_counts = {}
     
     print("Downloading...")
-    with ThreadPoolExecutor(max_workers=8) as executor:
-        futures = {executor.submit(download_pdf, url, path): path for url, path in tasks}
-        for future in as_completed(futures):
-            success, msg, size = future.result()
-            if success:
-                success_count += 1
-                total_size += size
-            else:
-                fail_count += 1
-                print(f"  FAIL: {msg}")
+    outcomes = pdf_store.fetch(items, refresh=args.refresh, concurrency=8)
+    for item, outcome in zip(items, outcomes):
+        status_counts[outcome["status"]] = status_counts.get(outcome["status"], 0) + 1
+        if outcome["status"] != "failed":
+            success_count += 1
+            total_size += outcome["size"]
+        else:
+            fail_count += 1
+            print(f"  FAIL: {item['filename']} - {outcome['message']}")
     
     # Summary
     print(f"\n{'='*50}")
     print(f"Download complete!")
     print(f"  Success: {success_count}")
+    for status in ("downloaded", "resumed", "not_modified", "stored", "duplicate"):
+        print(f"    {status}: {status_counts.get(status, 0)}")
     print(f"  Failed:  {fail_count}")
     print(f"  Total size: {total_size / (1024*1024):.1f} MB")
     
-    # List directories
-    print(f"\nDirectories created:")
-    for d in sorted(BASE_DIR.iterdir()):
-        if d.is_dir():
-            count = len(list(d.glob("*.pdf")))
-            print(f"  {d.name}/  ({count} PDFs)")
+    print()
+    pdf_store.print_stats()
 
 if __name__ == "__main__":
     main()
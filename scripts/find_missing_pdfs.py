@@ -5,63 +5,13 @@ Find missing USS PDFs by matching STL competition names.
 
 import json
 import re
-import subprocess
 from pathlib import Path
-from collections import defaultdict
 
-DATA_DIR = Path(__file__).parent.parent / "public" / "data"
-PDF_DIR = Path.home() / 'clawd' / 'shorttrack-knowledge-base' / 'raw_data' / 'uss_pdfs'
-
-def normalize_name(name: str) -> str:
-    """Normalize competition name for matching."""
-    name = name.lower()
-    # Remove dates
-    name = re.sub(r'\d{2}\.\d{2}\.\s*-\s*\d{2}\.\d{2}\.\d{4},?\s*', '', name)
-    name = re.sub(r'\d{4}-\d{2}-\d{2}', '', name)
-    # Remove common suffixes
-    name = re.sub(r',?\s*(usa|wi|il|ny|ma|ut|ct)$', '', name, flags=re.IGNORECASE)
-    # Normalize whitespace
-    name = ' '.join(name.split())
-    return name
+import pdf_store
+import uss_catalog
+from competition_index import KeywordIndex, extract_keywords
 
-def extract_keywords(name: str) -> set:
-    """Extract key words from competition name."""
-    name = normalize_name(name)
-    # Key identifiers
-    keywords = set()
-    
-    patterns = [
-        (r'great lakes', 'great_lakes'),
-        (r'buffalo', 'buffalo'),
-        (r'chicago|silver skate', 'silver_skates'),
-        (r'bay\s*state', 'baystate'),
-        (r'heartland', 'heartland'),
-        (r'nest', 'nest'),
-        (r'saratoga', 'saratoga'),
-        (r'park ridge', 'park_ridge'),
-        (r'franklin park|barrel buster', 'barrel_buster'),
-        (r'land of lincoln', 'land_of_lincoln'),
-        (r'presidential', 'presidential'),
-        (r'gateway', 'gateway'),
-        (r'age group|agn', 'age_group'),
-        (r'junior', 'junior'),
-        (r'championship', 'championship'),
-        (r'desert classic', 'desert'),
-        (r'badger', 'badger'),
-        (r'ohio', 'ohio'),
-        (r'masa|middle atlantic', 'masa'),
-    ]
-    
-    for pattern, keyword in patterns:
-        if re.search(pattern, name, re.IGNORECASE):
-            keywords.add(keyword)
-    
-    # Extract year
-    year_match = re.search(r'20(\d{2})', name)
-    if year_match:
-        keywords.add(f"20{year_match.group(1)}")
-    
-    return keywords
+DATA_DIR = Path(__file__).parent.parent / "public" / "data"
 
 def main():
     print("Loading STL data...")
@@ -79,13 +29,13 @@ def main():
     
     print(f"Found {len(stl_comps)} US competitions in STL data")
     
-    # Get existing PDFs
-    existing_pdfs = set()
-    for pdf in PDF_DIR.glob("*.pdf"):
-        keywords = extract_keywords(pdf.stem)
-        existing_pdfs.add(frozenset(keywords))
+    # Index existing PDFs by keyword
+    existing_pdfs = KeywordIndex()
+    docs = pdf_store.documents()
+    for doc in docs:
+        existing_pdfs.add(doc['filename'], Path(doc['filename']).stem)
     
-    print(f"Found {len(list(PDF_DIR.glob('*.pdf')))} existing PDFs")
+    print(f"Found {len(docs)} existing PDFs")
     
     # Find potentially missing competitions
     print("\n=== Potentially missing competitions ===")
@@ -95,49 +45,36 @@ def main():
         if not keywords:
             continue
         
-        # Check if we have a matching PDF
-        found = False
-        for existing in existing_pdfs:
-            # Match if most keywords overlap
-            overlap = len(keywords & existing)
-            if overlap >= 2 or (len(keywords) == 1 and keywords <= existing):
-                found = True
-                break
-        
-        if not found and keywords:
+        if existing_pdfs.best_match(comp, keywords) is None:
             missing.append((comp, keywords))
             print(f"  Missing: {comp}")
-            print(f"    Keywords: {keywords}")
+            print(f"    Keywords: {set(keywords)}")
     
     print(f"\n{len(missing)} potentially missing competitions")
     
     # Scrape USS website for matching PDFs
     print("\n=== Scraping USS website ===")
-    result = subprocess.run(
-        ['curl', '-s', 'https://www.usspeedskating.org/results'],
-        capture_output=True, text=True, timeout=60
-    )
-    html = result.stdout
-    
-    # Extract PDF links with names
-    pattern = r'href="(https://assets\.contentstack\.io/[^"]+\.pdf)"[^>]*>([^<]+)</a>'
-    matches = re.findall(pattern, html, re.IGNORECASE)
+    catalog = uss_catalog.check()
+    uss_pdfs = KeywordIndex()
+    for link in catalog['links']:
+        pdf_name = f"{link['date']} - {link['name']}" if link['date'] else link['name']
+        uss_pdfs.add(link['url'], pdf_name)
     
-    print(f"Found {len(matches)} PDFs on USS website")
+    print(f"Found {len(uss_pdfs)} PDFs on USS website")
     
-    # Match missing competitions to USS PDFs
+    # Match missing competitions to USS PDFs: the link sharing the most
+    # keywords, at least two
     print("\n=== Matched PDFs to download ===")
+    names = {link['url']: link['name'] for link in catalog['links']}
     to_download = []
     for comp, comp_keywords in missing:
-        for url, pdf_name in matches:
-            pdf_keywords = extract_keywords(pdf_name)
-            overlap = comp_keywords & pdf_keywords
-            if len(overlap) >= 2:
-                print(f"  {comp}")
-                print(f"    -> {pdf_name}")
-                print(f"    URL: {url}")
-                to_download.append((url, pdf_name, comp))
-                break
+        top = uss_pdfs.candidates(comp, k=1, keywords=comp_keywords)
+        if top and top[0][0] >= 2:
+            url = top[0][1]
+            print(f"  {comp}")
+            print(f"    -> {names[url]}")
+            print(f"    URL: {url}")
+            to_download.append((url, names[url], comp))
     
     print(f"\n{len(to_download)} PDFs to download")
     
@@ -2,128 +2,40 @@
 """
 Generate skater_time_trends.json from US historical results.
 This creates time trend data for the SkaterProfile page.
+
+    python3 scripts/generate_time_trends.py [--shards]
+
+--shards also writes the trends per hash bucket of skater ids, with an
+index, so the page can load one skater's shard (see trend_shards.py).
 """
 
+import argparse
 import json
-import re
 from datetime import datetime
 from pathlib import Path
 from collections import defaultdict
-from typing import Optional
-
-DATA_DIR = Path(__file__).parent.parent / "public" / "data"
 
-def parse_time_to_seconds(time_str: str) -> Optional[float]:
-    """Convert time string like '1:27.792' or '42.245' to seconds."""
-    if not time_str:
-        return None
-    time_str = time_str.strip()
-    
-    # Handle mm:ss.xxx format
-    if ':' in time_str:
-        parts = time_str.split(':')
-        try:
-            mins = int(parts[0])
-            secs = float(parts[1])
-            return mins * 60 + secs
-        except (ValueError, IndexError):
-            return None
-    
-    # Handle ss.xxx format
-    try:
-        return float(time_str)
-    except ValueError:
-        return None
+import numpy as np
 
-def normalize_name(name: str) -> str:
-    """Normalize skater name for matching."""
-    # Remove extra spaces and convert to lowercase
-    name = ' '.join(name.strip().split()).lower()
-    # Remove hyphens for matching (e.g., "Santos-Griswold" -> "santos griswold")
-    name = name.replace('-', ' ')
-    return name
+import event_times
+import record_stream
+import skater_identity
+import trend_shards
 
-def get_name_variants(name: str) -> list:
-    """Generate multiple name variants for matching."""
-    variants = []
-    original = name.strip()
-    
-    # Lowercase version
-    lower = original.lower()
-    variants.append(lower)
-    
-    # Remove hyphens
-    no_hyphen = lower.replace('-', ' ')
-    if no_hyphen != lower:
-        variants.append(no_hyphen)
-    
-    # Split into parts
-    parts = no_hyphen.split()
-    
-    if len(parts) >= 2:
-        # Check if any part is all uppercase (likely lastname in "Firstname LASTNAME" format)
-        caps_parts = [p for p in original.split() if p.isupper() and len(p) > 1]
-        
-        if caps_parts:
-            # Format: "Kristen SANTOS-GRISWOLD" -> try "kristen santos griswold" and "santos griswold kristen"
-            # Already have the lowercase version
-            # Add reversed: lastname first
-            lastname = ' '.join(p.lower() for p in caps_parts)
-            firstname = ' '.join(p.lower() for p in original.split() if not p.isupper() or len(p) <= 1)
-            variants.append(f"{lastname} {firstname}".strip())
-            variants.append(f"{firstname} {lastname}".strip())
-        else:
-            # Normal format: "Aaron Tran" -> "aaron tran" and "tran aaron"
-            variants.append(' '.join(reversed(parts)))
-    
-    # Remove duplicates while preserving order
-    seen = set()
-    unique = []
-    for v in variants:
-        v_normalized = ' '.join(v.split())  # Normalize spaces
-        if v_normalized and v_normalized not in seen:
-            seen.add(v_normalized)
-            unique.append(v_normalized)
-    
-    return unique
-
-def parse_distance(dist_str: str) -> Optional[int]:
-    """Extract distance in meters from string like '500m', '1000', etc."""
-    match = re.search(r'(\d+)', str(dist_str))
-    if match:
-        return int(match.group(1))
-    return None
+DATA_DIR = Path(__file__).parent.parent / "public" / "data"
 
-def main():
-    print("Loading skaters...")
-    with open(DATA_DIR / "skaters.json") as f:
-        skaters = json.load(f)
-    
-    # Build name -> id mapping with multiple variants
-    name_to_id = {}
-    id_to_skater = {}
-    for s in skaters:
-        id_to_skater[s['id']] = s
-        # Add all name variants
-        for variant in get_name_variants(s['name']):
-            if variant not in name_to_id:  # Don't overwrite existing
-                name_to_id[variant] = s['id']
-    
-    print(f"  {len(skaters)} skaters loaded")
-    print(f"  {len(name_to_id)} name variants indexed")
-    
-    # Load historical results (older data: 2017-2022)
-    print("Loading US historical results...")
-    results = []
-    
+def load_results():
+    """Result records of the historical file, then of the recent USS file, streamed"""
+    # Historical results (older data: 2017-2022)
     hist_path = DATA_DIR / "us_historical_results.json"
     if hist_path.exists():
-        with open(hist_path) as f:
-            hist_data = json.load(f)
-        results.extend(hist_data.get('results', []))
-        print(f"  {len(hist_data.get('results', []))} from us_historical_results.json")
+        count = 0
+        for r in record_stream.iter_records(hist_path):
+            count += 1
+            yield r
+        print(f"  {count} from us_historical_results.json")
     
-    # Load recent USS results (newer data: 2022-2026)
+    # Recent USS results (newer data: 2022-2026)
     # Check multiple locations
     uss_paths = [
         Path(__file__).parent.parent / "data" / "uss_all_results.json",  # /shorttrack-analytics/data/
@@ -131,69 +43,84 @@ def main():
     ]
     for uss_path in uss_paths:
         if uss_path.exists():
-            with open(uss_path) as f:
-                uss_data = json.load(f)
-            uss_results = uss_data.get('results', [])
-            # Normalize field names to match historical format
-            for r in uss_results:
+            count = 0
+            for r in record_stream.iter_records(uss_path):
+                # Normalize field names to match historical format
                 if 'rank' in r and 'place' not in r:
                     r['place'] = r['rank']
-            results.extend(uss_results)
-            print(f"  {len(uss_results)} from {uss_path.name}")
+                count += 1
+                yield r
+            print(f"  {count} from {uss_path.name}")
             break
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate skater_time_trends.json')
+    parser.add_argument('--shards', action='store_true',
+                        help='also write per-bucket shards and an index')
+    args = parser.parse_args()
+    
+    print("Loading skaters...")
+    with open(DATA_DIR / "skaters.json") as f:
+        skaters = json.load(f)
+    
+    # Name -> id through the shared alias index; the ids of skaters.json
+    # take over their names from any id the index had for them (the first
+    # of several skaters with one name keeps it)
+    aliases = skater_identity.load_index()
+    id_to_skater = {s['id']: s for s in skaters}
+    skater_identity.add_skaters(aliases, skaters)
+    aliases.save()
     
-    print(f"  {len(results)} total results loaded")
+    print(f"  {len(skaters)} skaters loaded")
+    print(f"  {len(aliases)} name aliases indexed")
     
     # Build time trends: skater_id -> distance -> list of {date, time, competition, place}
+    print("Loading results...")
     trends = defaultdict(lambda: defaultdict(list))
+    total = 0
     matched = 0
     unmatched_names = set()
     
-    for r in results:
-        if not r.get('time'):
-            continue
-        
-        time_secs = parse_time_to_seconds(r['time'])
-        if time_secs is None:
-            continue
-        
-        distance = parse_distance(r.get('distance', ''))
-        if distance is None or distance not in [500, 1000, 1500]:
-            continue
-        
-        # Match skater name to ID using multiple variants
-        skater_name = r.get('skater', '')
-        skater_id = None
-        
-        for variant in get_name_variants(skater_name):
-            if variant in name_to_id:
-                skater_id = name_to_id[variant]
-                break
+    # Results are streamed in batches; times and distances are parsed a batch column at a time
+    for results in record_stream.batched(load_results()):
+        total += len(results)
+        times_ms = event_times.parse_times_ms(r.get('time') for r in results)
+        distances = event_times.distance_meters(r.get('distance', '') for r in results)
+        usable = ~np.isnan(times_ms) & np.isin(distances, [500, 1000, 1500])
         
-        if not skater_id:
-            unmatched_names.add(skater_name)
-            continue
-        
-        matched += 1
-        
-        # Parse date
-        date_str = r.get('date')
-        if date_str:
-            try:
-                # Validate date format
-                datetime.strptime(date_str, '%Y-%m-%d')
-            except ValueError:
-                date_str = None
-        
-        trends[skater_id][distance].append({
-            'time': time_secs,
-            'time_str': r['time'],
-            'date': date_str,
-            'competition': r.get('competition', 'Unknown'),
-            'place': r.get('place'),
-            'source': 'uss',
-        })
-    
+        for r, ok, time_ms, distance in zip(results, usable.tolist(), times_ms.tolist(), distances.tolist()):
+            if not ok:
+                continue
+            
+            # Match skater name to ID
+            skater_name = r.get('skater', '')
+            skater_id = aliases.lookup(skater_name)
+            
+            if skater_id not in id_to_skater:
+                unmatched_names.add(skater_name)
+                continue
+            
+            matched += 1
+            
+            # Parse date
+            date_str = r.get('date')
+            if date_str:
+                try:
+                    # Validate date format
+                    datetime.strptime(date_str, '%Y-%m-%d')
+                except ValueError:
+                    date_str = None
+            
+            trends[skater_id][distance].append({
+                'time': time_ms / 1000,
+                'time_str': r['time'],
+                'date': date_str,
+                'competition': r.get('competition', 'Unknown'),
+                'place': r.get('place'),
+                'source': 'uss',
+            })
+    
+    print(f"  {total} total results loaded")
     print(f"  {matched} results matched to skaters")
     print(f"  {len(unmatched_names)} unique unmatched names")
     if unmatched_names:
@@ -236,6 +163,14 @@ def main():
     print(f"  {output['total_skaters']} skaters with time data")
     print(f"  {output['total_entries']} total time entries")
     
+    if args.shards:
+        directory = trend_shards.shard_dir(output_path)
+        counts = trend_shards.write_shards(trends_dict, directory)
+        print(f"  Shards in {directory}: {counts['written']} written, {counts['unchanged']} unchanged")
+    elif trend_shards.remove_shards(trend_shards.shard_dir(output_path)):
+        # The app prefers shards to this file, so stale ones must not stay
+        print("  Removed the shards of an earlier run")
+    
     # Show some stats
     entry_counts = [
         sum(len(e) for e in d.values())
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+In-process PDF downloader with keep-alive connections and conditional GETs.
+
+Replaces the per-file curl subprocesses. Requests run on asyncio under a
+concurrency limit and reuse pooled HTTP/1.1 connections per host (the USS
+PDFs all live on assets.contentstack.io). Each target directory keeps a
+manifest of ETag / Last-Modified validators, so refreshing the archive is a
+round of cheap 304s. Interrupted downloads are kept as .part files and
+resumed with a Range request when the server still has the same version.
+"""
+
+import asyncio
+import codecs
+import http.client
+import json
+import os
+import threading
+import time
+from email.utils import formatdate
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import urljoin, urlsplit
+
+MANIFEST_NAME = '.download_manifest.json'
+CONCURRENCY = 8
+TIMEOUT = 60
+MAX_REDIRECTS = 5
+MIN_PDF_SIZE = 1000  # Smaller bodies are error pages, not PDFs
+CHUNK_SIZE = 1 << 16
+
+# Serialises manifest updates from concurrent download_all() runs
+_manifest_lock = threading.Lock()
+# Guards the connection pools, shared by the worker threads of a run and,
+# when the caller passes one in, by consecutive runs
+_pool_lock = threading.Lock()
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0',
+    'Accept-Encoding': 'identity',
+}
+
+
+# --- Connection pool --------------------------------------------------------
+
+def _connect(scheme: str, host: str) -> http.client.HTTPConnection:
+    if scheme == 'https':
+        return http.client.HTTPSConnection(host, timeout=TIMEOUT)
+    return http.client.HTTPConnection(host, timeout=TIMEOUT)
+
+
+def _request(pool: dict, url: str, headers: dict) -> tuple[http.client.HTTPResponse, tuple, http.client.HTTPConnection]:
+    """Send a GET over a pooled connection. Returns (response, pool key, connection).
+
+    A stale keep-alive connection is dropped and the request retried once on
+    a fresh one.
+    """
+    parts = urlsplit(url)
+    key = (parts.scheme, parts.netloc)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+
+    for attempt in range(2):
+        with _pool_lock:
+            idle = pool.get(key)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            conn = _connect(*key)
+        try:
+            conn.request('GET', path, headers={**HEADERS, **headers})
+            return conn.getresponse(), key, conn
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            conn.close()
+            if attempt:
+                raise
+    raise RuntimeError('unreachable')
+
+
+def _release(pool: dict, key: tuple, conn: http.client.HTTPConnection,
+             response: http.client.HTTPResponse):
+    """Return a connection to the pool once its response is fully read."""
+    if response.will_close or not response.isclosed():
+        conn.close()
+    else:
+        with _pool_lock:
+            pool.setdefault(key, []).append(conn)
+
+
+def close_pool(pool: dict):
+    with _pool_lock:
+        conns = [conn for idle in pool.values() for conn in idle]
+        pool.clear()
+    for conn in conns:
+        conn.close()
+
+
+def _get(pool: dict, url: str, headers: dict) -> tuple[http.client.HTTPResponse, tuple, http.client.HTTPConnection, str]:
+    """GET following redirects like curl -L. Returns (response, key, conn, final url)."""
+    for _ in range(MAX_REDIRECTS + 1):
+        response, key, conn = _request(pool, url, headers)
+        if response.status in (301, 302, 303, 307, 308) and response.getheader('Location'):
+            location = urljoin(url, response.getheader('Location'))
+            response.read()
+            _release(pool, key, conn, response)
+            url = location
+            continue
+        return response, key, conn, url
+    raise http.client.HTTPException(f"Too many redirects: {url}")
+
+
+# --- Manifest ---------------------------------------------------------------
+
+def load_manifest(path: Path) -> dict:
+    """Validators per downloaded file, keyed by path relative to the manifest."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path: Path, manifest: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Not os.getpid() alone: threads of one process may save at once
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def update_manifest(path: Path, entries: dict):
+    """Write entries into the manifest on disk, leaving other keys alone.
+
+    An entry of None removes its key.
+    """
+    with _manifest_lock:
+        manifest = load_manifest(path)
+        for key, entry in entries.items():
+            if entry is None:
+                manifest.pop(key, None)
+            else:
+                manifest[key] = entry
+        save_manifest(path, manifest)
+
+
+def _validators(response: http.client.HTTPResponse) -> dict:
+    return {
+        'etag': response.getheader('ETag'),
+        'last_modified': response.getheader('Last-Modified'),
+    }
+
+
+# --- Downloads --------------------------------------------------------------
+
+def _download(pool: dict, url: str, output_path: Path, manifest: dict, key: str) -> dict:
+    """Fetch one file, revalidating or resuming where possible.
+
+    Updates manifest[key] in place and returns the outcome.
+    """
+    part_path = output_path.with_name(output_path.name + '.part')
+    entry = manifest.get(key) or {}
+    headers = {}
+    offset = 0
+
+    if output_path.exists():
+        # Revalidate. Files downloaded before the manifest existed fall back
+        # to their mtime, which is when curl wrote them.
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        if not headers:
+            headers['If-Modified-Since'] = formatdate(output_path.stat().st_mtime, usegmt=True)
+    elif part_path.exists() and entry.get('part'):
+        # Resume, but only if the server still has the version we started
+        offset = part_path.stat().st_size
+        headers['Range'] = f'bytes={offset}-'
+        headers['If-Range'] = entry['part'].get('etag') or entry['part']['last_modified']
+
+    response, conn_key, conn, final_url = _get(pool, url, headers)
+    try:
+        if response.status == 304:
+            response.read()
+            size = output_path.stat().st_size
+            validators = {k: v for k, v in _validators(response).items() if v}
+            manifest[key] = {**entry, **validators, 'url': url, 'size': size}
+            return {'status': 'not_modified', 'size': size}
+
+        if response.status == 206 and offset:
+            content_range = response.getheader('Content-Range') or ''
+            if not content_range.startswith(f'bytes {offset}-'):
+                raise http.client.HTTPException(f"Unexpected Content-Range: {content_range}")
+            mode, status = 'ab', 'resumed'
+        elif response.status == 200:
+            mode, status = 'wb', 'downloaded'
+        elif response.status == 416 and offset:
+            # Our partial file does not fit the remote one; start over
+            response.read()
+            part_path.unlink()
+            manifest.pop(key, None)
+            return _download(pool, url, output_path, manifest, key)
+        else:
+            response.read()
+            return {'status': 'failed', 'size': 0, 'message': f"HTTP {response.status}"}
+
+        # Record the new version's validators before the body, so an
+        # interrupted download can be resumed by the next run. The complete
+        # file's validators stay as they are until it is replaced.
+        validators = _validators(response)
+        resumable = validators if validators['etag'] or validators['last_modified'] else None
+        manifest[key] = {**entry, 'url': url, 'part': resumable}
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(part_path, mode) as f:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+    finally:
+        _release(pool, conn_key, conn, response)
+
+    size = part_path.stat().st_size
+    if size <= MIN_PDF_SIZE:
+        part_path.unlink()
+        manifest.pop(key, None)
+        return {'status': 'failed', 'size': 0, 'message': 'Too small (likely error)'}
+    os.replace(part_path, output_path)
+    manifest[key] = {'url': url, 'final_url': final_url, **validators, 'size': size}
+    return {'status': status, 'size': size}
+
+
+async def download_all(jobs: list[tuple[str, Path]], manifest_path: Path,
+                       concurrency: int = CONCURRENCY, pool: Optional[dict] = None) -> list[dict]:
+    """Download (url, output_path) jobs, returning one outcome dict per job.
+
+    Outcomes have 'url', 'path', 'status' (downloaded, resumed,
+    not_modified or failed), 'size', 'seconds' and, on failure, 'message'.
+    The manifest entries of these jobs are saved even if the run is
+    interrupted.
+
+    Connections come from pool when one is given, and are left in it for
+    the caller's next run (and its close_pool()); otherwise the run keeps
+    its own pool and closes it at the end.
+    """
+    manifest = load_manifest(manifest_path)
+    base = manifest_path.parent
+    limit = asyncio.Semaphore(concurrency)
+    owned = pool is None
+    if owned:
+        pool = {}
+
+    def manifest_key(output_path: Path) -> str:
+        try:
+            return str(output_path.relative_to(base))
+        except ValueError:
+            return str(output_path)
+
+    async def run(url: str, output_path: Path) -> dict:
+        async with limit:
+            started = time.perf_counter()
+            try:
+                outcome = await asyncio.to_thread(_download, pool, url, output_path,
+                                                  manifest, manifest_key(output_path))
+            except Exception as e:
+                outcome = {'status': 'failed', 'size': 0, 'message': str(e) or type(e).__name__}
+        return {'url': url, 'path': output_path, 'seconds': time.perf_counter() - started, **outcome}
+
+    try:
+        return await asyncio.gather(*(run(url, path) for url, path in jobs))
+    finally:
+        touched = {manifest_key(path) for _, path in jobs}
+        update_manifest(manifest_path, {key: manifest.get(key) for key in touched})
+        if owned:
+            close_pool(pool)
+
+
+def download_files(jobs: list[tuple[str, Path]], manifest_path: Path,
+                   concurrency: int = CONCURRENCY, pool: Optional[dict] = None) -> list[dict]:
+    """Synchronous wrapper around download_all()."""
+    return asyncio.run(download_all(jobs, manifest_path, concurrency, pool))
+
+
+def stream_text(url: str, validators: Optional[dict] = None) -> tuple[dict, Optional[Iterator[str]]]:
+    """GET a page as decoded text chunks, conditionally if validators are given.
+
+    Returns (validators of the response, chunks). chunks is None when the
+    server answers 304 Not Modified; otherwise it is a generator that reads
+    the body as it is consumed and closes the connection when exhausted.
+    """
+    headers = {}
+    if validators and validators.get('etag'):
+        headers['If-None-Match'] = validators['etag']
+    if validators and validators.get('last_modified'):
+        headers['If-Modified-Since'] = validators['last_modified']
+
+    pool = {}
+    response, _, conn, _ = _get(pool, url, headers)
+    close_pool(pool)  # Only connections of redirect hops are idle here
+    current = {k: v for k, v in _validators(response).items() if v}
+    if response.status != 200:
+        response.read()
+        conn.close()
+        if response.status == 304:
+            return {**(validators or {}), **current}, None
+        raise http.client.HTTPException(f"HTTP {response.status} for {url}")
+
+    def chunks() -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder(response.headers.get_content_charset() or 'utf-8')('replace')
+        try:
+            while True:
+                data = response.read(CHUNK_SIZE)
+                if not data:
+                    break
+                yield decoder.decode(data)
+            yield decoder.decode(b'', final=True)
+        finally:
+            conn.close()
+
+    return current, chunks()
+
+
+def fetch_text(url: str) -> str:
+    """GET a page (following redirects) and return its body as text."""
+    pool = {}
+    try:
+        response, key, conn, _ = _get(pool, url, {})
+        body = response.read()
+        _release(pool, key, conn, response)
+        if response.status != 200:
+            raise http.client.HTTPException(f"HTTP {response.status} for {url}")
+        charset = response.headers.get_content_charset() or 'utf-8'
+        return body.decode(charset, errors='replace')
+    finally:
+        close_pool(pool)
@@ -10,6 +10,9 @@ import os
 from collections import defaultdict
 from datetime import datetime
 
+from competition_registry import CompetitionRegistry
+from skater_identity import name_key
+
 # Standard short track distances
 STANDARD_DISTANCES = ['500m', '1000m', '1500m', '3000m', '5000m']
 RELAY_DISTANCES = ['2000m relay', '3000m relay', '5000m relay']
@@ -206,17 +209,18 @@ def process_competitions(data):
                 }
                 results.append(record)
                 
-                # Update skater profile
-                skaters[clean]['name'] = clean
-                skaters[clean]['seasons'].add(season)
+                # Update skater profile; spellings of one name share an entry
+                skater = skaters[name_key(clean)]
+                skater['name'] = skater['name'] or clean
+                skater['seasons'].add(season)
                 
                 # Track best times
-                if time and distance not in skaters[clean]['best_times']:
-                    skaters[clean]['best_times'][distance] = time
+                if time and distance not in skater['best_times']:
+                    skater['best_times'][distance] = time
                 elif time:
                     # Simple comparison (works for MM:SS.mmm format)
-                    if time < skaters[clean]['best_times'][distance]:
-                        skaters[clean]['best_times'][distance] = time
+                    if time < skater['best_times'][distance]:
+                        skater['best_times'][distance] = time
     
     return results, skaters
 
@@ -246,7 +250,7 @@ def main():
     
     # Merge skaters
     all_skaters = {}
-    for name, data in {**skaters1, **skaters2}.items():
+    for name, data in [*skaters1.items(), *skaters2.items()]:
         if name in all_skaters:
             all_skaters[name]['seasons'].update(data['seasons'])
             for dist, time in data['best_times'].items():
@@ -257,15 +261,19 @@ def main():
         else:
             all_skaters[name] = data
     
-    # Convert sets to lists for JSON
+    # Convert sets to lists for JSON, keyed by display name
     for skater in all_skaters.values():
         skater['seasons'] = sorted(list(skater['seasons']))
+    all_skaters = {skater['name']: skater for skater in all_skaters.values()}
     
-    # Deduplicate results
+    # Deduplicate results; spellings of one competition share its canonical
+    # ID, and the season keeps its editions apart
+    registry = CompetitionRegistry()
     seen = set()
     unique_results = []
     for r in all_results:
-        key = (r['skater'], r['competition'], r['distance'], r['category'], r['place'])
+        comp_id = registry.add(r['competition'], r['date'], 'uss')
+        key = (name_key(r['skater']), comp_id, r['season'], r['distance'], r['category'], r['place'])
         if key not in seen:
             seen.add(key)
             unique_results.append(r)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Compiled line classification for the USS text parsers.
+
+The parsers decide what each text line is (distance header, category
+header or result row) by trying a list of regexes one re.search() at a
+time. Here each ordered pattern list is compiled once into a single
+alternation, so a line that matches none of them (most result rows) costs
+one scan per grammar instead of one per pattern. classify_*_line() return
+typed tokens with exactly the answers the old per-pattern chains gave
+(checked by scripts/test_line_classifier.py, timed by
+scripts/bench_line_classifier.py).
+"""
+
+import re
+from typing import Callable, Optional
+
+# Token kinds
+DISTANCE = 'distance'   # (DISTANCE, distance, category or None)
+CATEGORY = 'category'   # (CATEGORY, category)
+RESULT = 'result'       # grammar specific, see the classify functions
+
+STANDARD_DISTANCES = [222, 333, 500, 777, 1000, 1500, 3000]
+
+
+def ordered_search(patterns: list[str], flags: int = 0,
+                   prefilter: Optional[str] = None) -> Callable[[str], Optional[tuple]]:
+    """Compile patterns that are tried in order into one alternation.
+
+    The returned search(text) gives (index, group 1 or None) for the first
+    pattern in list order that matches anywhere in text, or None; the same
+    answer as calling re.search() with each pattern in turn. prefilter is an
+    optional cheaper pattern that every match of every pattern also matches;
+    lines it rejects skip the alternation.
+    """
+    singles = [re.compile(p, flags) for p in patterns]
+    required = re.compile(prefilter, flags) if prefilter else None
+    wrappers = {}  # wrapper group number -> pattern index
+    parts = []
+    group = 1
+    for i, single in enumerate(singles):
+        wrappers[group] = i
+        parts.append(f'({single.pattern})')
+        group += single.groups + 1
+    combined = re.compile('|'.join(parts), flags)
+
+    def search(text: str) -> Optional[tuple]:
+        if required is not None and required.search(text) is None:
+            return None
+        match = combined.search(text)
+        if match is None:
+            return None
+        # The wrapper closes after any groups inside it, so it is lastindex
+        index = wrappers[match.lastindex]
+        # The alternation reports the leftmost match; a pattern earlier in
+        # the list can still match further right and takes precedence
+        for i in range(index):
+            earlier = singles[i].search(text, match.start() + 1)
+            if earlier:
+                return i, earlier.group(1) if singles[i].groups else None
+        return index, match.group(match.lastindex + 1) if singles[index].groups else None
+
+    return search
+
+
+# --- parse_us_pdfs*.py ------------------------------------------------------
+
+# The old '(\d{3,4})\s*[mM]\s+(?:Final|Heat|Quarter|Semi)' pattern is dropped:
+# wherever it matches, the first pattern already does
+US_DISTANCE_PATTERNS = [
+    r'(\d{3,4})\s*[mM](?:eters?)?',  # 500m, 1000m, 1500m
+    r'Distance[:\s]+(\d{3,4})',
+]
+
+US_CATEGORY_PATTERNS = [
+    r'(Senior\s+(?:Men|Women|Ladies))',
+    r'(Junior\s+(?:Men|Women|Ladies|Boys|Girls))',
+    r'(Masters?\s+(?:Men|Women|Ladies)\s*\d*)',
+    r'((?:Midget|Juvenile|Intermediate|Novice)\s+(?:Boys|Girls))',
+    r'(Open\s+(?:Men|Women))',
+    r'((?:U|Under)\s*\d+\s*(?:Men|Women|Boys|Girls)?)',
+    r'(Men|Women|Boys|Girls)(?:\s+\d+)?',
+    r'(\d+(?:\+|-)?\s*(?:Men|Women))',
+]
+
+_us_distance = ordered_search(US_DISTANCE_PATTERNS)
+# Every category pattern needs one of these words or a 'U12'-style age group
+_us_category = ordered_search(US_CATEGORY_PATTERNS, re.IGNORECASE,
+                              prefilter=r'Men|Ladies|Boys|Girls|U(?:nder)?\s*\d')
+
+RESULT_START_RE = re.compile(r'\d{1,2}[\s\.]')
+PLACE_RE = re.compile(r'(\d{1,2})\.?')
+TIME_TOKEN_RE = re.compile(r'\d{1,2}:\d{2}\.\d{2,3}|\d{1,2}\.\d{2,3}')
+CLUB_RE = re.compile(r'[A-Z]{2,6}')
+STATUS_CODES = ['DNS', 'DNF', 'DQ', 'ADV', 'PN', 'YC', 'RC']
+
+
+def extract_distance_from_text(text: str) -> Optional[str]:
+    """Extract distance from text (e.g., '500m', '1000m', '1500m')"""
+    found = _us_distance(text)
+    return f"{found[1]}m" if found else None
+
+
+def extract_category_from_text(text: str) -> Optional[str]:
+    """Extract category/age group from text."""
+    found = _us_category(text)
+    return found[1].strip() if found else None
+
+
+def is_result_line(text: str) -> bool:
+    """Check if line looks like a result line (has place number at start)."""
+    if not text:
+        return False
+    stripped = text.strip()
+    return len(stripped) >= 5 and RESULT_START_RE.match(stripped) is not None
+
+
+def parse_result_line(line: str) -> Optional[dict]:
+    """Parse a single result line into place, name, club and time."""
+    if not line:
+        return None
+
+    # Common patterns for result lines:
+    # 1 LASTNAME Firstname    CLUB    42.123
+    # 1. LASTNAME Firstname   CLUB    42.123
+    # 1  123  LASTNAME Firstname  CLUB  42.123  (with bib number)
+    parts = line.split()
+    if len(parts) < 3:
+        return None
+
+    result = {
+        "place": None,
+        "name": None,
+        "club": None,
+        "time": None,
+    }
+
+    # First part should be place
+    place_match = PLACE_RE.fullmatch(parts[0])
+    if not place_match:
+        return None
+    result["place"] = int(place_match.group(1))
+
+    # Find time (usually last numeric-looking value with decimal)
+    time_idx = None
+    for i in range(len(parts) - 1, 0, -1):
+        p = parts[i]
+        if TIME_TOKEN_RE.fullmatch(p):
+            result["time"] = p
+            time_idx = i
+            break
+        elif p.upper() in STATUS_CODES:
+            result["time"] = p.upper()
+            time_idx = i
+            break
+
+    # Skip bib number if present (usually 2nd or 3rd position)
+    name_start = 1
+    if len(parts) > 3 and parts[1].isdigit() and len(parts[1]) <= 4:
+        name_start = 2
+
+    # Find club (usually 3-5 char uppercase string before time)
+    name_end = time_idx if time_idx else len(parts)
+    for i in range(name_end - 1, name_start, -1):
+        p = parts[i]
+        # Club patterns: PTSC, SSSC, SSC, WWSC, etc.
+        if CLUB_RE.fullmatch(p) and p not in ['DNS', 'DNF', 'DQ', 'ADV']:
+            result["club"] = p
+            name_end = i
+            break
+
+    # Name is between name_start and name_end
+    if name_end > name_start:
+        result["name"] = " ".join(parts[name_start:name_end])
+
+    # Validate result
+    if result["place"] and result["name"] and len(result["name"]) > 2:
+        return result
+    return None
+
+
+def classify_us_line(line: str) -> Optional[tuple]:
+    """Classify a stripped line for parse_us_pdfs*.py.
+
+    RESULT tokens are (RESULT, parse_result_line() dict).
+    """
+    distance = extract_distance_from_text(line)
+    if distance:
+        return DISTANCE, distance, extract_category_from_text(line)
+
+    category = extract_category_from_text(line)
+    if category:
+        return CATEGORY, category
+
+    if is_result_line(line):
+        result = parse_result_line(line)
+        if result:
+            return RESULT, result
+    return None
+
+
+# --- parse_uss_batch.py, update_uss_data.py, parse_pdfs_incremental.py ------
+
+BATCH_DISTANCE_PATTERNS = [
+    (r'\b222\s*m', 222), (r'\b333\s*m', 333), (r'\b500\s*m', 500),
+    (r'\b777\s*m', 777), (r'\b1000\s*m', 1000), (r'\b1500\s*m', 1500),
+    (r'\b3000\s*m', 3000), (r'\b222M\b', 222), (r'\b333M\b', 333),
+    (r'\b500M\b', 500), (r'\b777M\b', 777), (r'\b1000M\b', 1000),
+    (r'\b1500M\b', 1500), (r'\b3000M\b', 3000),
+]
+
+BATCH_CATEGORY_PATTERNS = [
+    (r'Open\s+Men', 'Open Men'), (r'Open\s+Women', 'Open Women'),
+    (r'Open\s+M\b', 'Open Men'), (r'Open\s+W\b', 'Open Women'),
+    (r'Masters\s+Men', 'Masters Men'), (r'Masters\s+Women', 'Masters Women'),
+    (r'U8\s+Boys', 'U8 Boys'), (r'U8\s+Girls', 'U8 Girls'),
+    (r'U10\s+Boys', 'U10 Boys'), (r'U10\s+Girls', 'U10 Girls'),
+    (r'U12\s+Boys', 'U12 Boys'), (r'U12\s+Girls', 'U12 Girls'),
+    (r'U14\s+Boys', 'U14 Boys'), (r'U14\s+Girls', 'U14 Girls'),
+    (r'U16\s+Boys', 'U16 Boys'), (r'U16\s+Girls', 'U16 Girls'),
+    (r'U18\s+Men', 'U18 Men'), (r'U18\s+Women', 'U18 Women'),
+    (r'U20\s+Men', 'U20 Men'), (r'U20\s+Women', 'U20 Women'),
+]
+
+UPDATE_DISTANCE_PATTERN = re.compile(r'(\d{3,4})\s*[mM]')
+
+UPDATE_CATEGORY_PATTERNS = [
+    r'(JUNIOR\s+[A-G])',
+    r'(SENIOR\s+(?:MEN|WOMEN))',
+    r'(MASTERS?\s+(?:MEN|WOMEN)\s*\d*)',
+    r'(DIVISION\s+\d+)',
+    r'(NOVICE\s+[AB])',
+    r'((?:MEN|WOMEN|BOYS|GIRLS))',
+]
+
+_batch_distance = ordered_search([p for p, _ in BATCH_DISTANCE_PATTERNS], re.IGNORECASE,
+                                 prefilter=r'\d\s*m')
+_batch_category = ordered_search([p for p, _ in BATCH_CATEGORY_PATTERNS], re.IGNORECASE,
+                                 prefilter=r'Open|Masters|U\d')
+_update_category = ordered_search(UPDATE_CATEGORY_PATTERNS, re.IGNORECASE)
+
+PLACE_LINE_RE = re.compile(r'(\d{1,3})\.?\s+(.+)')
+TRAILING_TIME_RE = re.compile(r'(\d{1,2}:\d{2}\.\d{2,3}|\d{1,2}\.\d{2,3})\s*$')
+
+
+def batch_distance(text: str) -> Optional[int]:
+    """Distance in metres from a parse_uss_batch header line."""
+    found = _batch_distance(text)
+    return BATCH_DISTANCE_PATTERNS[found[0]][1] if found else None
+
+
+def batch_category(text: str) -> Optional[str]:
+    """Category from a parse_uss_batch header line."""
+    found = _batch_category(text)
+    return BATCH_CATEGORY_PATTERNS[found[0]][1] if found else None
+
+
+def update_distance(text: str) -> Optional[int]:
+    """Distance in metres from an update_uss_data header line."""
+    match = UPDATE_DISTANCE_PATTERN.search(text)
+    return int(match.group(1)) if match else None
+
+
+def update_category(text: str) -> Optional[str]:
+    """Category from an update_uss_data header line, upper-cased."""
+    found = _update_category(text)
+    return found[1].upper() if found else None
+
+
+def _classify_place_line(line: str, distance: Optional[int],
+                         category_of: Callable[[str], Optional[str]]) -> Optional[tuple]:
+    """Shared header/result logic of the batch and update grammars.
+
+    RESULT tokens are (RESULT, place, raw time, text between place and time).
+    """
+    if distance in STANDARD_DISTANCES:
+        return DISTANCE, distance, category_of(line)
+
+    # A category only counts as a header when the line does not start with
+    # a digit, so result rows skip the category grammar entirely
+    if not line[:1].isdecimal():
+        category = category_of(line)
+        if category:
+            return CATEGORY, category
+
+    match = PLACE_LINE_RE.match(line)
+    if match:
+        rest = match.group(2)
+        time_match = TRAILING_TIME_RE.search(rest)
+        if time_match:
+            return RESULT, int(match.group(1)), time_match.group(1), rest[:time_match.start()].strip()
+    return None
+
+
+def classify_batch_line(line: str) -> Optional[tuple]:
+    """Classify a stripped line for parse_uss_batch.py."""
+    return _classify_place_line(line, batch_distance(line), batch_category)
+
+
+def classify_update_line(line: str) -> Optional[tuple]:
+    """Classify a stripped line for update_uss_data.py and parse_pdfs_incremental.py."""
+    return _classify_place_line(line, update_distance(line), update_category)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Fuzzy duplicate-skater detection with candidate blocking.
+
+Scoring every pair of names with difflib is quadratic, so only pairs that
+share a block are scored:
+
+- character trigrams of the name (pairs sharing at least MIN_SHARED_GRAMS),
+- a phonetic key per name word (catches 'Katelyn' / 'Caitlin' style
+  spellings whose trigrams differ),
+
+and the pairs that survive a length bound and a shared-letter bound (what
+SequenceMatcher.quick_ratio() computes) are scored with ratio(). Names are
+compared in skater_identity.name_key() form, so word order, STL spacing
+and club suffixes do not count as differences.
+
+    python3 scripts/name_dedup.py [--threshold 0.85] [--top 30]
+"""
+
+import argparse
+import json
+import re
+import time
+from collections import Counter
+from difflib import SequenceMatcher
+from itertools import combinations
+from pathlib import Path
+
+from skater_identity import name_key
+
+DATA_DIR = Path(__file__).parent.parent / 'public' / 'data'
+HISTORY_PATH = DATA_DIR / 'us_historical_results.json'
+PROFILES_PATH = DATA_DIR / 'scraped_profiles' / 'skater_profiles.json'
+
+THRESHOLD = 0.85
+MIN_SHARED_GRAMS = 2
+# Trigrams in more names than this (' jo', 'son') say nothing about a pair
+MAX_GRAM_NAMES = 200
+
+SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(
+    ['aeiouyhw', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r']) for c in letters}
+NON_LETTERS = re.compile(r'[^a-z]')
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def soundex(word: str) -> str:
+    """Four-character Soundex code of a word ('' if it has no letters)."""
+    word = NON_LETTERS.sub('', word.lower())
+    if not word:
+        return ''
+    codes = [SOUNDEX_CODES[c] for c in word]
+    encoded = [word[0].upper()]
+    previous = codes[0]
+    for c, code in zip(word[1:], codes[1:]):
+        if code != '0' and code != previous:
+            encoded.append(code)
+        if c not in 'hw':
+            previous = code
+    return ''.join(encoded + ['0', '0', '0'])[:4]
+
+
+def phonetic_key(text: str) -> str:
+    return ' '.join(sorted(soundex(word) for word in text.split()))
+
+
+def candidate_pairs(keys: list[str]) -> set[tuple[int, int]]:
+    """Index pairs (i < j) of keys that share a trigram block or a phonetic key."""
+    postings = {}
+    grams = []
+    for i, key in enumerate(keys):
+        grams.append(trigrams(key))
+        for gram in grams[i]:
+            postings.setdefault(gram, []).append(i)
+    postings = {gram: ids for gram, ids in postings.items() if len(ids) <= MAX_GRAM_NAMES}
+
+    pairs = set()
+    for i, own in enumerate(grams):
+        shared = Counter(j for gram in own for j in postings.get(gram, ()) if j > i)
+        pairs.update((i, j) for j, count in shared.items() if count >= MIN_SHARED_GRAMS)
+
+    blocks = {}
+    for i, key in enumerate(keys):
+        blocks.setdefault(phonetic_key(key), []).append(i)
+    for ids in blocks.values():
+        if len(ids) <= MAX_GRAM_NAMES:
+            pairs.update(combinations(ids, 2))
+    return pairs
+
+
+def similar_names(names: list[str], threshold: float = THRESHOLD,
+                  include_aliases: bool = False) -> list[tuple[str, str, float]]:
+    """Pairs of distinct names whose keys score above threshold, best first.
+
+    Names with the same key are one skater to skater_identity and are only
+    reported (with score 1.0) if include_aliases is set. Otherwise each key
+    is represented by the first name that has it.
+    """
+    by_key = {}
+    found = []
+    for name in names:
+        key = name_key(name)
+        if not key:
+            continue
+        first = by_key.setdefault(key, name)
+        if include_aliases and first != name and first.lower() != name.lower():
+            found.append((first, name, 1.0))
+    keys = list(by_key)
+
+    letters = [Counter(key) for key in keys]
+    by_second = {}
+    for i, j in candidate_pairs(keys):
+        by_second.setdefault(j, []).append(i)
+
+    matcher = SequenceMatcher(autojunk=False)
+    for j, firsts in by_second.items():
+        b = keys[j]
+        matcher.set_seq2(b)  # SequenceMatcher indexes the second sequence once
+        for i in firsts:
+            a = keys[i]
+            total = len(a) + len(b)
+            # ratio() is at most 2 * min(len) / total, and at most the
+            # share of letters the two have in common (quick_ratio)
+            if 2 * min(len(a), len(b)) <= threshold * total:
+                continue
+            if 2 * sum((letters[i] & letters[j]).values()) <= threshold * total:
+                continue
+            matcher.set_seq1(a)
+            ratio = matcher.ratio()
+            if ratio > threshold:
+                found.append((by_key[a], by_key[b], ratio))
+    found.sort(key=lambda pair: (-pair[2], pair[0], pair[1]))
+    return found
+
+
+def roster_names() -> list[str]:
+    """Skater names of the USS history and the shorttracklive profiles."""
+    names = []
+    with open(HISTORY_PATH) as f:
+        names.extend(r['skater'] for r in json.load(f)['results'] if r.get('skater'))
+    if PROFILES_PATH.exists():
+        with open(PROFILES_PATH) as f:
+            names.extend(p['name'] for p in json.load(f)['profiles'] if p.get('name'))
+    return list(dict.fromkeys(names))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='List likely duplicate skaters')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f'minimum similarity (default: {THRESHOLD})')
+    parser.add_argument('--top', type=int, default=30, help='candidates to print')
+    args = parser.parse_args()
+
+    names = roster_names()
+    started = time.perf_counter()
+    pairs = similar_names(names, args.threshold)
+    elapsed = time.perf_counter() - started
+
+    print(f"{len(names)} names, {len(pairs)} merge candidates in {elapsed * 1000:.0f} ms")
+    for name1, name2, ratio in pairs[:args.top]:
+        print(f"  {ratio:.1%}  {name1!r} <-> {name2!r}")
+
+
+if __name__ == '__main__':
+    main()
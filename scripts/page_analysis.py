@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Single-pass page analysis: line text and table cells from one char layout.
+
+page.extract_text() followed by page.extract_tables() walks the page's
+character stream several times: once for the text map and then, inside
+Table.extract, once per table row over *every* character on the page. Here
+the chars are laid out once, each char is bucketed into its table cell in a
+single sweep, and pdfplumber's per-page caches are flushed straight after so
+a long protocol does not keep every page's objects alive.
+"""
+
+from bisect import bisect_right
+
+from pdfplumber import utils
+
+
+def _char_in_bbox(char: dict, bbox: tuple) -> bool:
+    """Same midpoint rule pdfplumber's Table.extract uses."""
+    v_mid = (char['top'] + char['bottom']) / 2
+    h_mid = (char['x0'] + char['x1']) / 2
+    x0, top, x1, bottom = bbox
+    return x0 <= h_mid < x1 and top <= v_mid < bottom
+
+
+def table_cells(table, chars: list[dict]) -> list[list]:
+    """Extract a pdfplumber Table's cell text from pre-laid-out chars.
+
+    Produces the same cells as table.extract(), but sweeps the page's chars
+    once instead of once per row.
+    """
+    rows = sorted(enumerate(table.rows), key=lambda item: item[1].bbox[1])
+    row_tops = [row.bbox[1] for _, row in rows]
+    max_height = max((row.bbox[3] - row.bbox[1] for _, row in rows), default=0)
+    cell_chars = {}
+
+    for char in chars:
+        v_mid = (char['top'] + char['bottom']) / 2
+        # Only rows starting at or above the char, and no further up than the
+        # tallest row, can contain it
+        i = bisect_right(row_tops, v_mid) - 1
+        while i >= 0 and row_tops[i] >= v_mid - max_height:
+            row_index, row = rows[i]
+            i -= 1
+            if not _char_in_bbox(char, row.bbox):
+                continue
+            for cell_index, cell in enumerate(row.cells):
+                if cell is not None and _char_in_bbox(char, cell):
+                    cell_chars.setdefault((row_index, cell_index), []).append(char)
+
+    # Chars were visited in page order, matching Table.extract's filtering
+    cells = []
+    for row_index, row in enumerate(table.rows):
+        values = []
+        for cell_index, cell in enumerate(row.cells):
+            if cell is None:
+                values.append(None)
+                continue
+            in_cell = cell_chars.get((row_index, cell_index))
+            values.append(utils.extract_text(in_cell) if in_cell else '')
+        cells.append(values)
+    return cells
+
+
+def analyze_page(page, tables: bool = True) -> dict:
+    """Return {'text', 'tables'} for a pdfplumber page and flush its caches."""
+    try:
+        chars = page.chars
+        text = page.extract_text() or ''
+        found = []
+        # The default 'lines' table strategy needs ruling edges; skip the
+        # table finder entirely on pages that have none
+        if tables and page.edges:
+            found = [table_cells(table, chars) for table in page.find_tables()]
+        return {'text': text, 'tables': found}
+    finally:
+        page.close()
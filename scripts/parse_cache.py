@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Persistent parse cache for USS PDFs.
+
+Parsed result records are stored under the SHA-256 of the PDF bytes plus a
+parser-version string, so an unchanged PDF is never handed to pdfplumber
+again. Bump the caller's parser version whenever its parsing rules change
+and every entry is invalidated at once.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+KB_DIR = Path.home() / 'clawd' / 'shorttrack-knowledge-base'
+CACHE_DIR = KB_DIR / 'cache' / 'parsed'
+
+
+def file_sha256(path: Path) -> str:
+    """Hex SHA-256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(digest: str, parser_version: str, cache_dir: Path = CACHE_DIR) -> Path:
+    """Location of the cache entry for a PDF hash and parser version."""
+    return cache_dir / parser_version / digest[:2] / f"{digest}.json"
+
+
+def load_entry(digest: str, parser_version: str, cache_dir: Path = CACHE_DIR) -> Optional[dict]:
+    """Return the cached entry ({'records', 'format', ...}), or None on a miss or unreadable entry."""
+    path = cache_path(digest, parser_version, cache_dir)
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if entry.get('sha256') != digest or entry.get('parser_version') != parser_version:
+        return None
+    return entry
+
+
+def load(digest: str, parser_version: str, cache_dir: Path = CACHE_DIR) -> Optional[list[dict]]:
+    """Return cached records, or None on a miss or unreadable entry."""
+    entry = load_entry(digest, parser_version, cache_dir)
+    return entry['records'] if entry is not None else None
+
+
+def store(digest: str, parser_version: str, records: list[dict], cache_dir: Path = CACHE_DIR,
+          fmt: Optional[str] = None):
+    """Write records (and the PDF's detected format) for a PDF hash, replacing any existing entry atomically."""
+    path = cache_path(digest, parser_version, cache_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    entry = {
+        'sha256': digest,
+        'parser_version': parser_version,
+        'records': records,
+    }
+    if fmt is not None:
+        entry['format'] = fmt
+    with open(tmp_path, 'w') as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
@@ -2,20 +2,29 @@
 """
 Incremental PDF parser - processes PDFs one at a time and saves after each.
 Avoids memory issues with large batch processing.
+
+Each parsed PDF is appended to uss_all_results.journal.jsonl; the journal is
+compacted into uss_all_results.json at the end of the run, or by the next
+run if this one is interrupted.
 """
 
+import argparse
 import json
 import os
 import re
-import gc
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+import pdf_store
+import results_journal
+from line_classifier import CATEGORY, DISTANCE, classify_update_line
+from pdf_pool import default_workers, extract_pdfs
+
 # Paths
 KB_DIR = Path.home() / 'clawd' / 'shorttrack-knowledge-base'
-PDF_DIR = KB_DIR / 'raw_data' / 'uss_pdfs'
 OUTPUT_PATH = KB_DIR / 'processed_data' / 'uss_all_results.json'
+JOURNAL_PATH = results_journal.journal_path(OUTPUT_PATH)
 
 def parse_time(time_str: str) -> Optional[str]:
     """Normalize time format."""
@@ -36,95 +45,54 @@ def parse_time(time_str: str) -> Optional[str]:
     
     return time_str if time_str else None
 
-def extract_distance(text: str) -> Optional[int]:
-    """Extract distance from text."""
-    match = re.search(r'(\d{3,4})\s*[mM]', text)
-    if match:
-        return int(match.group(1))
-    return None
-
-def extract_category(text: str) -> Optional[str]:
-    """Extract category/class from text."""
-    patterns = [
-        r'(JUNIOR\s+[A-G])',
-        r'(SENIOR\s+(?:MEN|WOMEN))',
-        r'(MASTERS?\s+(?:MEN|WOMEN)\s*\d*)',
-        r'(DIVISION\s+\d+)',
-        r'(NOVICE\s+[AB])',
-        r'((?:MEN|WOMEN|BOYS|GIRLS))',
-    ]
-    for p in patterns:
-        match = re.search(p, text, re.IGNORECASE)
-        if match:
-            return match.group(1).upper()
-    return None
-
-def parse_pdf(filepath: Path, comp_name: str, comp_date: str) -> list[dict]:
-    """Parse a single PDF and extract results."""
-    import pdfplumber
-    
+def parse_pages(pages: list[dict], comp_name: str, comp_date: str) -> list[dict]:
+    """Parse the extracted pages of a single PDF into results."""
     results = []
+    current_distance = None
+    current_category = None
     
-    try:
-        with pdfplumber.open(filepath) as pdf:
-            current_distance = None
-            current_category = None
+    for page in pages:
+        text = page['text']
+        if not text:
+            continue
+        
+        for line in text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
             
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text:
-                    continue
+            token = classify_update_line(line)
+            if token is None:
+                continue
+            
+            # Distance header, possibly with the category on the same line
+            if token[0] == DISTANCE:
+                current_distance = token[1]
+                if token[2]:
+                    current_category = token[2]
+            # Category header
+            elif token[0] == CATEGORY:
+                current_category = token[1]
+            # Result line: place, time and the text between them
+            elif current_distance:
+                _, place, raw_time, name_part = token
+                time_str = parse_time(raw_time)
+                
+                # Extract name (remove bib numbers, club codes)
+                name_parts = name_part.split()
+                name_tokens = [p for p in name_parts if not p.isdigit() and len(p) > 3]
+                name = ' '.join(name_tokens[:3]) if name_tokens else name_part
                 
-                for line in text.split('\n'):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Check for distance header
-                    dist = extract_distance(line)
-                    if dist and dist in [222, 333, 500, 777, 1000, 1500, 3000]:
-                        current_distance = dist
-                        cat = extract_category(line)
-                        if cat:
-                            current_category = cat
-                        continue
-                    
-                    # Check for category header
-                    cat = extract_category(line)
-                    if cat and not re.match(r'^\d', line):
-                        current_category = cat
-                        continue
-                    
-                    # Try to parse as result line (starts with place number)
-                    match = re.match(r'^(\d{1,3})\.?\s+(.+)', line)
-                    if match and current_distance:
-                        place = int(match.group(1))
-                        rest = match.group(2)
-                        
-                        # Find time (last number with decimal)
-                        time_match = re.search(r'(\d{1,2}:\d{2}\.\d{2,3}|\d{1,2}\.\d{2,3})\s*$', rest)
-                        if time_match:
-                            time_str = parse_time(time_match.group(1))
-                            name_part = rest[:time_match.start()].strip()
-                            
-                            # Extract name (remove bib numbers, club codes)
-                            name_parts = name_part.split()
-                            name_tokens = [p for p in name_parts if not p.isdigit() and len(p) > 3]
-                            name = ' '.join(name_tokens[:3]) if name_tokens else name_part
-                            
-                            if name and time_str:
-                                results.append({
-                                    'rank': place,
-                                    'skater': name,
-                                    'time': time_str,
-                                    'distance': f"{current_distance}m",
-                                    'category': current_category or 'Unknown',
-                                    'competition': comp_name,
-                                    'date': comp_date,
-                                })
-    
-    except Exception as e:
-        print(f"    Error parsing {filepath.name}: {e}")
+                if name and time_str:
+                    results.append({
+                        'rank': place,
+                        'skater': name,
+                        'time': time_str,
+                        'distance': f"{current_distance}m",
+                        'category': current_category or 'Unknown',
+                        'competition': comp_name,
+                        'date': comp_date,
+                    })
     
     return results
 
@@ -149,70 +117,86 @@ def get_pdf_date(filename: str) -> Optional[str]:
     return None
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes for PDF extraction (0 = all cores)')
+    args = parser.parse_args()
+    workers = args.workers or default_workers()
+    
     print("=" * 60)
     print("Incremental PDF Parser")
     print("=" * 60)
     
-    # Get all PDFs
-    pdfs = sorted(PDF_DIR.glob('*.pdf'))
+    # Get every distinct PDF in the store
+    docs = {doc['path']: doc for doc in pdf_store.documents()}
+    pdfs = list(docs)
     print(f"Found {len(pdfs)} PDFs to parse")
     
-    # Load existing results if any
-    all_results = []
-    all_competitions = []
+    # Competitions already saved, plus any journaled by an interrupted run
     processed_pdfs = set()
     
     if OUTPUT_PATH.exists():
         try:
             with open(OUTPUT_PATH) as f:
                 existing = json.load(f)
-            all_results = existing.get('results', [])
-            all_competitions = existing.get('competitions', [])
-            processed_pdfs = {c['name'] for c in all_competitions}
-            print(f"Loaded {len(all_results)} existing results from {len(all_competitions)} competitions")
+            processed_pdfs = {c['name'] for c in existing.get('competitions', [])}
+            print(f"Loaded {len(existing.get('results', []))} existing results from {len(processed_pdfs)} competitions")
+            del existing
         except:
             pass
     
-    # Process each PDF
+    journaled = results_journal.competition_names(JOURNAL_PATH)
+    if journaled:
+        print(f"Resuming: {len(journaled)} competitions in {JOURNAL_PATH.name}")
+        processed_pdfs.update(journaled)
+    
+    # Skip already processed PDFs before handing the rest to the workers
+    pending = []
     for i, pdf_path in enumerate(pdfs):
-        comp_name = pdf_path.stem.replace('_', ' ')
-        
-        # Skip if already processed
+        comp_name = Path(docs[pdf_path]['filename']).stem.replace('_', ' ')
         if comp_name in processed_pdfs:
             print(f"  [{i+1}/{len(pdfs)}] Skip (exists): {comp_name[:50]}")
             continue
+        pending.append(pdf_path)
+    
+    print(f"Parsing {len(pending)} PDFs with {workers} worker(s)")
+    
+    # Process each PDF; every competition is checkpointed as soon as it is parsed
+    extracted = extract_pdfs(pending, workers=workers)
+    for i, (pdf_path, pages, elapsed, error) in enumerate(extracted):
+        doc = docs[pdf_path]
+        comp_name = Path(doc['filename']).stem.replace('_', ' ')
+        comp_date = doc['date'] or get_pdf_date(doc['filename'])
         
-        comp_date = get_pdf_date(pdf_path.name)
-        
-        print(f"  [{i+1}/{len(pdfs)}] Parsing: {comp_name[:50]}...", end='', flush=True)
+        print(f"  [{i+1}/{len(pending)}] Parsing: {comp_name[:50]}...", end='', flush=True)
+        if error:
+            print(f"    Error parsing {doc['filename']}: {error}")
         
-        results = parse_pdf(pdf_path, comp_name, comp_date)
+        results = parse_pages(pages, comp_name, comp_date)
         
         if results:
-            all_results.extend(results)
-            all_competitions.append({
+            results_journal.append(JOURNAL_PATH, {
                 'name': comp_name,
                 'date': comp_date,
                 'result_count': len(results)
-            })
+            }, results)
             processed_pdfs.add(comp_name)
-            print(f" {len(results)} results")
-            
-            # Save after every 10 PDFs
-            if (i + 1) % 10 == 0:
-                save_results(all_results, all_competitions)
-                gc.collect()  # Force garbage collection
+            print(f" {len(results)} results ({elapsed:.1f}s)")
         else:
-            print(" 0 results")
+            print(f" 0 results ({elapsed:.1f}s)")
     
-    # Final save
-    save_results(all_results, all_competitions)
+    # Fold the journal into the output file
+    data = results_journal.compact(JOURNAL_PATH, OUTPUT_PATH, build=build_output, indent=2)
+    print(f"    [Saved: {len(data['results'])} results]")
     print(f"\n{'=' * 60}")
-    print(f"Done! Total: {len(all_results)} results from {len(all_competitions)} competitions")
+    print(f"Done! Total: {len(data['results'])} results from {len(data['competitions'])} competitions")
     print(f"{'=' * 60}")
 
-def save_results(results, competitions):
-    """Save results to JSON."""
+def build_output(data: dict) -> dict:
+    """Build the output JSON from the compacted competitions and results."""
+    results = data['results']
+    competitions = data['competitions']
+    
     # Determine seasons
     seasons = set()
     for r in results:
@@ -227,7 +211,7 @@ def save_results(results, competitions):
             except:
                 pass
     
-    output = {
+    return {
         'source': 'US Speed Skating PDF archives',
         'scraped_at': datetime.now().isoformat(),
         'seasons': sorted(seasons),
@@ -236,11 +220,6 @@ def save_results(results, competitions):
         'competitions': competitions,
         'results': results,
     }
-    
-    with open(OUTPUT_PATH, 'w') as f:
-        json.dump(output, f, indent=2)
-    
-    print(f"    [Saved: {len(results)} results]")
 
 if __name__ == '__main__':
     main()
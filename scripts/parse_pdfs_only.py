@@ -1,15 +1,17 @@
 #!/usr/bin/env python3
-"""Parse all downloaded USS PDFs without re-downloading."""
+"""Parse all USS PDFs in the PDF store without re-downloading."""
 
+import argparse
 import json
 import re
 import sys
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
-import pdfplumber
 
-PDF_DIR = Path.home() / 'clawd' / 'shorttrack-knowledge-base' / 'raw_data' / 'uss_pdfs'
+import pdf_store
+from pdf_pool import default_workers, extract_page_range, extract_pdfs
+
 OUTPUT_PATH = Path(__file__).parent.parent / 'data' / 'uss_all_results.json'
 
 def parse_time_to_seconds(time_str: str) -> Optional[float]:
@@ -29,67 +31,77 @@ def parse_time_to_seconds(time_str: str) -> Optional[float]:
     except:
         return None
 
-def parse_pdf(pdf_path: Path) -> list[dict]:
-    """Parse a USS results PDF."""
+def parse_tables(pages: list[dict]) -> list[dict]:
+    """Parse the extracted tables of a USS results PDF."""
     results = []
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                tables = page.extract_tables()
-                for table in tables:
-                    if not table or len(table) < 2:
-                        continue
-                    header = [str(c).lower() if c else '' for c in table[0]]
-                    
-                    # Find column indices
-                    rank_col = next((i for i, h in enumerate(header) if 'rank' in h or 'place' in h or h == '#'), None)
-                    name_col = next((i for i, h in enumerate(header) if 'name' in h or 'skater' in h), None)
-                    time_col = next((i for i, h in enumerate(header) if 'time' in h or 'result' in h), None)
-                    
-                    if name_col is None:
-                        continue
-                    
-                    for row in table[1:]:
-                        if not row or len(row) <= name_col:
-                            continue
-                        name = row[name_col]
-                        if not name or not isinstance(name, str):
-                            continue
-                        name = name.strip()
-                        if not name or len(name) < 2:
-                            continue
-                        # Skip header-like rows
-                        if name.lower() in ['name', 'skater', 'athlete']:
-                            continue
-                        
-                        result = {'skater': name}
-                        
-                        if rank_col is not None and len(row) > rank_col and row[rank_col]:
-                            try:
-                                result['rank'] = int(re.sub(r'[^\d]', '', str(row[rank_col])))
-                            except:
-                                pass
-                        
-                        if time_col is not None and len(row) > time_col and row[time_col]:
-                            result['time'] = str(row[time_col]).strip()
-                        
-                        results.append(result)
-    except Exception as e:
-        print(f"  Error parsing {pdf_path.name}: {e}", file=sys.stderr)
+    for page in pages:
+        for table in page['tables']:
+            if not table or len(table) < 2:
+                continue
+            header = [str(c).lower() if c else '' for c in table[0]]
+            
+            # Find column indices
+            rank_col = next((i for i, h in enumerate(header) if 'rank' in h or 'place' in h or h == '#'), None)
+            name_col = next((i for i, h in enumerate(header) if 'name' in h or 'skater' in h), None)
+            time_col = next((i for i, h in enumerate(header) if 'time' in h or 'result' in h), None)
+            
+            if name_col is None:
+                continue
+            
+            for row in table[1:]:
+                if not row or len(row) <= name_col:
+                    continue
+                name = row[name_col]
+                if not name or not isinstance(name, str):
+                    continue
+                name = name.strip()
+                if not name or len(name) < 2:
+                    continue
+                # Skip header-like rows
+                if name.lower() in ['name', 'skater', 'athlete']:
+                    continue
+                
+                result = {'skater': name}
+                
+                if rank_col is not None and len(row) > rank_col and row[rank_col]:
+                    try:
+                        result['rank'] = int(re.sub(r'[^\d]', '', str(row[rank_col])))
+                    except:
+                        pass
+                
+                if time_col is not None and len(row) > time_col and row[time_col]:
+                    result['time'] = str(row[time_col]).strip()
+                
+                results.append(result)
     
     return results
 
+def parse_pdf(pdf_path: Path) -> list[dict]:
+    """Parse a USS results PDF."""
+    pages, _, error = extract_page_range(pdf_path, 0, None, tables=True)
+    if error:
+        print(f"  Error parsing {pdf_path.name}: {error}", file=sys.stderr)
+    return parse_tables(pages)
+
 def main():
-    print(f"Parsing PDFs from {PDF_DIR}")
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes for PDF extraction (0 = all cores)')
+    args = parser.parse_args()
+    workers = args.workers or default_workers()
+    
+    print(f"Parsing PDFs from {pdf_store.STORE_DIR}")
     
-    pdf_files = sorted(PDF_DIR.glob("*.pdf"))
-    print(f"Found {len(pdf_files)} PDFs")
+    docs = {doc['path']: doc for doc in pdf_store.documents()}
+    pdf_files = list(docs)
+    print(f"Found {len(pdf_files)} PDFs, parsing with {workers} worker(s)")
     
     all_results = []
     competitions = []
     
-    for i, pdf_path in enumerate(pdf_files):
-        name = pdf_path.stem.replace('_', ' ')
+    extracted = extract_pdfs(pdf_files, workers=workers, tables=True)
+    for i, (pdf_path, pages, elapsed, error) in enumerate(extracted):
+        name = Path(docs[pdf_path]['filename']).stem.replace('_', ' ')
         
         # Extract date from filename if present
         date_match = re.search(r'(\d{4})[-_]?(\d{2})[-_]?(\d{2})?', name)
@@ -108,7 +120,9 @@ def main():
             # Season runs Sep-Aug
             season = f"{year-1}-{year}" if 'jan' in name.lower() or 'feb' in name.lower() or 'mar' in name.lower() else f"{year}-{year+1}"
         
-        results = parse_pdf(pdf_path)
+        if error:
+            print(f"  Error parsing {docs[pdf_path]['filename']}: {error}", file=sys.stderr)
+        results = parse_tables(pages)
         
         # Add metadata to results
         for r in results:
@@ -128,7 +142,7 @@ def main():
                 'result_count': len(results)
             })
         
-        print(f"  [{i+1}/{len(pdf_files)}] {name[:40]}: {len(results)} results")
+        print(f"  [{i+1}/{len(pdf_files)}] {name[:40]}: {len(results)} results ({elapsed:.1f}s)")
         sys.stdout.flush()
     
     # Build output
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """
 Parse remaining PDFs one at a time, appending to existing results.
+
+Results are checkpointed per PDF to uss_all_results.journal.jsonl and
+merged into uss_all_results.json when the run finishes.
 """
 
 import json
@@ -10,16 +13,19 @@ from datetime import datetime
 from pathlib import Path
 import subprocess
 
+import pdf_store
+import results_journal
+import text_cache
+
 KB_DIR = Path.home() / 'clawd' / 'shorttrack-knowledge-base'
-PDF_DIR = KB_DIR / 'raw_data' / 'uss_pdfs'
 OUTPUT = KB_DIR / 'processed_data' / 'uss_all_results.json'
+JOURNAL = results_journal.journal_path(OUTPUT)
 
 def extract_text_from_pdf(pdf_path: Path) -> str:
-    """Extract text from PDF using pdfminer."""
+    """Extract text from PDF using pdfminer, via the page text store."""
     try:
-        from pdfminer.high_level import extract_text
-        text = extract_text(str(pdf_path))
-        return text
+        pages = text_cache.read_pages(pdf_path, engine='pdfminer')
+        return ''.join(page['text'] + '\f' for page in pages)
     except Exception as e:
         print(f"  Error extracting {pdf_path.name}: {e}")
         return ""
@@ -138,44 +144,50 @@ def main():
     
     existing_comps = {c['name'].lower() for c in data.get('competitions', [])}
     print(f"Existing competitions: {len(existing_comps)}")
+    del data
+    
+    # Competitions journaled by an interrupted run count as processed
+    journaled = results_journal.competition_names(JOURNAL)
+    if journaled:
+        print(f"Resuming: {len(journaled)} competitions in {JOURNAL.name}")
+        existing_comps.update(name.lower() for name in journaled)
     
     # Find unprocessed PDFs
-    all_pdfs = sorted(PDF_DIR.glob('*.pdf'))
+    all_docs = pdf_store.documents()
     unprocessed = []
-    for pdf in all_pdfs:
-        comp_name = get_competition_name(pdf.name).lower()
+    for doc in all_docs:
+        comp_name = get_competition_name(doc['filename']).lower()
         # Check if already processed (fuzzy match)
         if not any(comp_name[:20] in ec or ec[:20] in comp_name for ec in existing_comps):
-            unprocessed.append(pdf)
+            unprocessed.append(doc)
     
     print(f"Unprocessed PDFs: {len(unprocessed)}")
     
-    if not unprocessed:
+    if not unprocessed and not journaled:
         print("All PDFs already processed!")
         return
     
-    # Process each PDF
-    new_results = []
-    new_comps = []
+    # Process each PDF, checkpointing it to the journal straight away
+    new_results = 0
     
-    for i, pdf in enumerate(unprocessed):
-        comp_name = get_competition_name(pdf.name)
+    for i, doc in enumerate(unprocessed):
+        comp_name = get_competition_name(doc['filename'])
         print(f"[{i+1}/{len(unprocessed)}] {comp_name}...")
         
-        text = extract_text_from_pdf(pdf)
+        text = extract_text_from_pdf(doc['path'])
         if not text:
             continue
         
-        date = parse_competition_date(pdf.name, text)
+        date = doc['date'] or parse_competition_date(doc['filename'], text)
         results = parse_results_from_text(text, comp_name, date)
         
         if results:
-            new_results.extend(results)
-            new_comps.append({
+            results_journal.append(JOURNAL, {
                 'name': comp_name,
                 'date': date,
                 'result_count': len(results)
-            })
+            }, results)
+            new_results += len(results)
             print(f"  -> {len(results)} results")
         else:
             print(f"  -> No results parsed")
@@ -185,19 +197,18 @@ def main():
         gc.collect()
     
     # Merge with existing
-    print(f"\nMerging {len(new_results)} new results...")
-    data['results'].extend(new_results)
-    data['competitions'].extend(new_comps)
-    data['total_results'] = len(data['results'])
-    data['total_competitions'] = len(data['competitions'])
-    data['scraped_at'] = datetime.now().isoformat()
-    
-    # Save
+    print(f"\nMerging {new_results} new results...")
     print(f"Saving to {OUTPUT}...")
-    with open(OUTPUT, 'w') as f:
-        json.dump(data, f)
+    data = results_journal.compact(JOURNAL, OUTPUT, build=update_totals)
     
     print(f"Done! Total: {data['total_results']} results, {data['total_competitions']} competitions")
 
+def update_totals(data: dict) -> dict:
+    """Refresh totals and timestamp after journal entries are merged."""
+    data['total_results'] = len(data['results'])
+    data['total_competitions'] = len(data['competitions'])
+    data['scraped_at'] = datetime.now().isoformat()
+    return data
+
 if __name__ == '__main__':
     main()
@@ -4,11 +4,11 @@ Parse US Speed Skating Short Track PDFs for 2017-2019 seasons
 Extracts: competitor name, club, category, distance, time, place
 """
 
+import argparse
 import json
-import os
 import re
 import sys
-import tempfile
+import time
 import traceback
 from datetime import datetime
 from pathlib import Path
@@ -17,8 +17,11 @@ from functools import partial
 # Make print flush immediately
 print = partial(print, flush=True)
 
-import pdfplumber
-import requests
+import pdf_format
+import pdf_pipeline
+import pdf_store
+import text_cache
+from line_classifier import CATEGORY, DISTANCE, classify_us_line
 
 # Target seasons for 2017-2019
 TARGET_SEASONS = ["2018-2019", "2017-2018", "unknown"]
@@ -42,31 +45,6 @@ def load_catalog(catalog_path):
     
     return competitions
 
-def download_pdf(url, temp_dir):
-    """Download PDF to temp directory, return path."""
-    try:
-        # Fix malformed URLs
-        if "https://assets.contentstack.io" in url and "https://www.usspeedskating.org" in url:
-            url = url.split("https://assets.contentstack.io")[1]
-            url = "https://assets.contentstack.io" + url
-        
-        response = requests.get(url, timeout=60)
-        response.raise_for_status()
-        
-        # Extract filename from URL
-        filename = url.split("/")[-1]
-        if not filename.endswith(".pdf"):
-            filename = "temp.pdf"
-        
-        filepath = os.path.join(temp_dir, filename)
-        with open(filepath, 'wb') as f:
-            f.write(response.content)
-        
-        return filepath
-    except Exception as e:
-        print(f"  Error downloading: {e}")
-        return None
-
 def normalize_time(time_str):
     """Normalize time format to mm:ss.xxx or ss.xxx"""
     if not time_str:
@@ -101,196 +79,70 @@ def parse_name(name_str):
     
     return name_str
 
-def extract_distance_from_text(text):
-    """Extract distance from text (e.g., '500m', '1000m', '1500m')"""
-    patterns = [
-        r'(\d{3,4})\s*[mM](?:eters?)?',  # 500m, 1000m, 1500m
-        r'(\d{3,4})\s*[mM]\s+(?:Final|Heat|Quarter|Semi)',
-        r'Distance[:\s]+(\d{3,4})',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
-        if match:
-            dist = match.group(1)
-            return f"{dist}m"
-    
-    return None
-
-def extract_category_from_text(text):
-    """Extract category/age group from text."""
-    # Common category patterns
-    patterns = [
-        r'(Senior\s+(?:Men|Women|Ladies))',
-        r'(Junior\s+(?:Men|Women|Ladies|Boys|Girls))',
-        r'(Masters?\s+(?:Men|Women|Ladies)\s*\d*)',
-        r'((?:Midget|Juvenile|Intermediate|Novice)\s+(?:Boys|Girls))',
-        r'(Open\s+(?:Men|Women))',
-        r'((?:U|Under)\s*\d+\s*(?:Men|Women|Boys|Girls)?)',
-        r'(Men|Women|Boys|Girls)(?:\s+\d+)?',
-        r'(\d+(?:\+|-)?\s*(?:Men|Women))',
-    ]
+def iter_races(pdf_path):
+    """Yield race blocks as the PDF's pages are read.
     
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(1).strip()
-    
-    return None
-
-def is_result_line(text):
-    """Check if line looks like a result line (has place number at start)."""
-    if not text or len(text.strip()) < 5:
-        return False
-    
-    # Start with a number (place)
-    stripped = text.strip()
-    if re.match(r'^\d{1,2}[\s\.]', stripped):
-        return True
-    
-    return False
-
-def parse_result_line(line, current_distance=None, current_category=None):
-    """Parse a single result line."""
-    if not line:
-        return None
-    
-    line = line.strip()
-    
-    # Common patterns for result lines:
-    # 1 LASTNAME Firstname    CLUB    42.123
-    # 1. LASTNAME Firstname   CLUB    42.123
-    # 1  123  LASTNAME Firstname  CLUB  42.123  (with bib number)
-    
-    # Try to extract components
-    parts = line.split()
-    if len(parts) < 3:
-        return None
-    
-    result = {
-        "place": None,
-        "name": None,
-        "club": None,
-        "time": None,
-    }
-    
-    # First part should be place
-    place_match = re.match(r'^(\d{1,2})\.?$', parts[0])
-    if place_match:
-        result["place"] = int(place_match.group(1))
-    else:
-        return None
-    
-    # Find time (usually last numeric-looking value with decimal)
-    time_idx = None
-    for i in range(len(parts) - 1, 0, -1):
-        p = parts[i]
-        if re.match(r'^\d{1,2}:\d{2}\.\d{2,3}$', p) or re.match(r'^\d{1,2}\.\d{2,3}$', p):
-            result["time"] = normalize_time(p)
-            time_idx = i
-            break
-        elif p.upper() in ['DNS', 'DNF', 'DQ', 'ADV', 'PN', 'YC', 'RC']:
-            result["time"] = p.upper()
-            time_idx = i
-            break
-    
-    # Skip bib number if present (usually 2nd or 3rd position)
-    name_start = 1
-    if len(parts) > 3 and parts[1].isdigit() and len(parts[1]) <= 4:
-        name_start = 2
-    
-    # Find club (usually 3-5 char uppercase string before time)
-    club_idx = None
-    name_end = time_idx if time_idx else len(parts)
-    
-    for i in range(name_end - 1, name_start, -1):
-        p = parts[i]
-        # Club patterns: PTSC, SSSC, SSC, WWSC, etc.
-        if re.match(r'^[A-Z]{2,6}$', p) and not p.upper() in ['DNS', 'DNF', 'DQ', 'ADV']:
-            result["club"] = p
-            club_idx = i
-            name_end = i
-            break
-    
-    # Name is between name_start and name_end
-    if name_end > name_start:
-        name_parts = parts[name_start:name_end]
-        result["name"] = " ".join(name_parts)
-    
-    # Validate result
-    if result["place"] and result["name"] and len(result["name"]) > 2:
-        return result
-    
-    return None
-
-def parse_pdf_with_pdfplumber(pdf_path):
-    """Parse PDF using pdfplumber - works well for most formats."""
-    races = []
+    Distance and category state carries across page boundaries, and a race
+    is yielded as soon as the next distance or category header closes it, so
+    only the current page and race are held in memory.
+    """
     current_distance = None
     current_category = None
     current_results = []
     
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            full_text = ""
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    full_text += text + "\n"
+    for page in text_cache.iter_pages(pdf_path):
+        for line in page['text'].split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            
+            token = classify_us_line(line)
+            if token is None:
+                continue
             
-            lines = full_text.split('\n')
+            if token[0] == DISTANCE:
+                # Emit previous race if exists
+                if current_distance and current_results:
+                    yield {
+                        "distance": current_distance,
+                        "category": current_category or "Unknown",
+                        "results": current_results
+                    }
+                current_distance = token[1]
+                current_results = []
+                # Category from the same line, if any
+                if token[2]:
+                    current_category = token[2]
             
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check for distance header
-                new_distance = extract_distance_from_text(line)
-                if new_distance:
-                    # Save previous race if exists
-                    if current_distance and current_results:
-                        races.append({
-                            "distance": current_distance,
-                            "category": current_category or "Unknown",
-                            "results": current_results
-                        })
-                    current_distance = new_distance
+            elif token[0] == CATEGORY:
+                # Emit previous race if distance changes
+                if current_results and current_distance:
+                    yield {
+                        "distance": current_distance,
+                        "category": current_category or "Unknown",
+                        "results": current_results
+                    }
                     current_results = []
-                    # Try to get category from same line
-                    cat = extract_category_from_text(line)
-                    if cat:
-                        current_category = cat
-                    continue
-                
-                # Check for category line
-                new_category = extract_category_from_text(line)
-                if new_category and not new_distance:
-                    # Save previous race if distance changes
-                    if current_results and current_distance:
-                        races.append({
-                            "distance": current_distance,
-                            "category": current_category or "Unknown",
-                            "results": current_results
-                        })
-                        current_results = []
-                    current_category = new_category
-                    continue
-                
-                # Try to parse as result line
-                if is_result_line(line):
-                    result = parse_result_line(line)
-                    if result:
-                        current_results.append(result)
+                current_category = token[1]
             
-            # Don't forget last race
-            if current_distance and current_results:
-                races.append({
-                    "distance": current_distance,
-                    "category": current_category or "Unknown",
-                    "results": current_results
-                })
+            else:
+                current_results.append(token[1])
+    
+    # Don't forget last race
+    if current_distance and current_results:
+        yield {
+            "distance": current_distance,
+            "category": current_category or "Unknown",
+            "results": current_results
+        }
+
+def parse_pdf_with_pdfplumber(pdf_path):
+    """Parse PDF using pdfplumber - works well for most formats."""
+    races = []
     
+    try:
+        for race in iter_races(pdf_path):
+            races.append(race)
     except Exception as e:
         print(f"  Error parsing PDF: {e}")
         traceback.print_exc()
@@ -302,68 +154,67 @@ def parse_pdf_tables(pdf_path):
     races = []
     
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages):
-                # First try to find tables
-                tables = page.extract_tables()
-                
-                if tables:
-                    for table in tables:
-                        if not table or len(table) < 2:
+        for page in text_cache.read_pages(pdf_path, tables=True):
+            # First try to find tables
+            tables = page['tables']
+            
+            if tables:
+                for table in tables:
+                    if not table or len(table) < 2:
+                        continue
+                    
+                    # Try to identify header row and structure
+                    header = table[0] if table else []
+                    
+                    # Look for common header patterns
+                    place_col = None
+                    name_col = None
+                    club_col = None
+                    time_col = None
+                    
+                    for i, h in enumerate(header):
+                        if not h:
                             continue
-                        
-                        # Try to identify header row and structure
-                        header = table[0] if table else []
-                        
-                        # Look for common header patterns
-                        place_col = None
-                        name_col = None
-                        club_col = None
-                        time_col = None
-                        
-                        for i, h in enumerate(header):
-                            if not h:
+                        h_lower = str(h).lower()
+                        if any(x in h_lower for x in ['place', 'rank', 'pos', '#']):
+                            place_col = i
+                        elif any(x in h_lower for x in ['name', 'skater', 'athlete']):
+                            name_col = i
+                        elif any(x in h_lower for x in ['club', 'team', 'aff']):
+                            club_col = i
+                        elif any(x in h_lower for x in ['time', 'result']):
+                            time_col = i
+                    
+                    # If we found structure, extract results
+                    if place_col is not None and name_col is not None:
+                        results = []
+                        for row in table[1:]:
+                            if len(row) <= max(place_col, name_col):
                                 continue
-                            h_lower = str(h).lower()
-                            if any(x in h_lower for x in ['place', 'rank', 'pos', '#']):
-                                place_col = i
-                            elif any(x in h_lower for x in ['name', 'skater', 'athlete']):
-                                name_col = i
-                            elif any(x in h_lower for x in ['club', 'team', 'aff']):
-                                club_col = i
-                            elif any(x in h_lower for x in ['time', 'result']):
-                                time_col = i
-                        
-                        # If we found structure, extract results
-                        if place_col is not None and name_col is not None:
-                            results = []
-                            for row in table[1:]:
-                                if len(row) <= max(place_col, name_col):
-                                    continue
-                                
-                                try:
-                                    place = int(row[place_col]) if row[place_col] else None
-                                except:
-                                    continue
-                                
-                                name = row[name_col] if name_col < len(row) else None
-                                club = row[club_col] if club_col and club_col < len(row) else None
-                                time = row[time_col] if time_col and time_col < len(row) else None
-                                
-                                if place and name:
-                                    results.append({
-                                        "place": place,
-                                        "name": str(name).strip(),
-                                        "club": str(club).strip() if club else None,
-                                        "time": normalize_time(str(time)) if time else None
-                                    })
                             
-                            if results:
-                                races.append({
-                                    "distance": "Unknown",
-                                    "category": "Unknown",
-                                    "results": results
+                            try:
+                                place = int(row[place_col]) if row[place_col] else None
+                            except:
+                                continue
+                            
+                            name = row[name_col] if name_col < len(row) else None
+                            club = row[club_col] if club_col and club_col < len(row) else None
+                            time = row[time_col] if time_col and time_col < len(row) else None
+                            
+                            if place and name:
+                                results.append({
+                                    "place": place,
+                                    "name": str(name).strip(),
+                                    "club": str(club).strip() if club else None,
+                                    "time": normalize_time(str(time)) if time else None
                                 })
+                        
+                        if results:
+                            races.append({
+                                "distance": "Unknown",
+                                "category": "Unknown",
+                                "results": results
+                            })
     
     except Exception as e:
         print(f"  Table extraction error: {e}")
@@ -371,19 +222,42 @@ def parse_pdf_tables(pdf_path):
     return races
 
 def parse_competition_pdf(pdf_path, comp_name):
-    """Parse a competition PDF and extract all races."""
-    print(f"  Parsing: {os.path.basename(pdf_path)}")
+    """Parse a competition PDF and extract all races.
     
-    # Try text-based parsing first
-    races = parse_pdf_with_pdfplumber(pdf_path)
+    Returns (races, format). The format detected from the first pages picks
+    the parser: ruled tables go to the table parser, everything else to the
+    line parser.
+    """
+    fmt = pdf_format.detect_format(pdf_path)
     
-    # If we got no results, try table-based parsing
-    if not races:
+    if fmt == pdf_format.TABULAR:
         races = parse_pdf_tables(pdf_path)
+    else:
+        races = parse_pdf_with_pdfplumber(pdf_path)
     
-    return races
+    return races, fmt
+
+def fetch_competition(comp):
+    """I/O stage: fetch a competition's PDF into the PDF store, return its path."""
+    if not comp.get("pdf_url"):
+        return None
+    return pdf_store.fetch_one(comp["pdf_url"], comp.get("name", "Unknown"),
+                               comp.get("date"), comp.get("season"))
+
+def parse_downloaded(pdf_path):
+    """CPU stage, run in a worker process. Returns (races, format, seconds)."""
+    started = time.perf_counter()
+    races, fmt = parse_competition_pdf(pdf_path, None)
+    return races, fmt, time.perf_counter() - started
 
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes for PDF parsing (0 = all cores)')
+    parser.add_argument('--downloads', type=int, default=pdf_pipeline.DOWNLOADS,
+                        help='concurrent downloads kept ahead of the parse workers')
+    args = parser.parse_args()
+    
     # Paths
     base_dir = Path("/Users/garychen/dev/shorttrack-analytics")
     catalog_path = base_dir / "data" / "us_pdf_catalog.json"
@@ -402,56 +276,60 @@ def main():
     total_races = 0
     total_results = 0
     failed = []
-    
-    with tempfile.TemporaryDirectory() as temp_dir:
-        for i, comp in enumerate(competitions):
-            name = comp.get("name", "Unknown")
-            date = comp.get("date")
-            pdf_url = comp.get("pdf_url")
-            season = comp.get("season")
-            comp_type = comp.get("type", "unknown")
-            
-            print(f"\n[{i+1}/{len(competitions)}] {name} ({season})")
-            
-            if not pdf_url:
-                print("  No PDF URL, skipping")
-                failed.append({"name": name, "reason": "No PDF URL"})
-                continue
-            
-            # Download PDF
-            pdf_path = download_pdf(pdf_url, temp_dir)
-            if not pdf_path:
-                failed.append({"name": name, "reason": "Download failed"})
-                continue
-            
-            # Parse PDF
-            races = parse_competition_pdf(pdf_path, name)
-            
-            if not races:
-                print(f"  Warning: No races extracted")
-                failed.append({"name": name, "reason": "No races extracted"})
-            else:
-                race_count = len(races)
-                result_count = sum(len(r.get("results", [])) for r in races)
-                print(f"  Extracted {race_count} races, {result_count} results")
-                total_races += race_count
-                total_results += result_count
-            
-            # Add to output
-            all_competitions.append({
-                "date": date,
-                "name": name,
-                "season": season,
-                "type": comp_type,
-                "pdf_url": pdf_url,
-                "races": races
-            })
-            
-            # Clean up
-            try:
-                os.remove(pdf_path)
-            except:
-                pass
+    format_stats = pdf_format.new_stats()
+    
+    # PDFs are fetched in threads while worker processes parse earlier ones;
+    # they stay in the store, so a re-run skips the downloads
+    stages = pdf_pipeline.pipeline(competitions, fetch_competition, parse_downloaded,
+                                   workers=args.workers, downloads=args.downloads)
+    for i, (comp, pdf_path, parsed, error) in enumerate(stages):
+        name = comp.get("name", "Unknown")
+        date = comp.get("date")
+        pdf_url = comp.get("pdf_url")
+        season = comp.get("season")
+        comp_type = comp.get("type", "unknown")
+        
+        print(f"\n[{i+1}/{len(competitions)}] {name} ({season})")
+        
+        if not pdf_url:
+            print("  No PDF URL, skipping")
+            failed.append({"name": name, "reason": "No PDF URL"})
+            continue
+        
+        # Downloaded and parsed by the pipeline
+        if not pdf_path:
+            failed.append({"name": name, "reason": "Download failed"})
+            continue
+        if error:
+            print(f"  Error parsing PDF: {error}")
+            failed.append({"name": name, "reason": "Parse failed"})
+            continue
+        
+        races, fmt, seconds = parsed
+        print(f"  Format: {fmt} ({seconds:.1f}s)")
+        pdf_format.record(format_stats, fmt, seconds,
+                          sum(len(r.get("results", [])) for r in races))
+        
+        if not races:
+            print(f"  Warning: No races extracted")
+            failed.append({"name": name, "reason": "No races extracted"})
+        else:
+            race_count = len(races)
+            result_count = sum(len(r.get("results", [])) for r in races)
+            print(f"  Extracted {race_count} races, {result_count} results")
+            total_races += race_count
+            total_results += result_count
+        
+        # Add to output
+        all_competitions.append({
+            "date": date,
+            "name": name,
+            "season": season,
+            "type": comp_type,
+            "pdf_url": pdf_url,
+            "format": fmt,
+            "races": races
+        })
     
     # Sort by season then name
     all_competitions.sort(key=lambda x: (x.get("season") or "zzz", x.get("name") or ""))
@@ -464,6 +342,7 @@ def main():
             "total_races": total_races,
             "total_results": total_results,
             "failed_count": len(failed),
+            "formats": {fmt: entry["files"] for fmt, entry in format_stats.items()},
             "seasons": TARGET_SEASONS,
             "generated_at": datetime.now().isoformat()
         },
@@ -482,6 +361,7 @@ def main():
     print(f"Total results extracted: {total_results}")
     print(f"Failed/No results: {len(failed)}")
     print(f"Output saved to: {output_path}")
+    pdf_format.print_stats(format_stats)
     
     if failed:
         print(f"\nFailed competitions:")
@@ -1,51 +1,21 @@
 #!/usr/bin/env python3
 """Parse USS PDFs in batches to avoid memory issues."""
 
+import argparse
 import json
 import os
 import re
 import gc
 from datetime import datetime
 from pathlib import Path
-import pdfplumber
+
+import pdf_store
+from line_classifier import CATEGORY, DISTANCE, classify_batch_line
+from pdf_pool import default_workers, extract_page_range, extract_pdfs
 
 KB_DIR = Path.home() / 'clawd' / 'shorttrack-knowledge-base'
-PDF_DIR = KB_DIR / 'raw_data' / 'uss_pdfs'
 OUTPUT_PATH = KB_DIR / 'processed_data' / 'uss_all_results.json'
 
-def extract_distance(text: str):
-    """Extract distance from text."""
-    patterns = [
-        (r'\b222\s*m', 222), (r'\b333\s*m', 333), (r'\b500\s*m', 500),
-        (r'\b777\s*m', 777), (r'\b1000\s*m', 1000), (r'\b1500\s*m', 1500),
-        (r'\b3000\s*m', 3000), (r'\b222M\b', 222), (r'\b333M\b', 333),
-        (r'\b500M\b', 500), (r'\b777M\b', 777), (r'\b1000M\b', 1000),
-        (r'\b1500M\b', 1500), (r'\b3000M\b', 3000),
-    ]
-    for pattern, dist in patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            return dist
-    return None
-
-def extract_category(text: str):
-    """Extract category from text."""
-    patterns = [
-        (r'Open\s+Men', 'Open Men'), (r'Open\s+Women', 'Open Women'),
-        (r'Open\s+M\b', 'Open Men'), (r'Open\s+W\b', 'Open Women'),
-        (r'Masters\s+Men', 'Masters Men'), (r'Masters\s+Women', 'Masters Women'),
-        (r'U8\s+Boys', 'U8 Boys'), (r'U8\s+Girls', 'U8 Girls'),
-        (r'U10\s+Boys', 'U10 Boys'), (r'U10\s+Girls', 'U10 Girls'),
-        (r'U12\s+Boys', 'U12 Boys'), (r'U12\s+Girls', 'U12 Girls'),
-        (r'U14\s+Boys', 'U14 Boys'), (r'U14\s+Girls', 'U14 Girls'),
-        (r'U16\s+Boys', 'U16 Boys'), (r'U16\s+Girls', 'U16 Girls'),
-        (r'U18\s+Men', 'U18 Men'), (r'U18\s+Women', 'U18 Women'),
-        (r'U20\s+Men', 'U20 Men'), (r'U20\s+Women', 'U20 Women'),
-    ]
-    for pattern, cat in patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            return cat
-    return None
-
 def parse_time(time_str: str) -> str:
     """Normalize time string."""
     time_str = time_str.strip()
@@ -61,92 +31,100 @@ def parse_time(time_str: str) -> str:
     except:
         return time_str
 
-def parse_pdf(filepath: Path, comp_name: str, comp_date: str):
-    """Parse a single PDF and return results."""
+def parse_pages(pages: list[dict], comp_name: str, comp_date: str):
+    """Parse extracted pages of a single PDF and return results."""
     results = []
+    current_distance = None
+    current_category = None
     
-    try:
-        with pdfplumber.open(filepath) as pdf:
-            current_distance = None
-            current_category = None
+    for page in pages:
+        text = page['text']
+        if not text:
+            continue
+        
+        for line in text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
+            
+            token = classify_batch_line(line)
+            if token is None:
+                continue
             
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text:
-                    continue
+            if token[0] == DISTANCE:
+                current_distance = token[1]
+                if token[2]:
+                    current_category = token[2]
+            elif token[0] == CATEGORY:
+                current_category = token[1]
+            elif current_distance:
+                _, place, raw_time, name_part = token
+                time_str = parse_time(raw_time)
                 
-                for line in text.split('\n'):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    dist = extract_distance(line)
-                    if dist and dist in [222, 333, 500, 777, 1000, 1500, 3000]:
-                        current_distance = dist
-                        cat = extract_category(line)
-                        if cat:
-                            current_category = cat
-                        continue
-                    
-                    cat = extract_category(line)
-                    if cat and not re.match(r'^\d', line):
-                        current_category = cat
-                        continue
-                    
-                    match = re.match(r'^(\d{1,3})\.?\s+(.+)', line)
-                    if match and current_distance:
-                        place = int(match.group(1))
-                        rest = match.group(2)
-                        
-                        time_match = re.search(r'(\d{1,2}:\d{2}\.\d{2,3}|\d{1,2}\.\d{2,3})\s*$', rest)
-                        if time_match:
-                            time_str = parse_time(time_match.group(1))
-                            name_part = rest[:time_match.start()].strip()
-                            
-                            name_parts = name_part.split()
-                            name_tokens = [p for p in name_parts if not p.isdigit() and len(p) > 3]
-                            name = ' '.join(name_tokens[:3]) if name_tokens else name_part
-                            
-                            if name and time_str:
-                                results.append({
-                                    'rank': place,
-                                    'skater': name,
-                                    'time': time_str,
-                                    'distance': f"{current_distance}m",
-                                    'category': current_category or 'Unknown',
-                                    'competition': comp_name,
-                                    'date': comp_date,
-                                })
-    except Exception as e:
-        print(f"    Error: {e}")
+                name_parts = name_part.split()
+                name_tokens = [p for p in name_parts if not p.isdigit() and len(p) > 3]
+                name = ' '.join(name_tokens[:3]) if name_tokens else name_part
+                
+                if name and time_str:
+                    results.append({
+                        'rank': place,
+                        'skater': name,
+                        'time': time_str,
+                        'distance': f"{current_distance}m",
+                        'category': current_category or 'Unknown',
+                        'competition': comp_name,
+                        'date': comp_date,
+                    })
     
     return results
 
+def parse_pdf(filepath: Path, comp_name: str, comp_date: str):
+    """Parse a single PDF and return results."""
+    pages, _, error = extract_page_range(filepath, 0, None)
+    if error:
+        print(f"    Error: {error}")
+    return parse_pages(pages, comp_name, comp_date)
+
+def comp_from_filename(pdf_path: Path):
+    """Extract competition name and date (YYYY-MM-DD at start) from filename."""
+    name = pdf_path.stem
+    date_match = re.match(r'^(\d{4}-\d{2}-\d{2})', name)
+    if date_match:
+        comp_date = date_match.group(1)
+        comp_name = name[len(comp_date):].strip(' -_')
+    else:
+        comp_date = None
+        comp_name = name
+    return comp_name, comp_date
+
 def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=1,
+                        help='worker processes for PDF extraction (0 = all cores)')
+    args = parser.parse_args()
+    workers = args.workers or default_workers()
+    
     print("=" * 60)
     print("USS PDF Batch Parser")
     print("=" * 60)
     
-    # Get all PDFs
-    pdfs = sorted(PDF_DIR.glob('*.pdf'))
-    print(f"Found {len(pdfs)} PDFs")
+    # Get every distinct PDF in the store
+    docs = {doc['path']: doc for doc in pdf_store.documents()}
+    pdfs = list(docs)
+    print(f"Found {len(pdfs)} PDFs, parsing with {workers} worker(s)")
     
     all_results = []
     competitions = []
     
-    for i, pdf_path in enumerate(pdfs):
-        # Extract name and date from filename
-        name = pdf_path.stem
-        # Try to extract date (YYYY-MM-DD at start)
-        date_match = re.match(r'^(\d{4}-\d{2}-\d{2})', name)
-        if date_match:
-            comp_date = date_match.group(1)
-            comp_name = name[len(comp_date):].strip(' -_')
-        else:
-            comp_date = None
-            comp_name = name
+    extracted = extract_pdfs(pdfs, workers=workers)
+    for i, (pdf_path, pages, elapsed, error) in enumerate(extracted):
+        doc = docs[pdf_path]
+        comp_name, comp_date = comp_from_filename(Path(doc['filename']))
+        comp_date = comp_date or doc['date']
+        if error:
+            print(f"    Error: {error}")
         
-        results = parse_pdf(pdf_path, comp_name, comp_date)
+        results = parse_pages(pages, comp_name, comp_date)
         
         if results:
             all_results.extend(results)
@@ -156,9 +134,9 @@ def main():
                 'result_count': len(results),
                 'results': results
             })
-            print(f"  [{i+1}/{len(pdfs)}] ✓ {comp_name[:45]}: {len(results)} results")
+            print(f"  [{i+1}/{len(pdfs)}] ✓ {comp_name[:45]}: {len(results)} results ({elapsed:.1f}s)")
         else:
-            print(f"  [{i+1}/{len(pdfs)}] - {comp_name[:45]}: 0 results")
+            print(f"  [{i+1}/{len(pdfs)}] - {comp_name[:45]}: 0 results ({elapsed:.1f}s)")
         
         # Clear memory periodically
         if (i + 1) % 20 == 0:
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Fingerprint USS result PDFs so each one goes to a single parser.
+
+USS results come out of a handful of generators: full Tempus competition
+protocols, stand-alone Time Classification exports, EVT "Event Time Results"
+browser printouts and ruled tables. The first few pages are enough to tell
+them apart, so the parsers no longer try every strategy (and pay for table
+extraction) on every PDF.
+"""
+
+from collections import defaultdict
+from pathlib import Path
+
+import text_cache
+
+TEMPUS_PROTOCOL = 'tempus_protocol'
+TIME_CLASSIFICATION = 'time_classification'
+EVENT_TIME_RESULTS = 'event_time_results'
+TABULAR = 'tabular'
+TEXT = 'text'  # No known fingerprint, generic line parsing
+
+# Pages read to fingerprint a PDF. A protocol's cover and officials pages
+# carry no Tempus footer, the skater list on page 3 does.
+SAMPLE_PAGES = 3
+
+# Checked in order: a Time Classification export also carries the Tempus
+# footer, so it has to win over the protocol markers
+TEXT_MARKERS = [
+    (EVENT_TIME_RESULTS, ['Event Time Results']),
+    (TIME_CLASSIFICATION, ['Time Classification']),
+    (TEMPUS_PROTOCOL, ['Official Protocol', 'Tempus Competition Software',
+                       'OVERALL CLASSIFICATION', 'DISTANCE CLASSIFICATION']),
+]
+
+
+def fingerprint(texts: list[str]) -> str:
+    """Classify a PDF from the text of its first pages (tables not considered)."""
+    sample = '\n'.join(texts)
+    for fmt, markers in TEXT_MARKERS:
+        if any(marker in sample for marker in markers):
+            return fmt
+    return TEXT
+
+
+def detect_format(pdf_path: Path, sample_pages: int = SAMPLE_PAGES) -> str:
+    """Return the format of a PDF, looking for tables only if the text is unknown."""
+    pages = text_cache.read_pages(pdf_path, 0, sample_pages)
+    fmt = fingerprint([page['text'] for page in pages])
+    if fmt != TEXT:
+        return fmt
+
+    pages = text_cache.read_pages(pdf_path, 0, sample_pages, tables=True)
+    if any(table for page in pages for table in page['tables']):
+        return TABULAR
+    return TEXT
+
+
+def new_stats() -> defaultdict:
+    """Per-format throughput counters for record()/print_stats()."""
+    return defaultdict(lambda: {'files': 0, 'results': 0, 'seconds': 0.0})
+
+
+def record(stats: defaultdict, fmt: str, seconds: float, result_count: int):
+    """Count one parsed file that took seconds to parse."""
+    entry = stats[fmt]
+    entry['files'] += 1
+    entry['results'] += result_count
+    entry['seconds'] += seconds
+
+
+def print_stats(stats: defaultdict):
+    """Print files, results and parse time per detected format."""
+    print("\nBy format:")
+    for fmt, entry in sorted(stats.items(), key=lambda item: -item[1]['files']):
+        per_file = entry['seconds'] / entry['files'] if entry['files'] else 0
+        print(f"  {fmt:<20} {entry['files']:>4} files  {entry['results']:>6} results  "
+              f"{entry['seconds']:>7.1f}s ({per_file:.2f}s/file)")
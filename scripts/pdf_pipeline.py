@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Overlapped download-and-parse pipeline for the USS catalog parsers.
+
+Fetching a PDF is network-bound and parsing it is CPU-bound, so the two
+stages run concurrently: a thread pool downloads, and each downloaded file
+is handed to a process pool for parsing. Every fetch thread waits until its
+PDF is parsed, which bounds how far the downloads run ahead of the parses
+(backpressure) while the downloads for the next PDFs proceed under the
+current parses. A catalog run then takes about as long as its parses
+instead of parses plus downloads.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional
+
+from pdf_pool import default_workers
+
+# Concurrent downloads kept ahead of the parse workers
+DOWNLOADS = 4
+
+
+def pipeline(items: list, fetch: Callable[[Any], Optional[str]], parse: Callable[[str], Any],
+             workers: Optional[int] = None, downloads: int = DOWNLOADS) -> Iterator[tuple[Any, Optional[str], Any, Optional[str]]]:
+    """Download and parse items, yielding (item, path, parsed, error) in input order.
+
+    fetch(item) runs in a thread and returns a local PDF path, or None when
+    there is nothing to parse (path and parsed are then None). parse(path)
+    runs in one of `workers` processes, so it must be a module-level
+    function. A fetch or parse that raises yields its message as error
+    instead of ending the run. At most workers + downloads PDFs are fetched
+    and not yet parsed at any time. The paths are left in place: fetch
+    stages return pdf_store blobs, which the store's index keeps track of.
+    """
+    workers = workers or default_workers()
+
+    # Spawned, not forked: the workers start on the first submit, from a
+    # fetch thread, while other fetch threads may hold sqlite/http/pdf_store
+    # locks that a forked child would inherit locked
+    spawn = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=spawn) as parsers, \
+            ThreadPoolExecutor(max_workers=workers + downloads) as fetchers:
+
+        def run(item):
+            path = None
+            try:
+                path = fetch(item)
+                if path is None:
+                    return item, None, None, None
+                # Blocks this thread, not the others: they keep downloading
+                return item, path, parsers.submit(parse, path).result(), None
+            except Exception as e:
+                return item, path, None, str(e)
+
+        # Job descriptors are tiny; the thread count bounds the real work
+        futures = [fetchers.submit(run, item) for item in items]
+        for future in futures:
+            yield future.result()
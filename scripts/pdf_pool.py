@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Process-pool PDF extraction shared by the USS batch parsers.
+
+pdfplumber layout analysis is pure CPU, so whole PDFs (and page ranges of
+large PDFs) are fanned out to worker processes. Extracted pages come back to
+the caller in document order, so the cheap line parsing can still run
+serially and carry distance/category state across page boundaries. Workers
+read through the text_cache page store, so already-extracted pages are free.
+"""
+
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pdfplumber
+
+import text_cache
+
+# PDFs longer than this are split into page ranges of this size
+PAGES_PER_TASK = 16
+
+
+def default_workers() -> int:
+    """Number of worker processes to use when none is given."""
+    return os.cpu_count() or 1
+
+
+def count_pages(pdf_path: Path) -> int:
+    """Return the page count of a PDF (0 if it cannot be opened)."""
+    try:
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+    except Exception:
+        return 0
+
+
+def extract_page_range(pdf_path: Path, start: int, stop: Optional[int],
+                       tables: bool = False) -> tuple[list[dict], float, Optional[str]]:
+    """Extract text (and optionally tables) for pages [start, stop).
+
+    Returns (pages, elapsed_seconds, error). Each page is a dict with
+    'text' and 'tables' keys.
+    """
+    started = time.perf_counter()
+    try:
+        pages = text_cache.read_pages(pdf_path, start, stop, tables=tables)
+    except Exception as e:
+        return [], time.perf_counter() - started, str(e)
+    return pages, time.perf_counter() - started, None
+
+
+def page_ranges(page_count: int, pages_per_task: int = PAGES_PER_TASK) -> list[tuple[int, Optional[int]]]:
+    """Split a PDF of page_count pages into (start, stop) task ranges."""
+    if page_count <= pages_per_task:
+        return [(0, None)]
+    return [(start, min(start + pages_per_task, page_count))
+            for start in range(0, page_count, pages_per_task)]
+
+
+def extract_first_range(pdf_path: Path, pages_per_task: int = PAGES_PER_TASK,
+                        tables: bool = False) -> tuple[list[dict], float, Optional[str], int]:
+    """extract_page_range() of a PDF's first task range, plus its page count.
+
+    Run in a worker, so the parent never opens the PDFs itself.
+    """
+    started = time.perf_counter()
+    page_count = count_pages(pdf_path)
+    start, stop = page_ranges(page_count, pages_per_task)[0]
+    pages, _, error = extract_page_range(pdf_path, start, stop, tables)
+    return pages, time.perf_counter() - started, error, page_count
+
+
+def extract_pdfs(pdf_paths: list[Path], workers: Optional[int] = None, tables: bool = False,
+                 pages_per_task: int = PAGES_PER_TASK) -> Iterator[tuple[Path, list[dict], float, Optional[str]]]:
+    """Extract pages from many PDFs, yielding results in input order.
+
+    Yields (pdf_path, pages, elapsed_seconds, error) per PDF. elapsed is the
+    worker wall time spent on that PDF summed over its page ranges. With
+    workers=1 everything runs in this process without a pool.
+
+    Each PDF starts as one task for its first range, which also reports the
+    page count; its other ranges are submitted once that is known. At most
+    2 x workers ranges are submitted and not yet yielded (plus the rest of
+    the PDF being waited on), so finished pages do not pile up in the parent.
+    """
+    workers = workers or default_workers()
+
+    if workers == 1:
+        for pdf_path in pdf_paths:
+            pages, elapsed, error = extract_page_range(pdf_path, 0, None, tables)
+            yield pdf_path, pages, elapsed, error
+        return
+
+    limit = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        queued = iter(pdf_paths)
+        jobs = deque()  # Per submitted PDF, in input order
+        outstanding = set()  # Futures whose ranges have not been yielded yet
+
+        def submit(job: dict, fn, *args):
+            future = executor.submit(fn, *args)
+            job['futures'].append(future)
+            outstanding.add(future)
+
+        def submit_more():
+            # The rest of the PDF being waited on goes first, whatever the limit
+            head = jobs[0] if jobs else None
+            while head and head['ranges']:
+                submit(head, extract_page_range, head['path'], *head['ranges'].popleft(), tables)
+            while len(outstanding) < limit:
+                # Later ranges of earlier PDFs before the first range of a new one
+                job = next((job for job in jobs if job['ranges']), None)
+                if job is not None:
+                    submit(job, extract_page_range, job['path'], *job['ranges'].popleft(), tables)
+                    continue
+                pdf_path = next(queued, None)
+                if pdf_path is None:
+                    return
+                job = {'path': pdf_path, 'futures': [], 'ranges': None}
+                jobs.append(job)
+                submit(job, extract_first_range, pdf_path, pages_per_task, tables)
+
+        def count_pages_of_finished():
+            for job in jobs:
+                if job['ranges'] is None and job['futures'][0].done():
+                    page_count = job['futures'][0].result()[3]
+                    job['ranges'] = deque(page_ranges(page_count, pages_per_task)[1:])
+
+        submit_more()
+        while jobs:
+            count_pages_of_finished()
+            head = jobs[0]
+            if head['ranges'] is None or head['ranges'] or not all(f.done() for f in head['futures']):
+                submit_more()
+                wait([f for f in outstanding if not f.done()], return_when=FIRST_COMPLETED)
+                continue
+
+            jobs.popleft()
+            outstanding.difference_update(head['futures'])
+            pages = []
+            elapsed = 0.0
+            error = None
+            for future in head['futures']:
+                chunk, chunk_elapsed, chunk_error = future.result()[:3]
+                pages.extend(chunk)
+                elapsed += chunk_elapsed
+                error = error or chunk_error
+            submit_more()
+            yield head['path'], pages, elapsed, error
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for downloaded result PDFs.
+
+Every PDF is kept once, as blobs/<sha256[:2]>/<sha256>.pdf, whichever
+catalog, season or name it was downloaded under. A small SQLite index maps
+each source (url, name, date, season) to the hash of its content, so:
+
+- a URL that is already indexed is not downloaded again,
+- a download whose bytes are already stored (the same protocol listed under
+  two seasons or two URLs) is recorded as a duplicate and dropped,
+- parsers iterate documents() and see every distinct PDF exactly once.
+
+Existing PDF directories are brought in with:
+
+    python3 scripts/pdf_store.py import ~/clawd/shorttrack-knowledge-base/raw_data/uss_pdfs data/pdfs
+    python3 scripts/pdf_store.py stats
+"""
+
+import argparse
+import atexit
+import hashlib
+import os
+import re
+import shutil
+import sqlite3
+import threading
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import http_fetch
+from parse_cache import KB_DIR, file_sha256
+
+STORE_DIR = KB_DIR / 'raw_data' / 'pdf_store'
+INDEX_PATH = STORE_DIR / 'index.sqlite'
+BLOB_DIR = STORE_DIR / 'blobs'
+# Downloads land here first and are moved into BLOB_DIR once hashed
+INCOMING_DIR = STORE_DIR / 'incoming'
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS blobs (
+        sha256 TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        added_at TEXT NOT NULL
+    );
+
+    -- One row per place a PDF was found; url is '' for imported files
+    CREATE TABLE IF NOT EXISTS sources (
+        url TEXT NOT NULL,
+        name TEXT NOT NULL,
+        season TEXT NOT NULL DEFAULT '',
+        date TEXT,
+        filename TEXT NOT NULL,
+        sha256 TEXT NOT NULL,
+        added_at TEXT NOT NULL,
+        PRIMARY KEY (url, name, season)
+    );
+
+    CREATE INDEX IF NOT EXISTS sources_sha256 ON sources (sha256);
+'''
+
+# fetch_one() may be called for the same URL from several pipeline threads
+_url_locks = defaultdict(threading.Lock)
+_url_locks_guard = threading.Lock()
+# Idle keep-alive connections of all fetch_one() calls in this process;
+# http_fetch._pool_lock guards it
+_pool = {}
+atexit.register(http_fetch.close_pool, _pool)
+
+
+def connect(path: Path = INDEX_PATH) -> sqlite3.Connection:
+    """Open (and create if needed) the store index."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def blob_path(digest: str) -> Path:
+    return BLOB_DIR / digest[:2] / f'{digest}.pdf'
+
+
+def canonical_url(url: str) -> str:
+    """Fix catalog URLs like https://www.usspeedskating.org/...https://assets..."""
+    if 'https://assets' in url and url.count('http') > 1:
+        return 'https://assets' + url.split('https://assets')[-1]
+    return url
+
+
+def filename_for(name: str) -> str:
+    """The file name update_uss_data has always given a competition's PDF."""
+    safe_name = re.sub(r'[<>:"/\\|?*]', '_', name)
+    safe_name = re.sub(r'\s+', '_', safe_name)[:80]
+    return f'{safe_name}.pdf'
+
+
+def lookup(conn: sqlite3.Connection, url: str) -> Optional[str]:
+    """Hash of the stored PDF for a URL, or None if it has not been fetched."""
+    row = conn.execute('SELECT sha256 FROM sources WHERE url = ? LIMIT 1',
+                       (canonical_url(url),)).fetchone()
+    if row and blob_path(row[0]).exists():
+        return row[0]
+    return None
+
+
+def add_blob(conn: sqlite3.Connection, path: Path, move: bool = False) -> tuple[str, bool]:
+    """Store a file by content. Returns (sha256, True if it was not stored yet).
+
+    With move=True the file is moved into the store, or deleted if its
+    content is already there.
+    """
+    digest = file_sha256(path)
+    dest = blob_path(digest)
+    if dest.exists():
+        if move:
+            path.unlink()
+        return digest, False
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if move:
+        os.replace(path, dest)
+    else:
+        tmp_path = dest.with_suffix('.tmp')
+        shutil.copyfile(path, tmp_path)
+        os.replace(tmp_path, dest)
+    with conn:
+        conn.execute('INSERT OR IGNORE INTO blobs (sha256, size, added_at) VALUES (?, ?, ?)',
+                     (digest, dest.stat().st_size, datetime.now().isoformat()))
+    return digest, True
+
+
+def add_source(conn: sqlite3.Connection, digest: str, url: str, name: str,
+               date: Optional[str] = None, season: Optional[str] = None,
+               filename: Optional[str] = None):
+    """Record (or repoint) where a stored PDF came from."""
+    with conn:
+        conn.execute('''
+            INSERT INTO sources (url, name, season, date, filename, sha256, added_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url, name, season) DO UPDATE SET
+                date = excluded.date, filename = excluded.filename, sha256 = excluded.sha256
+        ''', (canonical_url(url) if url else '', name, season or '', date,
+              filename or filename_for(name), digest, datetime.now().isoformat()))
+
+
+def _staging_path(url: str) -> Path:
+    # Stable per URL, so the download manifest can revalidate and resume it
+    return INCOMING_DIR / (hashlib.sha1(url.encode('utf-8')).hexdigest()[:20] + '.pdf')
+
+
+def _link(src: Path, dest: Path):
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    if dest.exists():
+        dest.unlink()
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+def fetch(items: list[dict], refresh: bool = False, concurrency: int = http_fetch.CONCURRENCY,
+          index_path: Path = INDEX_PATH, pool: Optional[dict] = None) -> list[dict]:
+    """Make sure the PDF of every item is stored. Returns one outcome per item.
+
+    Items are dicts with 'url', 'name' and optionally 'date', 'season' and
+    'filename'. Indexed URLs are not downloaded again unless refresh=True,
+    in which case they are revalidated with conditional GETs. Each distinct
+    URL is downloaded once per call.
+
+    Outcomes have 'url', 'sha256', 'path' (the blob, or None), 'size' and
+    'status': stored (already indexed), downloaded, resumed, not_modified,
+    duplicate (new URL, content already stored) or failed, plus 'message'
+    on failure. A failed refresh still points at the stored copy.
+    Downloads use the caller's http_fetch connection pool when given one.
+    """
+    conn = connect(index_path)
+    try:
+        previous = {}
+        jobs = {}
+        for item in items:
+            url = canonical_url(item['url'])
+            if url in previous or url in jobs:
+                continue
+            digest = lookup(conn, url)
+            previous[url] = digest
+            if digest and not refresh:
+                continue
+            staging = _staging_path(url)
+            if digest:
+                # Revalidate against the stored copy
+                _link(blob_path(digest), staging)
+            jobs[url] = staging
+
+        by_url = {url: {'status': 'stored', 'sha256': digest}
+                  for url, digest in previous.items() if digest and url not in jobs}
+        if jobs:
+            outcomes = http_fetch.download_files(list(jobs.items()), INCOMING_DIR / http_fetch.MANIFEST_NAME,
+                                                 concurrency=concurrency, pool=pool)
+            for outcome in outcomes:
+                url = outcome['url']
+                staging = outcome['path']
+                digest = previous[url]
+                if outcome['status'] in ('failed', 'not_modified'):
+                    # Drop the revalidation link; a .part file is kept for resuming
+                    if staging.exists():
+                        staging.unlink()
+                    by_url[url] = {'status': outcome['status'], 'sha256': digest,
+                                   'message': outcome.get('message')}
+                    continue
+                digest, new = add_blob(conn, staging, move=True)
+                status = outcome['status'] if new or previous[url] else 'duplicate'
+                by_url[url] = {'status': status, 'sha256': digest}
+
+        results = []
+        for item in items:
+            url = canonical_url(item['url'])
+            outcome = by_url[url]
+            digest = outcome['sha256']
+            if digest:
+                add_source(conn, digest, url, item['name'], item.get('date'),
+                           item.get('season'), item.get('filename'))
+            path = blob_path(digest) if digest else None
+            result = {'url': url, 'sha256': digest, 'path': path, 'status': outcome['status'],
+                      'size': path.stat().st_size if path else 0}
+            if outcome.get('message'):
+                result['message'] = outcome['message']
+            results.append(result)
+        return results
+    finally:
+        conn.close()
+
+
+def fetch_one(url: str, name: str, date: Optional[str] = None, season: Optional[str] = None,
+              index_path: Path = INDEX_PATH) -> Optional[Path]:
+    """Store a single PDF and return its blob path (None if it could not be fetched).
+
+    Safe to call from several threads, e.g. as a pdf_pipeline fetch stage.
+    All calls share one connection pool, so a run's downloads reuse its
+    keep-alive connections instead of opening one per PDF.
+    """
+    with _url_locks_guard:
+        lock = _url_locks[canonical_url(url)]
+    with lock:
+        outcome = fetch([{'url': url, 'name': name, 'date': date, 'season': season}],
+                        concurrency=1, index_path=index_path, pool=_pool)[0]
+    if outcome['status'] == 'failed':
+        print(f"  Error downloading {url}: {outcome.get('message')}")
+    return outcome['path']
+
+
+def documents(index_path: Path = INDEX_PATH) -> list[dict]:
+    """Every distinct stored PDF once, ordered by file name.
+
+    Each dict has 'path' (the blob), 'sha256' and the 'url', 'name', 'date',
+    'season' and 'filename' of the first source it was stored from.
+    """
+    conn = connect(index_path)
+    try:
+        rows = conn.execute('''
+            SELECT sha256, url, name, date, season, filename FROM sources
+            ORDER BY added_at, rowid
+        ''').fetchall()
+    finally:
+        conn.close()
+
+    docs = {}
+    for digest, url, name, date, season, filename in rows:
+        if digest in docs or not blob_path(digest).exists():
+            continue
+        docs[digest] = {'path': blob_path(digest), 'sha256': digest, 'url': url, 'name': name,
+                        'date': date, 'season': season or None, 'filename': filename}
+    return sorted(docs.values(), key=lambda doc: doc['filename'])
+
+
+def import_dir(directory: Path, move: bool = False, index_path: Path = INDEX_PATH) -> dict:
+    """Add every PDF under a directory to the store. Returns counts.
+
+    Season sub-directories (2019-2020/) and <date>_<name>.pdf file names, as
+    written by download_pdfs.py, are recognised; source URLs are taken from
+    the directory's download manifest when there is one.
+    """
+    manifest = http_fetch.load_manifest(directory / http_fetch.MANIFEST_NAME)
+    counts = {'files': 0, 'new': 0, 'duplicate': 0}
+    conn = connect(index_path)
+    try:
+        for path in sorted(directory.rglob('*.pdf')):
+            if path.stat().st_size <= http_fetch.MIN_PDF_SIZE:
+                continue
+            relative = str(path.relative_to(directory))
+            url = (manifest.get(relative) or {}).get('url', '')
+            season = path.parent.name if re.match(r'^\d{4}-\d{4}$', path.parent.name) else None
+            date_match = re.match(r'^(\d{4}-\d{2}-\d{2})_(.+)$', path.stem)
+            if date_match and season:
+                date, name = date_match.group(1), date_match.group(2)
+            else:
+                date, name = None, path.stem.replace('_', ' ')
+
+            digest, new = add_blob(conn, path, move=move)
+            add_source(conn, digest, url, name, date, season, path.name)
+            counts['files'] += 1
+            counts['new' if new else 'duplicate'] += 1
+    finally:
+        conn.close()
+    return counts
+
+
+def print_stats(index_path: Path = INDEX_PATH):
+    conn = connect(index_path)
+    try:
+        blobs, stored = conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs').fetchone()
+        sources, = conn.execute('SELECT COUNT(*) FROM sources').fetchone()
+        referenced, = conn.execute('''
+            SELECT COALESCE(SUM(b.size), 0) FROM sources s JOIN blobs b USING (sha256)
+        ''').fetchone()
+        seasons = conn.execute('''
+            SELECT season, COUNT(*), COUNT(DISTINCT sha256) FROM sources
+            GROUP BY season ORDER BY season
+        ''').fetchall()
+    finally:
+        conn.close()
+
+    print(f"Store: {STORE_DIR}")
+    print(f"  Sources: {sources}")
+    print(f"  Distinct PDFs: {blobs} ({stored / (1024*1024):.1f} MB)")
+    print(f"  Saved by deduplication: {(referenced - stored) / (1024*1024):.1f} MB")
+    for season, count, distinct in seasons:
+        print(f"    {season or '(no season)':<12} {count:>4} sources  {distinct:>4} PDFs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Content-addressed PDF store')
+    parser.add_argument('command', choices=['import', 'stats'])
+    parser.add_argument('dirs', nargs='*', type=Path, help='directories to import')
+    parser.add_argument('--move', action='store_true',
+                        help='move imported files into the store instead of copying them')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        for directory in args.dirs:
+            counts = import_dir(directory, move=args.move)
+            print(f"{directory}: {counts['files']} PDFs, {counts['new']} new, "
+                  f"{counts['duplicate']} already stored")
+    print_stats()
+
+
+if __name__ == '__main__':
+    main()
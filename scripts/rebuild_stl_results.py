@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Rebuild the shorttracklive season files from the page cache, without a re-scrape.
+
+Reads .scrape_cache.sqlite (packing .scrape_cache/ on first use) and writes
+public/data/scraped_us_results_s16..s20.json and
+public/data/scraped_profiles/skater_profiles.json.
+
+Pages are streamed from the cache one competition at a time (its results
+page and the skater pages linked from it) and parsed in a process pool.
+Each parsed competition is appended to a journal, so an interrupted run
+resumes with the competitions it had not finished. Entries are tied to the
+parser version and the page contents, so a changed page or a bumped
+PARSER_VERSION re-parses only what it affects.
+
+    python3 scripts/rebuild_stl_results.py [--workers N] [--restart]
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import parse_qs, urlsplit
+
+import results_journal
+import scrape_cache
+from stl_parser import parse_competition, parse_profile, parse_season_index, skater_info
+
+# Bump when a parser change should invalidate journaled competitions
+PARSER_VERSION = 1
+
+OUTPUT_DIR = Path(__file__).parent.parent / 'public' / 'data'
+JOURNAL_PATH = scrape_cache.REPO_DIR / '.stl_rebuild.journal.jsonl'
+SOURCE = 'shorttracklive.info'
+FIRST_SEASON_YEAR = 2005  # saison=16 is 2021/2022
+
+COMP_URL = re.compile(r'[?&]comp=(\d+)&')
+INDEX_URL = re.compile(r'\?saison=\d+$')
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def season_name(season_id: int) -> str:
+    start = FIRST_SEASON_YEAR + season_id
+    return f'{start}/{start + 1}'
+
+
+def _query(url: str) -> dict:
+    return {key: int(values[0]) for key, values in parse_qs(urlsplit(url).query).items()
+            if values[0].isdigit()}
+
+
+# --- Worker -----------------------------------------------------------------
+
+def parse_group(comp_id: int, pages: dict) -> tuple[dict, list[dict]]:
+    """Parse one competition's pages (url -> html). Runs in a worker process.
+
+    Returns the journal entry: the competition (events None when no results
+    page is cached) and the profiles of its skater pages.
+    """
+    results_page = None
+    season_id = None
+    profiles = []
+    errors = 0
+    for url, page in sorted(pages.items()):
+        query = _query(url)
+        view = query.get('m')
+        if view == 12 and 'skaterid' in query:
+            try:
+                profile = parse_profile(page, query['skaterid'])
+            except Exception as e:
+                print(f"  ! {url}: {e}", file=sys.stderr)
+                errors += 1
+                continue
+            profiles.append({'season_id': query.get('saison'), 'comp_id': comp_id,
+                             'profile': profile})
+        elif view in (0, 8):
+            # Time analysis (m=8) lists every timed race; fall back to the
+            # classification (m=0) where a competition has no m=8 page
+            if results_page is None or view == 8:
+                results_page = page
+                season_id = query.get('saison')
+
+    competition = {'comp_id': comp_id, 'season_id': season_id, 'header': None,
+                   'events': None, 'profile_errors': errors}
+    if results_page is not None:
+        parsed = parse_competition(results_page)
+        competition['header'] = parsed['header']
+        competition['events'] = parsed['events']
+    return competition, profiles
+
+
+# --- Streaming --------------------------------------------------------------
+
+def competition_groups(conn) -> Iterator[tuple[int, dict]]:
+    """Yield (comp_id, {url: html}) per competition.
+
+    Canonical URLs sort by their comp= parameter first, so each
+    competition's pages come out of the cache together.
+    """
+    pages = scrape_cache.iter_pages(conn, COMP_URL.pattern)
+    for comp_id, group in itertools.groupby(pages, key=lambda page: int(COMP_URL.search(page[0]).group(1))):
+        yield comp_id, dict(group)
+
+
+def fingerprint(pages: dict) -> str:
+    digest = hashlib.sha1(f'v{PARSER_VERSION}'.encode())
+    for url in sorted(pages):
+        digest.update(url.encode())
+        digest.update(hashlib.sha1(pages[url].encode('utf-8')).digest())
+    return digest.hexdigest()
+
+
+def load_journal(journal: Path) -> dict:
+    """comp_id -> (competition, profiles) for the entries of an unfinished run."""
+    done = {}
+    for entry in results_journal.read(journal):
+        competition = entry['competition']
+        done[competition['comp_id']] = (competition, entry['results'])
+    return done
+
+
+def parse_all(conn, journal: Path, workers: int) -> tuple[dict, int]:
+    """Parse every cached competition, reusing journal entries that are current.
+
+    Returns (comp_id -> (competition, profiles), number of failed competitions).
+    """
+    done = load_journal(journal)
+    parsed = {}
+    failed = 0
+    reused = 0
+    in_flight = {}
+
+    def collect(futures):
+        nonlocal failed
+        for future in futures:
+            comp_id, key = in_flight.pop(future)
+            try:
+                competition, profiles = future.result()
+            except Exception as e:
+                print(f"  ! comp {comp_id}: {e}")
+                failed += 1
+                continue
+            competition['fingerprint'] = key
+            results_journal.append(journal, competition, profiles)
+            parsed[comp_id] = (competition, profiles)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for comp_id, pages in competition_groups(conn):
+            key = fingerprint(pages)
+            previous = done.get(comp_id)
+            if previous and previous[0].get('fingerprint') == key:
+                parsed[comp_id] = previous
+                reused += 1
+                continue
+            # Bounded, so the cache is streamed rather than loaded whole
+            while len(in_flight) >= workers * 2:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+            in_flight[pool.submit(parse_group, comp_id, pages)] = (comp_id, key)
+        collect(list(in_flight))
+
+    if reused:
+        print(f"  {reused} competitions taken from the journal")
+    return parsed, failed
+
+
+# --- Output -----------------------------------------------------------------
+
+def season_indexes(conn) -> dict:
+    """season_id -> [(comp_id, name)] from the cached season index pages."""
+    indexes = {}
+    for url, page in scrape_cache.iter_pages(conn, INDEX_URL.pattern):
+        indexes[_query(url)['saison']] = parse_season_index(page)
+    return indexes
+
+
+def build_seasons(parsed: dict, indexes: dict, scraped_at: str) -> dict:
+    """season_id -> season file data, competitions in season index order."""
+    profiles_by_season = {}
+    for _, profiles in parsed.values():
+        for entry in profiles:
+            key = (entry['season_id'], entry['profile']['skater_id'])
+            profiles_by_season.setdefault(key, entry['profile'])
+
+    by_season = {}
+    for competition, _ in parsed.values():
+        if competition['events'] is not None and competition['season_id'] is not None:
+            by_season.setdefault(competition['season_id'], []).append(competition)
+
+    seasons = {}
+    for season_id, competitions in sorted(by_season.items()):
+        index = indexes.get(season_id, [])
+        names = dict(index)
+        order = {comp_id: position for position, (comp_id, _) in enumerate(index)}
+        competitions.sort(key=lambda c: (order.get(c['comp_id'], len(order)), c['comp_id']))
+
+        skaters = {}
+        for competition in competitions:
+            for event in competition['events']:
+                for result in event['results']:
+                    if result['name'] not in skaters:
+                        profile = profiles_by_season.get((season_id, result['skater_id']))
+                        skaters[result['name']] = skater_info(result['name'], result['skater_id'], profile)
+
+        seasons[season_id] = {
+            'season': season_name(season_id),
+            'season_id': season_id,
+            'source': SOURCE,
+            'scraped_at': scraped_at,
+            'competitions': [
+                {'comp_id': c['comp_id'], 'name': names.get(c['comp_id']) or c['header'],
+                 'events': c['events']}
+                for c in competitions
+            ],
+            'skaters': skaters,
+        }
+    return seasons
+
+
+def build_profiles(parsed: dict, scraped_at: str) -> dict:
+    """Profiles file data: one profile per skater, from the newest page."""
+    newest = {}
+    errors = 0
+    for competition, profiles in parsed.values():
+        errors += competition.get('profile_errors', 0)
+        for entry in profiles:
+            skater_id = entry['profile']['skater_id']
+            key = (entry['season_id'] or 0, entry['comp_id'])
+            if skater_id not in newest or key > newest[skater_id][0]:
+                newest[skater_id] = (key, entry['profile'])
+    profiles = [profile for _, (_, profile) in sorted(newest.items())]
+    return {'scraped_at': scraped_at, 'total': len(profiles), 'errors': errors, 'profiles': profiles}
+
+
+def write_json(path: Path, data: dict, **options):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, **options)
+    os.replace(tmp_path, path)
+
+
+def rebuild(output_dir: Path = OUTPUT_DIR, workers: Optional[int] = None, restart: bool = False) -> bool:
+    """Regenerate the season and profile files. Returns False if a competition failed."""
+    started = time.perf_counter()
+    journal = JOURNAL_PATH
+    if restart and journal.exists():
+        journal.unlink()
+
+    conn = scrape_cache.open_cache()
+    try:
+        indexes = season_indexes(conn)
+        parsed, failed = parse_all(conn, journal, workers or default_workers())
+    finally:
+        conn.close()
+
+    if failed:
+        print(f"\n{failed} competitions failed; nothing written. Fix the parser and rerun "
+              f"(finished competitions are kept in {journal.name}).")
+        return False
+
+    scraped_at = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    for season_id, data in build_seasons(parsed, indexes, scraped_at).items():
+        path = output_dir / f'scraped_us_results_s{season_id}.json'
+        write_json(path, data, indent=2)
+        results = sum(len(e['results']) for c in data['competitions'] for e in c['events'])
+        print(f"  {path.name}: {len(data['competitions'])} competitions, {results} results, "
+              f"{len(data['skaters'])} skaters")
+
+    profiles = build_profiles(parsed, scraped_at)
+    path = output_dir / 'scraped_profiles' / 'skater_profiles.json'
+    write_json(path, profiles, ensure_ascii=False, separators=(',', ':'))
+    print(f"  {path.relative_to(output_dir)}: {profiles['total']} profiles ({profiles['errors']} errors)")
+
+    journal.unlink(missing_ok=True)
+    print(f"\nRebuilt {len(parsed)} competitions in {time.perf_counter() - started:.1f}s")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild scraped_us_results_s*.json from the page cache')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='parser processes (default: all cores)')
+    parser.add_argument('--output-dir', type=Path, default=OUTPUT_DIR,
+                        help='where the season files are written (default: public/data)')
+    parser.add_argument('--restart', action='store_true',
+                        help='ignore the journal of an interrupted run')
+    args = parser.parse_args()
+
+    if not rebuild(args.output_dir, args.workers or None, args.restart):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
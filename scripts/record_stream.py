@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Streaming reader for the result JSON files.
+
+The record arrays are read a chunk at a time and each record is decoded on
+its own, so a file's records never have to be in memory all at once:
+
+    for result in iter_records(path):                          # doc['results'][]
+        ...
+    for comp, event, result in iter_event_results(path):       # doc['competitions'][]
+        ...                                                    #   ['events'][]['results'][]
+    for batch in batched(iter_records(path)):                  # lists, for column parsing
+        ...
+
+comp and event hold the fields of the competition and event that come
+before their 'events' / 'results' key in the file (comp_id, name, distance,
+...; the scrapers write those first). read_header() gives the top-level
+fields before the record array (season, seasons, generated, ...).
+
+Reading stops at the end of the record array; what follows it (the
+'skaters' list of the scraped files) is not read.
+"""
+
+import json
+import re
+from itertools import islice
+from typing import Iterable, Iterator
+
+CHUNK_SIZE = 1 << 16
+BATCH_SIZE = 50_000
+_DECODER = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _Reader:
+    """JSON values decoded one at a time from a text file read in chunks"""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk to the unread part of the buffer, False at the end of the file"""
+        if self.eof:
+            return False
+        # At least the unread size, so a large value takes few refills
+        chunk = self.f.read(max(self.chunk_size, len(self.buf) - self.pos))
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def error(self, message: str):
+        return json.JSONDecodeError(message, self.buf, self.pos)
+
+    def peek(self) -> str:
+        """The next non-whitespace character, '' at the end of the file"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise self.error(f"Expecting '{char}'")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next whole value"""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number running up to the end of the buffer, or cut off before
+            # its fraction or exponent, may go on in the next chunk
+            cut = end == len(self.buf) or (isinstance(value, (int, float)) and self.buf[end] in '.eE')
+            if not cut or not self._fill():
+                self.pos = end
+                return value
+
+    def key(self) -> str:
+        key = self.value()
+        if not isinstance(key, str):
+            raise self.error('Expecting property name')
+        self.expect(':')
+        return key
+
+    def next_member(self, close: str) -> bool:
+        """Step over the ',' after a member, False (past close) at the end of the container"""
+        char = self.peek()
+        self.pos += 1
+        if char == close:
+            return False
+        if char != ',':
+            self.pos -= 1
+            raise self.error(f"Expecting ',' or '{close}'")
+        return True
+
+    def opens(self, char: str) -> bool:
+        """Step into an object or array opened by char, False if it is empty (and stepped over)"""
+        self.expect(char)
+        if self.peek() == {'{': '}', '[': ']'}[char]:
+            self.pos += 1
+            return False
+        return True
+
+
+def _object_items(reader: _Reader, keys: tuple, parents: tuple, top: bool = False) -> Iterator:
+    """(parents, item) of the array at keys in the object at the reader; fields read into parents"""
+    fields = {}
+    parents = parents + (fields,)
+    if not reader.opens('{'):
+        return
+    while True:
+        key = reader.key()
+        if key == keys[0] and reader.peek() == '[':
+            yield from _array_items(reader, keys[1:], parents)
+            if top:
+                return
+        else:
+            fields[key] = reader.value()
+        if not reader.next_member('}'):
+            return
+
+
+def _array_items(reader: _Reader, keys: tuple, parents: tuple) -> Iterator:
+    if not reader.opens('['):
+        return
+    while True:
+        if not keys:
+            yield parents, reader.value()
+        elif reader.peek() == '{':
+            yield from _object_items(reader, keys, parents)
+        else:
+            reader.value()
+        if not reader.next_member(']'):
+            return
+
+
+def iter_items(path, keys: tuple) -> Iterator:
+    """(parents, item) of every item of the nested array at keys, e.g. ('competitions', 'events', 'results').
+
+    parents has the fields read so far of the document and of each object
+    on the way (shared by the items under that object, so not to be changed).
+    """
+    with open(path, encoding='utf-8') as f:
+        yield from _object_items(_Reader(f), tuple(keys), (), top=True)
+
+
+def iter_records(path, key: str = 'results') -> Iterator[dict]:
+    """The records of the top-level array doc[key]"""
+    for _, record in iter_items(path, (key,)):
+        yield record
+
+
+def iter_event_results(path) -> Iterator[tuple]:
+    """(competition, event, result) of every result of a scraped season file"""
+    for (_, comp, event), result in iter_items(path, ('competitions', 'events', 'results')):
+        yield comp, event, result
+
+
+def read_header(path, key: str = 'results') -> dict:
+    """The top-level fields before doc[key] (all of them if there is no such key)"""
+    fields = {}
+    with open(path, encoding='utf-8') as f:
+        reader = _Reader(f)
+        if not reader.opens('{'):
+            return fields
+        while True:
+            name = reader.key()
+            if name == key:
+                return fields
+            fields[name] = reader.value()
+            if not reader.next_member('}'):
+                return fields
+
+
+def batched(items: Iterable, size: int = BATCH_SIZE) -> Iterator[list]:
+    """Lists of up to size consecutive items"""
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
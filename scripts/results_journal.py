@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Append-only checkpoint journal for the incremental USS PDF parsers.
+
+Each parsed PDF appends one JSON line, {"competition": {...}, "results":
+[...]}, to a journal next to the output file and fsyncs it, so a checkpoint
+costs only the new records and a crash loses at most the PDF being parsed.
+compact() folds the journal into the output JSON once at the end of a run
+(or at the start of the next one, after a crash) and removes it.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+
+def journal_path(output_path: Path) -> Path:
+    """Journal file that belongs to an output JSON file."""
+    return output_path.with_name(output_path.stem + '.journal.jsonl')
+
+
+def append(path: Path, competition: dict, results: list[dict]):
+    """Durably append one competition and its results to the journal."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+b') as f:
+        # A crash can leave a torn last line; start on a fresh one so this
+        # entry is not glued onto it
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        line = json.dumps({'competition': competition, 'results': results})
+        f.write(line.encode('utf-8') + b'\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def read(path: Path) -> Iterator[dict]:
+    """Yield journal entries in order, skipping lines torn by a crash."""
+    if not path.exists():
+        return
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            yield entry
+
+
+def competition_names(path: Path) -> list[str]:
+    """Names of the competitions already in the journal."""
+    return [entry['competition']['name'] for entry in read(path)]
+
+
+def compact(path: Path, output_path: Path, build: Optional[Callable[[dict], dict]] = None,
+            indent: Optional[int] = None) -> dict:
+    """Merge the journal into output_path, then delete the journal.
+
+    Journal entries are appended to the output's 'competitions' and
+    'results' (skipping competitions already there, so compacting twice is
+    harmless). build(data) can then rewrite the totals and metadata before
+    the output is replaced atomically. Returns the written data.
+    """
+    if output_path.exists():
+        with open(output_path) as f:
+            data = json.load(f)
+    else:
+        data = {'competitions': [], 'results': []}
+    data.setdefault('competitions', [])
+    data.setdefault('results', [])
+
+    existing = {c.get('name') for c in data['competitions']}
+    for entry in read(path):
+        competition = entry['competition']
+        if competition.get('name') in existing:
+            continue
+        existing.add(competition.get('name'))
+        data['competitions'].append(competition)
+        data['results'].extend(entry['results'])
+
+    if build:
+        data = build(data)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp_path, output_path)
+
+    if path.exists():
+        path.unlink()
+    return data
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Packed cache for scraped shorttracklive.info pages.
+
+Replaces the .scrape_cache/ directory of one HTML file per page, named by a
+mangled URL, with a single SQLite file keyed by canonical URL. Pages are
+zlib-compressed against a preset dictionary (a sample page stored in the
+file), so the markup every page shares costs almost nothing. Each entry
+records when it was fetched and how long it stays fresh; the cache is kept
+under a size limit by dropping expired pages, then least recently used ones.
+
+    python3 scripts/scrape_cache.py import [--remove]
+    python3 scripts/scrape_cache.py stats
+    python3 scripts/scrape_cache.py evict [--max-mb N]
+"""
+
+import argparse
+import re
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+REPO_DIR = Path(__file__).parent.parent
+LEGACY_DIR = REPO_DIR / '.scrape_cache'
+PACK_PATH = REPO_DIR / '.scrape_cache.sqlite'
+
+# Fresh pages of a running season; pass ttl=None for pages that never change
+DEFAULT_TTL = 7 * 24 * 3600
+MAX_BYTES = 512 * 1024 * 1024  # Compressed size kept by evict()
+ZDICT_SIZE = 32 * 1024  # zlib only looks back this far
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS dictionaries (
+        id INTEGER PRIMARY KEY,
+        data BLOB NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS pages (
+        url TEXT PRIMARY KEY,
+        body BLOB NOT NULL,
+        dict_id INTEGER,
+        size INTEGER NOT NULL,
+        stored_size INTEGER NOT NULL,
+        fetched_at REAL NOT NULL,
+        ttl REAL,
+        accessed_at REAL NOT NULL,
+        source TEXT NOT NULL DEFAULT ''
+    );
+
+    CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+'''
+
+# https___www_shorttracklive_info_index_php_comp_1049_skaterid_10104_m_12_saison_20.html
+LEGACY_NAME = re.compile(r'^https?___www_shorttracklive_info_index_php((?:_[a-z]+_\d+)*)\.html$')
+
+# Dictionaries never change once written; keyed by (database file, id)
+_dictionaries = {}
+
+
+def connect(path: Path = PACK_PATH) -> sqlite3.Connection:
+    """Open (and create if needed) the page cache."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def canonical_url(url: str) -> str:
+    """https, lower-case host and sorted query, so equivalent URLs share a key."""
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    url = f"https://{parts.netloc.lower()}{parts.path or '/'}"
+    return f'{url}?{query}' if query else url
+
+
+def url_from_legacy_name(filename: str) -> Optional[str]:
+    """Recover the URL of a .scrape_cache/ file, or None for unknown names."""
+    match = LEGACY_NAME.match(filename)
+    if not match:
+        return None
+    params = re.findall(r'_([a-z]+)_(\d+)', match.group(1))
+    return canonical_url('https://www.shorttracklive.info/index.php?' + urlencode(params))
+
+
+# --- Compression ------------------------------------------------------------
+
+def _dictionary(conn: sqlite3.Connection, dict_id: int) -> bytes:
+    key = (conn.execute('PRAGMA database_list').fetchone()[2], dict_id)
+    if key not in _dictionaries:
+        row = conn.execute('SELECT data FROM dictionaries WHERE id = ?', (dict_id,)).fetchone()
+        _dictionaries[key] = row[0]
+    return _dictionaries[key]
+
+
+def _current_dictionary(conn: sqlite3.Connection, sample: bytes) -> int:
+    """Id of the newest dictionary, creating one from sample if there is none."""
+    row = conn.execute('SELECT MAX(id) FROM dictionaries').fetchone()
+    if row[0] is not None:
+        return row[0]
+    with conn:
+        return conn.execute('INSERT INTO dictionaries (data) VALUES (?)',
+                            (sample[-ZDICT_SIZE:],)).lastrowid
+
+
+def _pack(conn: sqlite3.Connection, raw: bytes) -> tuple[bytes, int]:
+    dict_id = _current_dictionary(conn, raw)
+    compressor = zlib.compressobj(9, zdict=_dictionary(conn, dict_id))
+    return compressor.compress(raw) + compressor.flush(), dict_id
+
+
+def _unpack(conn: sqlite3.Connection, body: bytes, dict_id: Optional[int]) -> str:
+    if dict_id is None:
+        raw = zlib.decompress(body)
+    else:
+        decompressor = zlib.decompressobj(zdict=_dictionary(conn, dict_id))
+        raw = decompressor.decompress(body) + decompressor.flush()
+    return raw.decode('utf-8', errors='replace')
+
+
+# --- Pages ------------------------------------------------------------------
+
+def get(conn: sqlite3.Connection, url: str, allow_stale: bool = False) -> Optional[str]:
+    """Cached HTML for a URL, or None if it is missing (or expired, unless allow_stale)."""
+    url = canonical_url(url)
+    row = conn.execute('SELECT body, dict_id, fetched_at, ttl FROM pages WHERE url = ?',
+                       (url,)).fetchone()
+    if row is None:
+        return None
+    body, dict_id, fetched_at, ttl = row
+    if not allow_stale and ttl is not None and fetched_at + ttl < time.time():
+        return None
+    with conn:
+        conn.execute('UPDATE pages SET accessed_at = ? WHERE url = ?', (time.time(), url))
+    return _unpack(conn, body, dict_id)
+
+
+def put(conn: sqlite3.Connection, url: str, html: str, fetched_at: Optional[float] = None,
+        ttl: Optional[float] = DEFAULT_TTL, source: str = ''):
+    """Store a fetched page, replacing any previous copy."""
+    raw = html.encode('utf-8')
+    body, dict_id = _pack(conn, raw)
+    now = time.time()
+    with conn:
+        conn.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                     (canonical_url(url), body, dict_id, len(raw), len(body),
+                      fetched_at or now, ttl, now, source))
+
+
+def urls(conn: sqlite3.Connection, pattern: Optional[str] = None) -> list[str]:
+    """Cached URLs in order, optionally only those matching a regex."""
+    found = [row[0] for row in conn.execute('SELECT url FROM pages ORDER BY url')]
+    if pattern:
+        regex = re.compile(pattern)
+        found = [url for url in found if regex.search(url)]
+    return found
+
+
+def iter_pages(conn: sqlite3.Connection, pattern: Optional[str] = None) -> Iterator[tuple[str, str]]:
+    """Yield (url, html) for every cached page (stale ones included), in URL order.
+
+    Meant for bulk rebuilds, so access times are left alone.
+    """
+    regex = re.compile(pattern) if pattern else None
+    for url, body, dict_id in conn.execute('SELECT url, body, dict_id FROM pages ORDER BY url'):
+        if regex is None or regex.search(url):
+            yield url, _unpack(conn, body, dict_id)
+
+
+def evict(conn: sqlite3.Connection, max_bytes: int = MAX_BYTES) -> int:
+    """Drop expired pages, then least recently used ones, until the cache fits.
+
+    Returns the number of pages removed.
+    """
+    removed = 0
+    with conn:
+        total, = conn.execute('SELECT COALESCE(SUM(stored_size), 0) FROM pages').fetchone()
+        if total <= max_bytes:
+            return 0
+        expired = conn.execute('''
+            SELECT url, stored_size FROM pages
+            WHERE ttl IS NOT NULL AND fetched_at + ttl < ? ORDER BY accessed_at
+        ''', (time.time(),)).fetchall()
+        by_age = conn.execute('SELECT url, stored_size FROM pages ORDER BY accessed_at').fetchall()
+        doomed = set()
+        for url, stored_size in expired + by_age:
+            if total <= max_bytes:
+                break
+            if url in doomed:
+                continue
+            doomed.add(url)
+            total -= stored_size
+        conn.executemany('DELETE FROM pages WHERE url = ?', [(url,) for url in doomed])
+        removed = len(doomed)
+    return removed
+
+
+# --- Legacy directory -------------------------------------------------------
+
+def import_dir(conn: sqlite3.Connection, directory: Path = LEGACY_DIR, remove: bool = False) -> dict:
+    """Pack every page of a .scrape_cache/ directory. Returns counts.
+
+    Pages keep their file time as fetch time and never expire (they are
+    finished seasons). The file's sub-directory (s16/, profiles/) is kept as
+    its source. With remove=True each file is deleted once packed.
+    """
+    files = sorted(directory.rglob('*.html'))
+    counts = {'files': len(files), 'imported': 0, 'skipped': 0}
+    if not files:
+        return counts
+
+    # A typical page makes the best preset dictionary: pages of one kind
+    # differ only in their data
+    sizes = sorted(path.stat().st_size for path in files)
+    median = sizes[len(sizes) // 2]
+    sample = next(path for path in files if path.stat().st_size == median)
+    _current_dictionary(conn, sample.read_bytes())
+
+    for path in files:
+        url = url_from_legacy_name(path.name)
+        if url is None:
+            print(f"  Skipping {path.relative_to(directory)}: not a shorttracklive page name")
+            counts['skipped'] += 1
+            continue
+        html = path.read_bytes().decode('utf-8', errors='replace')
+        subdir = path.parent.relative_to(directory)
+        put(conn, url, html, fetched_at=path.stat().st_mtime, ttl=None,
+            source='' if subdir == Path('.') else subdir.as_posix())
+        counts['imported'] += 1
+        if remove:
+            path.unlink()
+    return counts
+
+
+def open_cache(path: Path = PACK_PATH) -> sqlite3.Connection:
+    """Connect, packing the legacy .scrape_cache/ directory first if the cache is empty."""
+    conn = connect(path)
+    empty = conn.execute('SELECT 1 FROM pages LIMIT 1').fetchone() is None
+    if empty and LEGACY_DIR.is_dir():
+        print(f"Packing {LEGACY_DIR} into {path.name}...")
+        counts = import_dir(conn, LEGACY_DIR)
+        print(f"  {counts['imported']} pages packed")
+    return conn
+
+
+def print_stats(conn: sqlite3.Connection, path: Path = PACK_PATH):
+    pages, raw, stored = conn.execute(
+        'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM pages'
+    ).fetchone()
+    expired, = conn.execute('SELECT COUNT(*) FROM pages WHERE ttl IS NOT NULL AND fetched_at + ttl < ?',
+                            (time.time(),)).fetchone()
+    sources = conn.execute('SELECT source, COUNT(*) FROM pages GROUP BY source ORDER BY source').fetchall()
+
+    print(f"Cache: {path}")
+    print(f"  Pages: {pages} ({expired} expired)")
+    print(f"  HTML: {raw / (1024*1024):.1f} MB, stored: {stored / (1024*1024):.1f} MB "
+          f"({raw / stored if stored else 0:.1f}x)")
+    if path.exists():
+        print(f"  File size: {path.stat().st_size / (1024*1024):.1f} MB")
+    for source, count in sources:
+        print(f"    {source or '(top level)':<12} {count:>5} pages")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Packed shorttracklive page cache')
+    parser.add_argument('command', choices=['import', 'stats', 'evict'])
+    parser.add_argument('--dir', type=Path, default=LEGACY_DIR,
+                        help='directory to import (default: .scrape_cache/)')
+    parser.add_argument('--remove', action='store_true',
+                        help='delete each file once it is packed')
+    parser.add_argument('--max-mb', type=float, default=MAX_BYTES / (1024 * 1024),
+                        help='size limit for evict')
+    args = parser.parse_args()
+
+    conn = connect()
+    try:
+        if args.command == 'import':
+            counts = import_dir(conn, args.dir, remove=args.remove)
+            print(f"{args.dir}: {counts['imported']} of {counts['files']} pages packed")
+            conn.execute('VACUUM')
+        elif args.command == 'evict':
+            removed = evict(conn, int(args.max_mb * 1024 * 1024))
+            print(f"Evicted {removed} pages")
+            conn.execute('VACUUM')
+        print_stats(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
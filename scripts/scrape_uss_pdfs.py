@@ -1,101 +1,53 @@
 #!/usr/bin/env python3
 """
 Scrape all PDF links from USS results page for seasons 2022-2026.
+
+Links are compared with the snapshot in data/uss_pdf_links.json, which
+update_uss_data.py advances once the PDFs are processed. --commit writes
+the scraped links to the snapshot here instead, for when the snapshot
+itself is wanted; the changes then no longer show up as new to
+update_uss_data.py. With --incremental the page is only re-read if it
+changed, and just the new, changed and removed links are reported (see
+uss_catalog.py).
 """
 
-import json
-import re
-import subprocess
-from pathlib import Path
-from datetime import datetime
+import argparse
 
-def get_page_source():
-    """Get page source using curl."""
-    url = "https://www.usspeedskating.org/results"
-    result = subprocess.run(['curl', '-s', url], capture_output=True, text=True)
-    return result.stdout
+import uss_catalog
 
 def extract_pdf_links(html):
     """Extract PDF links and competition names from HTML."""
-    # Pattern for PDF links in the page
-    pattern = r'href="(https://assets\.contentstack\.io/[^"]+\.pdf)"[^>]*>([^<]+)</a>'
-    matches = re.findall(pattern, html, re.IGNORECASE)
-    
-    # Also try alternative pattern
-    pattern2 = r'"(https://assets\.contentstack\.io/[^"]+\.pdf)"'
-    pdf_urls = set(re.findall(pattern2, html))
-    
-    # Extract date and name from link text
-    results = []
-    for url, text in matches:
-        # Parse date from text (format: YYYY-MM-DD - Name)
-        date_match = re.match(r'(\d{4}-\d{2}-\d{2})\s*[-–]\s*(.+)', text.strip())
-        if date_match:
-            date = date_match.group(1)
-            name = date_match.group(2).strip()
-        else:
-            date = None
-            name = text.strip()
-        
-        results.append({
-            'url': url,
-            'name': name,
-            'date': date
-        })
-    
-    return results, pdf_urls
+    return uss_catalog.extract_links([html])
 
 def main():
-    print("Fetching USS results page...")
-    html = get_page_source()
-    
-    # Save raw HTML for debugging
-    Path('uss_results_page.html').write_text(html)
-    print(f"Saved HTML ({len(html)} bytes)")
+    parser = argparse.ArgumentParser(description='Scrape USS results PDF links')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only report links added or changed since the last scrape')
+    parser.add_argument('--commit', action='store_true',
+                        help=f'write the links to {uss_catalog.SNAPSHOT_PATH.name}')
+    args = parser.parse_args()
     
-    # Extract PDF links
-    results, all_urls = extract_pdf_links(html)
+    print("Fetching USS results page...")
+    result = uss_catalog.check(full=not args.incremental)
+    if args.commit:
+        uss_catalog.commit(result)
+    if args.incremental:
+        uss_catalog.print_changes(result)
+        return
+    results = result['links']
     
     print(f"\nFound {len(results)} PDF links with names")
-    print(f"Found {len(all_urls)} total unique PDF URLs")
+    print(f"  {len(result['added'])} new, {len(result['changed'])} changed, "
+          f"{len(result['removed'])} removed since the last update")
     
-    # Group by season (based on date)
     by_season = {}
     for r in results:
-        if r['date']:
-            year = int(r['date'][:4])
-            month = int(r['date'][5:7])
-            # Season runs Aug-Jul, so Aug+ is next season
-            if month >= 8:
-                season = f"{year}-{year+1}"
-            else:
-                season = f"{year-1}-{year}"
-        else:
-            season = "unknown"
-        
-        if season not in by_season:
-            by_season[season] = []
-        by_season[season].append(r)
+        by_season.setdefault(uss_catalog.season_of(r['date']), []).append(r)
     
     print("\nBy season:")
     for season in sorted(by_season.keys()):
         print(f"  {season}: {len(by_season[season])} competitions")
     
-    # Save to JSON
-    output = {
-        'scraped_at': datetime.now().isoformat(),
-        'total_pdfs': len(results),
-        'by_season': by_season,
-        'all_results': results
-    }
-    
-    output_path = Path(__file__).parent.parent / 'data' / 'uss_pdf_links.json'
-    output_path.parent.mkdir(exist_ok=True)
-    with open(output_path, 'w') as f:
-        json.dump(output, f, indent=2)
-    
-    print(f"\nSaved to {output_path}")
-    
     # Print sample
     print("\nSample competitions (2022-2023 and 2023-2024):")
     for season in ['2022-2023', '2023-2024']:
@@ -103,6 +55,9 @@ def main():
             print(f"\n  {season}:")
             for r in by_season[season][:5]:
                 print(f"    - {r['date']}: {r['name'][:50]}")
+    
+    if args.commit:
+        print(f"\nSaved to {uss_catalog.SNAPSHOT_PATH}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+One join key for skater names across USS PDFs, USS history and shorttracklive.
+
+name_key() reduces every spelling of a name to the same key:
+
+    'CHEN\\xa0Daniel USA-PSSP'  -> 'chen daniel'
+    'Daniel Chen'              -> 'chen daniel'
+    'Kristen SANTOS-GRISWOLD'  -> 'griswold kristen santos'
+    'SANTOS GRISWOLD, Kristen' -> 'griswold kristen santos'
+
+(tokens are sorted, so LAST First and First LAST agree). name_key is the
+shared join key: build_time_trends, integrate_us_data, cross_validate_uss
+and name_dedup match names on it directly.
+
+Where a result has to land on a skater id, AliasIndex maps keys to the ids
+of the skater files and is persisted in data/skater_aliases.json
+(generate_time_trends uses it). When the skater files change it is seeded
+again: their ids override the stored ones, and ids they no longer list are
+dropped, so a renamed or removed skater does not keep receiving results.
+
+    python3 scripts/skater_identity.py [--rebuild]
+"""
+
+import argparse
+import json
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+import parse_cache
+
+REPO_DIR = Path(__file__).parent.parent
+INDEX_PATH = REPO_DIR / 'data' / 'skater_aliases.json'
+SEED_PATHS = [
+    REPO_DIR / 'dist' / 'data' / 'skaters.json',
+    REPO_DIR / 'dist' / 'data' / 'us_youth_skater_facts.json',
+]
+INDEX_VERSION = 2
+
+COUNTRIES = 'USA|CAN|CHN|KOR|JPN|NED|ITA|RUS|GBR|GER|FRA|AUS'
+# Club/country suffixes: any 'USA-PSSP', 'NZL-AKL', 'CAN-XXXXXX' form, or
+# a bare listed country ('USA'; a bare 'Kim' or 'Li' is a name)
+MEMBER_SUFFIX = re.compile(rf'\s+(?:[A-Za-z]{{2,3}}-[A-Za-z0-9]+|{COUNTRIES})$', re.IGNORECASE)
+LEADING_BIB = re.compile(r'^\d+')
+SEPARATORS = re.compile(r'[\s\-,]+')
+TRAILING_MARKS = re.compile(r'[*.]+$')
+
+
+def clean_name(name: str) -> str:
+    """The name without STL spacing, bib prefix, club/country suffix and trailing marks."""
+    name = ' '.join(name.replace('\xa0', ' ').split())
+    name = MEMBER_SUFFIX.sub('', name)
+    name = LEADING_BIB.sub('', name)
+    return TRAILING_MARKS.sub('', name).strip()
+
+
+@lru_cache(maxsize=None)
+def name_key(name: str) -> str:
+    """Order-, case- and punctuation-independent key for a skater name."""
+    if not name:
+        return ''
+    tokens = [TRAILING_MARKS.sub('', token) for token in SEPARATORS.split(clean_name(name).lower())]
+    return ' '.join(sorted(token for token in tokens if token))
+
+
+def split_name(name: str) -> tuple[str, str]:
+    """(first, last) of a display name. All-caps words are the last name."""
+    name = clean_name(name)
+    words = name.replace(',', ' ').split()
+    last = [w for w in words if w.isupper() and len(w) > 1]
+    if last and len(last) < len(words):
+        return ' '.join(w for w in words if w not in last), ' '.join(last)
+    if ',' in name:
+        # 'Last, First'
+        last, _, first = name.partition(',')
+        return ' '.join(first.split()), ' '.join(last.split())
+    return ' '.join(words[:-1]), ' '.join(words[-1:])
+
+
+def spellings(name: str) -> list[str]:
+    """The ways results PDFs write a name: 'LAST First', 'First LAST', 'LAST, First', 'F. LAST', 'First Last'."""
+    first, last = split_name(name)
+    if not first:
+        return [last]
+    return [f"{last.upper()} {first}", f"{first} {last.upper()}", f"{last.upper()}, {first}",
+            f"{first[0]}. {last.upper()}", f"{first} {last.title()}"]
+
+
+class AliasIndex:
+    """name key -> skater id, persisted between runs."""
+
+    def __init__(self, path: Path = INDEX_PATH):
+        self.path = path
+        self.aliases = {}
+        self.names = {}  # skater id -> display name
+        self.seeded = set()  # Ids that came from the skater files
+        self.seeds = {}  # Skater file name -> sha256 when last seeded
+        self.dirty = False
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') == INDEX_VERSION:
+            self.aliases = data['aliases']
+            self.names = data['names']
+            self.seeded = set(data['seeded'])
+            self.seeds = data['seeds']
+
+    def __len__(self):
+        return len(self.aliases)
+
+    def lookup(self, name: str) -> Optional[str]:
+        """The skater id for name, or None if it has not been seen."""
+        return self.aliases.get(name_key(name))
+
+    def add(self, skater_id: str, names: Iterable[str], authoritative: bool = False):
+        """Register names for skater_id. Names already taken by another skater keep theirs.
+
+        authoritative is for ids from a skater file: their names are taken
+        over from whichever skater had them.
+        """
+        if authoritative and skater_id not in self.seeded:
+            self.seeded.add(skater_id)
+            self.dirty = True
+        for name in names:
+            key = name_key(name)
+            if key and (key not in self.aliases or authoritative) and self.aliases.get(key) != skater_id:
+                self.aliases[key] = skater_id
+                self.dirty = True
+            if skater_id not in self.names and name:
+                self.names[skater_id] = name
+                self.dirty = True
+
+    def save(self):
+        """Write the index if anything was added since it was loaded."""
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': INDEX_VERSION, 'aliases': self.aliases, 'names': self.names,
+                       'seeded': sorted(self.seeded), 'seeds': self.seeds},
+                      f, ensure_ascii=False, indent=0, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+
+def seed_fingerprint(paths: Iterable[Path] = SEED_PATHS) -> dict:
+    """sha256 of each skater file that exists, by file name."""
+    return {path.name: parse_cache.file_sha256(path) for path in paths if path.exists()}
+
+
+def add_skaters(index: AliasIndex, skaters: Iterable[dict], claimed: Optional[set] = None):
+    """Register skater records ({'id', 'name', ...}) as authoritative.
+
+    Of several skaters with one name, the first keeps it, so the ids do not
+    depend on which duplicate comes last. claimed collects the keys taken
+    so far, to carry the rule across calls.
+    """
+    claimed = set() if claimed is None else claimed
+    for skater in skaters:
+        if skater.get('id') and skater.get('name'):
+            key = name_key(skater['name'])
+            index.add(skater['id'], [skater['name']], authoritative=key not in claimed)
+            claimed.add(key)
+
+
+def seed(index: AliasIndex, paths: Iterable[Path] = SEED_PATHS):
+    """Register the skaters of skaters.json (a list) and the skater facts (a dict by id).
+
+    Ids seeded before that the files no longer list are dropped first; names
+    added since keep their ids unless a skater file claims them.
+    """
+    dropped = set(index.seeded)
+    index.aliases = {key: skater_id for key, skater_id in index.aliases.items()
+                     if skater_id not in dropped}
+    index.names = {skater_id: name for skater_id, name in index.names.items()
+                   if skater_id not in dropped}
+    index.seeded = set()
+    claimed = set()  # Keys seeded in this pass: the first file listing a name keeps it
+    for path in paths:
+        try:
+            with open(path) as f:
+                skaters = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if isinstance(skaters, dict):
+            skaters = skaters.values()
+        add_skaters(index, skaters, claimed)
+    index.seeds = seed_fingerprint(paths)
+    index.dirty = True
+
+
+def load_index(path: Path = INDEX_PATH, seed_paths: Iterable[Path] = SEED_PATHS) -> AliasIndex:
+    """The persisted index, seeded again if it is new or the skater files changed."""
+    seed_paths = list(seed_paths)
+    index = AliasIndex(path)
+    if not len(index) or index.seeds != seed_fingerprint(seed_paths):
+        seed(index, seed_paths)
+        index.save()
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the skater alias index')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='discard the stored index and seed it again')
+    args = parser.parse_args()
+
+    if args.rebuild:
+        INDEX_PATH.unlink(missing_ok=True)
+    index = load_index()
+    print(f"{len(index)} aliases for {len(index.names)} skaters in {INDEX_PATH}")
+
+
+if __name__ == '__main__':
+    main()
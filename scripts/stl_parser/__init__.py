@@ -0,0 +1,24 @@
+"""
+Parsers for cached shorttracklive.info pages.
+
+Each parser takes the HTML of one page and returns plain dicts in the schema
+of the scraped_us_results_s*.json and skater_profiles.json files:
+
+    competition.parse_competition  results page (m=8 time analysis, m=0 classification)
+    skater.parse_profile           skater page (m=12)
+    season.parse_season_index      season index (saison=NN)
+
+rebuild_stl_results.py runs them over the page cache.
+"""
+
+from stl_parser.competition import parse_competition, parse_section
+from stl_parser.season import parse_season_index
+from stl_parser.skater import parse_profile, skater_info
+
+__all__ = [
+    'parse_competition',
+    'parse_section',
+    'parse_season_index',
+    'parse_profile',
+    'skater_info',
+]
@@ -0,0 +1,157 @@
+"""Competition result pages.
+
+Two views of a competition carry per-distance results:
+
+  m=8  "Time Analysis by distance": one table per distance and gender
+       (Women 1000 m) with Rank, Bib, Name, Member, Time.
+  m=0  "Distance Classification": one table per class and distance
+       (JUNIOR C&nbsp;777 m) with Rank, Bib, Name, Member, B-Time, plus
+       "Splitted Distance Classification" tables per gender, ranked
+       within the gender (1.&nbsp;(11.) is first woman, eleventh overall).
+       Its Place column is the place within a final (A, B, C), not the
+       classification. For some competitions m=0 only has the Overall
+       Classification or the entry list, which carry no times.
+
+Columns are looked up by their header, so both views share one row parser.
+"""
+
+import re
+from typing import Optional
+
+from stl_parser.tables import Cell, cell_text, is_title, leading_number, number, rows, skater_id
+
+# Page headings whose tables hold per-distance results
+RESULT_HEADINGS = ('Time Analysis by distance', 'Distance Classification',
+                   'Splitted Distance Classification')
+# Every other heading ends a results block
+OTHER_HEADINGS = re.compile(r'Classification|List of Entries|Time Analysis', re.I)
+
+TIME = re.compile(r'\d+:\d{2}\.\d{2,3}|\d{1,3}\.\d{2,3}')
+
+# Header name -> result field; the first column found wins
+COLUMNS = {
+    'place': ['Rank'],
+    'bib': ['Bib'],
+    'name': ['Name'],
+    'member': ['Member'],
+    'time': ['Time', 'B-Time'],
+}
+
+
+def parse_section(section: str) -> dict:
+    """Gender, distance and class of a table title.
+
+    'Women 1000 m' -> WOMEN, 1000, OPEN; 'JUNIOR B MEN\\xa0500 m' -> MEN,
+    500, JUNIOR B; 'DIVISION 1\\xa0111,12 m' -> MIXED, 12, DIVISION 1.
+    Distance is None for titles without metres (4. Laps, Skill Races).
+    """
+    match = re.search(r'(\d+)\s*m\b', section)
+    upper = section.upper()
+    if 'WOMEN' in upper:
+        gender = 'WOMEN'
+    elif re.search(r'\bMEN\b', upper):
+        gender = 'MEN'
+    else:
+        gender = 'MIXED'
+
+    class_name = 'OPEN'
+    if '\xa0' in section:
+        prefix = re.sub(r'\b(WOMEN|MEN)\b', '', section.split('\xa0')[0], flags=re.I).strip()
+        class_name = prefix or 'OPEN'
+
+    return {
+        'section': section,
+        'gender': gender,
+        'distance': int(match.group(1)) if match else None,
+        'class_name': class_name,
+    }
+
+
+def _header_name(cell: Cell) -> str:
+    """Column name of a header cell (the long form where there are two)."""
+    full = re.search(r"class='sklive-full'>(.*?)</span>", cell.raw, re.S)
+    text = cell_text(full.group(1)) if full else cell.text
+    return text.split('\n')[0].strip()
+
+
+def _columns(row: list[Cell]) -> Optional[dict]:
+    """Field -> column index for a table header row, or None if it is not one."""
+    names = [_header_name(cell) for cell in row]
+    if 'Name' not in names or 'Bib' not in names:
+        return None
+    columns = {}
+    for field, candidates in COLUMNS.items():
+        for candidate in candidates:
+            if candidate in names:
+                columns[field] = names.index(candidate)
+                break
+    return columns
+
+
+def _result(row: list[Cell], columns: dict) -> Optional[dict]:
+    def cell(field: str) -> str:
+        index = columns.get(field)
+        return row[index].text if index is not None and index < len(row) else ''
+
+    if columns['name'] >= len(row):
+        return None
+    sid = skater_id(row[columns['name']])
+    if sid is None:
+        return None  # Relay teams and entries without a skater page
+
+    time = cell('time')
+    return {
+        'place': leading_number(cell('place')),
+        'name': cell('name'),
+        'bib': number(cell('bib')),
+        'member': cell('member'),
+        'time': time if TIME.fullmatch(time) else '',
+        'skater_id': sid,
+    }
+
+
+def parse_competition(page: str) -> dict:
+    """Header and events of a competition results page.
+
+    Returns {'header': 'Name, dd.mm. - dd.mm.yyyy', 'events': [...]}, each
+    event a parse_section() dict with its 'results'. Tables whose title has
+    no distance are skipped.
+    """
+    header = None
+    events = []
+    in_results = False
+    event = None
+    columns = None
+
+    for row in rows(page):
+        if not row or not any(cell.text for cell in row):
+            continue
+        if is_title(row):
+            info = parse_section(row[0].text)
+            event = None
+            columns = None
+            if in_results and info['distance'] is not None:
+                event = {**info, 'results': []}
+                events.append(event)
+            continue
+
+        if len(row) == 1:
+            text = row[0].text
+            if header is None:
+                header = text
+            elif text in RESULT_HEADINGS:
+                in_results = True
+            elif OTHER_HEADINGS.search(text):
+                in_results = False
+            continue  # Round names (FINAL, SEMI-FINAL) need no handling
+
+        if event is None:
+            continue
+        if columns is None:
+            columns = _columns(row)
+            continue
+        result = _result(row, columns)
+        if result:
+            event['results'].append(result)
+
+    return {'header': header, 'events': events}
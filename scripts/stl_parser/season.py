@@ -0,0 +1,21 @@
+"""Season index pages (saison=NN): the competitions of a season in date order."""
+
+import re
+
+from stl_parser.tables import cell_text
+
+COMPETITION_LINK = re.compile(r"index\.php\?comp=(\d+)&(?:amp;)?m=0&(?:amp;)?saison=\d+'>(.*?)</a>", re.S)
+
+
+def parse_season_index(page: str) -> list[tuple[int, str]]:
+    """(comp_id, 'dd.mm. - dd.mm.yyyy, Name, Place') for each competition, in page order."""
+    competitions = []
+    seen = set()
+    for match in COMPETITION_LINK.finditer(page):
+        comp_id = int(match.group(1))
+        name = cell_text(match.group(2))
+        if comp_id in seen or not name:
+            continue
+        seen.add(comp_id)
+        competitions.append((comp_id, name))
+    return competitions
@@ -0,0 +1,77 @@
+"""Skater pages (m=12): personal details, personal bests and classifications."""
+
+import re
+from typing import Optional
+
+from stl_parser.tables import number, rows
+
+# 'Name, Place, CTY, dd.mm. - dd.mm.yyyy'
+COMPETITION_DATE = re.compile(r'^(.*), (\d{2}\.\d{2}\. - \d{2}\.\d{2}\.\d{4})$')
+RANK = re.compile(r'(\d+)\.\s*Rank')
+DISTANCE = re.compile(r'(\d+) m')
+
+DETAILS = {
+    'Name:': 'name',
+    'Country:': 'country',
+    'Gender:': 'gender',
+    'Age:': 'age',
+    'Age-Category:': 'age_category',
+    'Home Town:': 'home_town',
+    'Club:': 'club',
+}
+
+# Fields of the season files' skaters{} entries
+SKATER_FIELDS = ['country', 'gender', 'age', 'age_category', 'club']
+
+
+def _competition(text: str) -> tuple[str, Optional[str]]:
+    match = COMPETITION_DATE.match(text)
+    return (match.group(1), match.group(2)) if match else (text, None)
+
+
+def parse_profile(page: str, skater_id: int) -> dict:
+    """Profile of one skater in the skater_profiles.json schema."""
+    profile = {'skater_id': skater_id, **{field: None for field in DETAILS.values()},
+               'personal_bests': [], 'overall_classifications': [],
+               'distance_classifications': []}
+
+    for row in rows(page):
+        texts = [cell.text.replace('\xa0', ' ').strip() for cell in row]
+        if len(texts) >= 2 and texts[0] in DETAILS:
+            profile[DETAILS[texts[0]]] = texts[1] or None
+            continue
+
+        rank = RANK.fullmatch(texts[0]) if texts else None
+        distance = DISTANCE.fullmatch(texts[0]) if texts else None
+        if distance and len(texts) >= 4:
+            competition, date = _competition(texts[3])
+            profile['personal_bests'].append({
+                'distance': int(distance.group(1)), 'class': texts[1], 'time': texts[2],
+                'competition': competition, 'date': date,
+            })
+        elif rank and len(texts) >= 4 and DISTANCE.fullmatch(texts[2]):
+            competition, date = _competition(texts[3])
+            profile['distance_classifications'].append({
+                'rank': int(rank.group(1)), 'class': texts[1],
+                'distance': int(DISTANCE.fullmatch(texts[2]).group(1)),
+                'competition': competition, 'date': date,
+            })
+        elif rank and len(texts) == 3:
+            competition, date = _competition(texts[2])
+            profile['overall_classifications'].append({
+                'rank': int(rank.group(1)), 'class': texts[1],
+                'competition': competition, 'date': date,
+            })
+
+    if profile['age'] is not None:
+        profile['age'] = number(profile['age'])
+    return profile
+
+
+def skater_info(name: str, skater_id: int, profile: Optional[dict]) -> dict:
+    """Entry of a season file's skaters{}; details are None without a profile."""
+    info = {'name': name, 'skater_id': skater_id}
+    for field in SKATER_FIELDS:
+        info[field] = profile.get(field) if profile else None
+    info['matched_existing_id'] = None
+    return info
@@ -0,0 +1,61 @@
+"""Table rows and cells of shorttracklive pages.
+
+The pages are generated from one template: all content sits in
+<div id="mitte"> as flat table rows, with section titles in <strong>.
+Regular expressions over that markup are several times faster than a full
+HTML parser and need nothing beyond the standard library.
+"""
+
+import html
+import re
+from typing import Iterator, NamedTuple, Optional
+
+CONTENT_START = '<div id="mitte">'
+
+ROW = re.compile(r'<tr\b[^>]*>(.*?)</tr>', re.S | re.I)
+CELL = re.compile(r'<td\b[^>]*>(.*?)</td>', re.S | re.I)
+TAG = re.compile(r'<[^>]+>')
+SKATER_LINK = re.compile(r'skaterid=(\d+)')
+
+
+class Cell(NamedTuple):
+    raw: str   # Inner HTML
+    text: str  # Unescaped text, outer whitespace stripped (inner &nbsp; kept)
+
+
+def cell_text(raw: str) -> str:
+    # Most cells are plain text; skip the substitutions for those
+    if '<' in raw:
+        raw = TAG.sub('', raw)
+    if '&' in raw:
+        raw = html.unescape(raw)
+    return raw.strip(' \t\r\n')
+
+
+def rows(page: str) -> Iterator[list[Cell]]:
+    """Yield the cells of every table row in the page content."""
+    start = page.find(CONTENT_START)
+    for match in ROW.finditer(page, max(start, 0)):
+        yield [Cell(raw, cell_text(raw)) for raw in CELL.findall(match.group(1))]
+
+
+def is_title(row: list[Cell]) -> bool:
+    """Section titles are the only bold cells in a table."""
+    return len(row) >= 1 and '<strong>' in row[0].raw
+
+
+def skater_id(cell: Cell) -> Optional[int]:
+    match = SKATER_LINK.search(cell.raw)
+    return int(match.group(1)) if match else None
+
+
+def number(text: str) -> Optional[int]:
+    """1 for '1.', '1.&nbsp;' or '1'; None for '-', 'DNF', ''."""
+    match = re.fullmatch(r'(\d+)\.?', text.strip('\xa0 '))
+    return int(match.group(1)) if match else None
+
+
+def leading_number(text: str) -> Optional[int]:
+    """1 for '1.' and for '1.&nbsp;(11.)'; None for '-', 'DNF', ''."""
+    match = re.match(r'(\d+)\.', text.strip('\xa0 '))
+    return int(match.group(1)) if match else None
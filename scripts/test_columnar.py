@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Checks that columnar.encode / decode give back the documents they were given.
+
+Covered: a trends doc and a results doc, each through json.dumps / json.loads
+as the export writes them, with fields some records lack, null dates, dates
+with a time suffix, dictionary-encoded and plain columns, and distance keys
+that are ints in memory but strings once loaded from JSON.
+
+    python3 scripts/test_columnar.py    (or under pytest)
+"""
+
+import json
+
+import columnar
+
+
+def _round_trip(doc: dict) -> dict:
+    return columnar.decode(json.loads(json.dumps(columnar.encode(doc))))
+
+
+def _results_doc() -> dict:
+    results = []
+    for n in range(12):
+        record = {
+            'skater': f'Skater {n % 3}',
+            'competition': ['US Championships', 'AmCup 1', 'AmCup 2'][n % 3],
+            'date': None if n % 5 == 0 else f'2019-0{1 + n % 9}-1{n % 10}',
+            'distance': [500, 1000, 1500][n % 3],
+            'time': 42.5 + n,
+            'place': n + 1,
+        }
+        if n % 4 == 0:
+            del record['place']
+        if n % 6 == 0:
+            record['note'] = None
+        results.append(record)
+    return {'generated': '2026-01-01T00:00:00', 'source': 'uss', 'results': results}
+
+
+def _trends_doc() -> dict:
+    trends = {}
+    for n in range(4):
+        by_distance = {}
+        for distance in (500, '1000', 1500):
+            by_distance[distance] = [
+                {'date': None if k == 2 else f'2018-1{k}-0{n + 1}T00:00:00',
+                 'time': 44.0 + n + k,
+                 'competition': f'World Cup {k}'}
+                for k in range(3)
+            ]
+            if n == 1:
+                by_distance[distance][0]['dq'] = True
+        trends[f'skater-{n}'] = by_distance
+    trends['skater-empty'] = {}
+    return {'version': 2, 'trends': trends}
+
+
+def test_results_round_trip():
+    doc = _results_doc()
+    assert _round_trip(doc) == doc
+
+
+def test_results_round_trip_keeps_absent_fields_absent():
+    decoded = _round_trip(_results_doc())['results']
+    assert 'place' not in decoded[0] and decoded[1]['place'] == 2
+    assert decoded[0]['note'] is None and 'note' not in decoded[1]
+    assert decoded[0]['date'] is None
+
+
+def test_results_columns_are_compacted():
+    columns = columnar.encode(_results_doc())['columns']
+    assert 'codes' in columns['competition']
+    assert 'days' in columns['date']
+    assert 'values' in columns['time']
+
+
+def test_trends_round_trip_from_json():
+    doc = json.loads(json.dumps(_trends_doc()))  # distance keys are strings, as on disk
+    assert _round_trip(doc) == doc
+
+
+def test_trends_round_trip_in_memory_distance_keys():
+    doc = _trends_doc()
+    decoded = columnar.decode(columnar.encode(doc))
+    assert decoded == doc
+    assert list(decoded['trends']['skater-0']) == [500, '1000', 1500]
+
+
+def test_decode_rejects_other_documents():
+    try:
+        columnar.decode({'format': 'columnar', 'version': columnar.FORMAT_VERSION + 1})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('decode accepted a document of another version')
+
+
+def main():
+    tests = [value for name, value in globals().items() if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"  ok  {test.__name__}")
+    print(f"{len(tests)} checks passed")
+
+
+if __name__ == '__main__':
+    main()
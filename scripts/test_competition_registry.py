@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Checks that competition_registry gives USS and STL names of a meet one ID.
+
+    python3 scripts/test_competition_registry.py    (or under pytest)
+"""
+
+from competition_registry import CompetitionRegistry, normalize_comp_name, stl_date
+
+# (USS name, STL name, ID)
+SAME_MEET = [
+    ('Great Lakes Short Track & Heartland #2',
+     '11.11. - 11.11.2022, Great Lakes ST & Heartland #2 Milwaukee, WI',
+     'great-lakes-short-track-heartland'),
+    ('NorthBurke ST Open', '15.02. - 15.02.2025, 2025 NorthBurke Short Track Open',
+     'northburke-short-track-open'),
+    ('Ohio State Championships', '25.02. - 25.02.2023, 2023 OHIO STATE CHAMPIONSHIP',
+     'ohio-state-championship'),
+    ('UOO Winter Challenge', '20.12. - 21.12.2025, 2026 UOO Winter Challenge Salt Lake City UT USA',
+     'uoo-winter-challenge'),
+]
+
+
+def test_uss_and_stl_names_share_an_id():
+    registry = CompetitionRegistry()
+    for uss, stl, cid in SAME_MEET:
+        assert registry.add(uss, source='uss') == cid, uss
+        assert registry.add(stl, source='stl') == cid, stl
+        assert registry.has_source(cid, 'uss') and registry.has_source(cid, 'stl')
+
+
+def test_st_abbreviation_only():
+    assert normalize_comp_name('St. Louis Fall Classic') == 'st. louis fall classic'
+    assert normalize_comp_name('Stars Open') == 'stars open'
+
+
+def test_dates():
+    registry = CompetitionRegistry()
+    cid = registry.add('11.11. - 11.11.2022, Great Lakes ST & Heartland #2 Milwaukee, WI')
+    assert registry[cid]['dates'] == {'2022-11-11'}
+    assert stl_date('Park Ridge Open') is None
+    assert registry.add('') is None
+
+
+def main():
+    tests = [value for name, value in globals().items() if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"  ok  {test.__name__}")
+    print(f"{len(tests)} checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Checks event_times' column parsers on hand-made columns.
+
+- times in every accepted spelling, and the strings that are not times
+- whole milliseconds come out exact
+- first-number distances and their standard events
+- the plausibility bounds per event, and for distances without an event
+
+    python3 scripts/test_event_times.py    (or under pytest)
+"""
+
+import math
+
+import event_times
+
+
+def test_parse_times_ms():
+    values = ['45.820', ' 1:27.792 ', '1:02:03.5', '42', '9.09', None, '', 'DNF',
+              '1:2:3:4', ':45.1', '45.1.2', '1.2:3']
+    expected = [45_820, 87_792, 3_723_500, 42_000, 9_090] + [None] * 7
+    parsed = event_times.parse_times_ms(values).tolist()
+    for value, ms, want in zip(values, parsed, expected):
+        if want is None:
+            assert math.isnan(ms), (value, ms)
+        else:
+            assert ms == want, (value, ms)
+
+
+def test_parse_times_ms_empty_columns():
+    assert event_times.parse_times_ms([]).tolist() == []
+    assert all(math.isnan(ms) for ms in event_times.parse_times_ms(['', '']).tolist())
+
+
+def test_parse_times_masked():
+    assert event_times.parse_times_masked(['41.5', 'DQ', None]).tolist() == [41.5, None, None]
+
+
+def test_distance_meters_and_events():
+    distances = ['500m', '1000 m', 1500, '777', 'Relay 3000m', None, '', 'Final', 460, 2000, 1200]
+    meters = event_times.distance_meters(distances)
+    assert meters.tolist() == [500, 1000, 1500, 777, 3000, 0, 0, 0, 460, 2000, 1200]
+    events = event_times.normalize_distances(meters)
+    assert events.tolist() == [500, 1000, 1500, 777, 3000, 0, 0, 0, 500, 1500, 0]
+
+
+def test_valid_times():
+    ms = [45_000, 30_000, 150_000, 150_001, float('nan'), 0, 45_000, 100_000]
+    events = [500, 500, 500, 500, 500, 500, 0, 1200]
+    valid = event_times.valid_times(ms, events).tolist()
+    assert valid == [True, False, True, False, False, False, False, True]
+
+
+def main():
+    tests = [value for name, value in globals().items() if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"  ok  {test.__name__}")
+    print(f"{len(tests)} checks passed")
+
+
+if __name__ == '__main__':
+    main()
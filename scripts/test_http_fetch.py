@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Checks http_fetch's downloads against a local HTTP/1.1 stand-in server.
+
+The stand-in serves files with ETag / Last-Modified, answers conditional
+GETs with 304, honours Range with If-Range (416 past the end) and keeps
+connections alive, counting them. Checked:
+
+- a second run over the same files gets only 304s
+- a truncated .part is resumed with a Range request, byte for byte
+- a new ETag means a full download, also over a stale .part
+- a .part longer than the file (416) is discarded and downloaded again
+- 9 downloads share at most `concurrency` connections
+- one-file runs over a caller's pool reuse a single connection
+
+    python3 scripts/test_http_fetch.py    (or under pytest)
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import http_fetch
+
+FILE_SIZE = 50_000  # Over http_fetch.MIN_PDF_SIZE
+
+
+class StandIn:
+    """A keep-alive file server on localhost; use as a context manager."""
+
+    def __init__(self):
+        self.files = {}  # path -> (body, etag)
+        self.requests = []  # (path, status, request headers)
+        self.connections = 0
+        self.lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with stand_in.lock:
+                    stand_in.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def reply(self, status, headers=(), body=b''):
+                with stand_in.lock:
+                    stand_in.requests.append((self.path, status, dict(self.headers)))
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path not in stand_in.files:
+                    return self.reply(404)
+                body, etag = stand_in.files[self.path]
+                validators = [('ETag', etag), ('Last-Modified', formatdate(0, usegmt=True))]
+                if self.headers.get('If-None-Match') == etag:
+                    return self.reply(304, validators)
+                byte_range = self.headers.get('Range')
+                if byte_range and self.headers.get('If-Range') == etag:
+                    start = int(byte_range.removeprefix('bytes=').rstrip('-'))
+                    if start >= len(body):
+                        return self.reply(416, [('Content-Range', f'bytes */{len(body)}')])
+                    return self.reply(206, validators + [
+                        ('Content-Range', f'bytes {start}-{len(body) - 1}/{len(body)}')], body[start:])
+                self.reply(200, validators, body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+
+    def url(self, path: str) -> str:
+        return f'http://127.0.0.1:{self.server.server_port}{path}'
+
+    def publish(self, path: str, body: bytes):
+        self.files[path] = (body, '"%s"' % hashlib.sha256(body).hexdigest()[:16])
+
+    def body(self, url: str) -> bytes:
+        return self.files[url.removeprefix(self.url(''))][0]
+
+    def statuses(self) -> list:
+        return [status for _, status, _ in self.requests]
+
+    def reset_counts(self):
+        self.requests = []
+        self.connections = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _jobs(server: StandIn, directory: Path, count: int) -> list:
+    jobs = []
+    for n in range(count):
+        path = f'/pdf/{n}.pdf'
+        server.publish(path, os.urandom(FILE_SIZE))
+        jobs.append((server.url(path), directory / f'{n}.pdf'))
+    return jobs
+
+
+def test_second_run_is_all_not_modified():
+    with StandIn() as server, tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        jobs = _jobs(server, directory, 3)
+        manifest = directory / http_fetch.MANIFEST_NAME
+        first = http_fetch.download_files(jobs, manifest)
+        assert [o['status'] for o in first] == ['downloaded'] * 3
+
+        server.reset_counts()
+        second = http_fetch.download_files(jobs, manifest)
+        assert [o['status'] for o in second] == ['not_modified'] * 3
+        assert server.statuses() == [304] * 3
+        for url, path in jobs:
+            assert path.read_bytes() == server.body(url)
+
+
+def _interrupt(server: StandIn, url: str, output_path: Path, manifest: Path, keep: int, etag: str):
+    """Leave the state of a download that stopped after keep bytes."""
+    body = server.body(url)
+    output_path.with_name(output_path.name + '.part').write_bytes(body[:keep])
+    http_fetch.update_manifest(manifest, {output_path.name: {
+        'url': url, 'part': {'etag': etag, 'last_modified': None}}})
+
+
+def test_truncated_part_resumes():
+    with StandIn() as server, tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        manifest = directory / http_fetch.MANIFEST_NAME
+        (url, output_path), = _jobs(server, directory, 1)
+        body, etag = server.files['/pdf/0.pdf']
+        _interrupt(server, url, output_path, manifest, 12_345, etag)
+
+        outcome, = http_fetch.download_files([(url, output_path)], manifest)
+        assert outcome['status'] == 'resumed'
+        assert server.statuses() == [206]
+        assert server.requests[0][2]['Range'] == 'bytes=12345-'
+        assert output_path.read_bytes() == body
+        assert not output_path.with_name('0.pdf.part').exists()
+
+
+def test_changed_etag_downloads_again():
+    with StandIn() as server, tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        manifest = directory / http_fetch.MANIFEST_NAME
+        (url, output_path), = _jobs(server, directory, 1)
+        http_fetch.download_files([(url, output_path)], manifest)
+
+        # A new version of a complete file
+        server.publish('/pdf/0.pdf', os.urandom(FILE_SIZE))
+        server.reset_counts()
+        outcome, = http_fetch.download_files([(url, output_path)], manifest)
+        assert outcome['status'] == 'downloaded'
+        assert server.statuses() == [200]
+        assert output_path.read_bytes() == server.files['/pdf/0.pdf'][0]
+
+        # A .part of the old version: If-Range no longer matches
+        old_etag = server.files['/pdf/0.pdf'][1]
+        output_path.unlink()
+        _interrupt(server, url, output_path, manifest, 20_000, old_etag)
+        server.publish('/pdf/0.pdf', os.urandom(FILE_SIZE))
+        server.reset_counts()
+        outcome, = http_fetch.download_files([(url, output_path)], manifest)
+        assert outcome['status'] == 'downloaded'
+        assert server.statuses() == [200]
+        assert output_path.read_bytes() == server.files['/pdf/0.pdf'][0]
+
+
+def test_oversized_part_restarts():
+    with StandIn() as server, tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        manifest = directory / http_fetch.MANIFEST_NAME
+        (url, output_path), = _jobs(server, directory, 1)
+        body, etag = server.files['/pdf/0.pdf']
+        output_path.with_name('0.pdf.part').write_bytes(body + b'extra')
+        http_fetch.update_manifest(manifest, {'0.pdf': {
+            'url': url, 'part': {'etag': etag, 'last_modified': None}}})
+
+        outcome, = http_fetch.download_files([(url, output_path)], manifest)
+        assert outcome['status'] == 'downloaded'
+        assert server.statuses() == [416, 200]
+        assert output_path.read_bytes() == body
+
+
+def test_connections_are_shared():
+    concurrency = 3
+    with StandIn() as server, tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        jobs = _jobs(server, directory, 9)
+        outcomes = http_fetch.download_files(jobs, directory / http_fetch.MANIFEST_NAME,
+                                             concurrency=concurrency)
+        assert [o['status'] for o in outcomes] == ['downloaded'] * 9
+        assert server.connections <= concurrency, server.connections
+        for url, path in jobs:
+            assert path.read_bytes() == server.body(url)
+
+
+def test_pool_outlives_runs():
+    with StandIn() as server, tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        jobs = _jobs(server, directory, 4)
+        pool = {}
+        try:
+            for job in jobs:
+                outcomes = http_fetch.download_files([job], directory / http_fetch.MANIFEST_NAME,
+                                                     concurrency=1, pool=pool)
+                assert outcomes[0]['status'] == 'downloaded'
+        finally:
+            http_fetch.close_pool(pool)
+        assert server.connections == 1, server.connections
+
+
+def main():
+    tests = [value for name, value in globals().items() if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"  ok  {test.__name__}")
+    print(f"{len(tests)} checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Checks line_classifier against the answers of the per-pattern chains it replaced.
+
+- ordered_search gives what re.search() with each pattern in turn gives,
+  including an earlier pattern that only matches further right
+- each grammar classifies a set of header and result lines taken from USS
+  protocols to the tokens the old chains produced
+
+    python3 scripts/test_line_classifier.py    (or under pytest)
+"""
+
+import re
+
+import line_classifier as lc
+
+
+def _first_match(patterns, text, flags=0):
+    for index, pattern in enumerate(patterns):
+        match = re.search(pattern, text, flags)
+        if match:
+            return index, match.group(1) if match.re.groups else None
+    return None
+
+
+def test_ordered_search_matches_the_pattern_order():
+    patterns = [r'b(\d)', r'a(\d)', r'c\d']
+    search = lc.ordered_search(patterns)
+    for text in ['a1 b2', 'b2 a1', 'a1', 'c3 a1', 'c3', 'xyz', '']:
+        assert search(text) == _first_match(patterns, text), text
+
+
+def test_ordered_search_prefilter_and_flags():
+    texts = ['Senior Men', 'U 12 girls', 'ladies', 'Open', '500m Junior Boys Final']
+    search = lc.ordered_search(lc.US_CATEGORY_PATTERNS, re.IGNORECASE,
+                               prefilter=r'Men|Ladies|Boys|Girls|U(?:nder)?\s*\d')
+    for text in texts:
+        assert search(text) == _first_match(lc.US_CATEGORY_PATTERNS, text, re.IGNORECASE), text
+
+
+LINES = {
+    '500m Senior Men Final A': (
+        (lc.DISTANCE, '500m', 'Senior Men'),
+        (lc.DISTANCE, 500, None),
+        (lc.DISTANCE, 500, 'SENIOR MEN')),
+    '1000 M Junior Girls': (
+        (lc.DISTANCE, '1000m', 'Junior Girls'),
+        (lc.DISTANCE, 1000, None),
+        (lc.DISTANCE, 1000, 'JUNIOR G')),
+    'Distance: 1500': (
+        (lc.DISTANCE, '1500m', None),
+        None,
+        None),
+    'JUNIOR C 777m': (
+        (lc.DISTANCE, '777m', None),
+        (lc.DISTANCE, 777, None),
+        (lc.DISTANCE, 777, 'JUNIOR C')),
+    'Masters Women 45': (
+        (lc.CATEGORY, 'Masters Women 45'),
+        (lc.CATEGORY, 'Masters Women'),
+        (lc.CATEGORY, 'MASTERS WOMEN 45')),
+    'U12 Boys': (
+        (lc.CATEGORY, 'U12 Boys'),
+        (lc.CATEGORY, 'U12 Boys'),
+        (lc.CATEGORY, 'BOYS')),
+    'Heat 3 Open W': (
+        None,
+        (lc.CATEGORY, 'Open Women'),
+        None),
+    'DIVISION 2 BOYS': (
+        (lc.CATEGORY, 'BOYS'),
+        None,
+        (lc.CATEGORY, 'DIVISION 2')),
+    'Page 2 of 5': (None, None, None),
+    '1 123 Jane Smith SLC 45.123': (
+        (lc.RESULT, {'place': 1, 'name': 'Jane Smith', 'club': 'SLC', 'time': '45.123'}),
+        (lc.RESULT, 1, '45.123', '123 Jane Smith SLC'),
+        (lc.RESULT, 1, '45.123', '123 Jane Smith SLC')),
+    '2. John Doe 1:02.345': (
+        (lc.RESULT, {'place': 2, 'name': 'John Doe', 'club': None, 'time': '1:02.345'}),
+        (lc.RESULT, 2, '1:02.345', 'John Doe'),
+        (lc.RESULT, 2, '1:02.345', 'John Doe')),
+    '3 Bob Lee DNF': (
+        (lc.RESULT, {'place': 3, 'name': 'Bob Lee', 'club': None, 'time': 'DNF'}),
+        None,
+        None),
+    '4 Some Name MN': (
+        (lc.RESULT, {'place': 4, 'name': 'Some Name', 'club': 'MN', 'time': None}),
+        None,
+        None),
+}
+
+
+def test_grammars():
+    classifiers = (lc.classify_us_line, lc.classify_batch_line, lc.classify_update_line)
+    for line, expected in LINES.items():
+        for classify, tokens in zip(classifiers, expected):
+            assert classify(line) == tokens, (classify.__name__, line)
+
+
+def main():
+    tests = [value for name, value in globals().items() if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"  ok  {test.__name__}")
+    print(f"{len(tests)} checks passed")
+
+
+if __name__ == '__main__':
+    main()
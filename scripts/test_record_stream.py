@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Checks record_stream's chunked reader against json.loads.
+
+A document with numbers in every form (fractions, exponents, negatives),
+strings, literals and nested records is streamed at every chunk size from
+1 to 32, so every value is cut by a chunk boundary at every offset.
+
+    python3 scripts/test_record_stream.py    (or under pytest)
+"""
+
+import io
+import json
+import tempfile
+from pathlib import Path
+
+import record_stream
+
+DOCUMENT = (
+    '{"score":94.4,"season":"2023-2024","ratio":-1.25e-3,"count":12E2,"results":['
+    '{"a":1,"time":41.873,"place":10,"dq":false,"note":null},'
+    '{"a":-2,"big":1e21,"name":"Kim \\u00e9 \\"Lee\\"","splits":[9.5,10.25,1E+2]},'
+    '{}],"skaters":[{"never":"read"}]}'
+)
+
+
+def _stream(text: str, chunk_size: int) -> tuple[dict, list]:
+    reader = record_stream._Reader(io.StringIO(text), chunk_size)
+    items = list(record_stream._object_items(reader, ('results',), (), top=True))
+    header = items[0][0][0] if items else {}
+    return header, [record for _, record in items]
+
+
+def test_every_chunk_size():
+    doc = json.loads(DOCUMENT)
+    header = {key: value for key, value in doc.items() if key in ('score', 'season', 'ratio', 'count')}
+    for chunk_size in range(1, 33):
+        assert _stream(DOCUMENT, chunk_size) == (header, doc['results']), chunk_size
+        spaced = json.dumps(doc, indent=1)
+        assert _stream(spaced, chunk_size) == (header, doc['results']), chunk_size
+
+
+def test_number_cut_before_its_fraction():
+    text = '{"score": 94.4, "results": [{"a": 1}]}'
+    for chunk_size in range(1, 33):
+        assert _stream(text, chunk_size) == ({'score': 94.4}, [{'a': 1}]), chunk_size
+
+
+def test_files():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'results.json'
+        path.write_text(DOCUMENT)
+        assert list(record_stream.iter_records(path)) == json.loads(DOCUMENT)['results']
+        assert record_stream.read_header(path) == {'score': 94.4, 'season': '2023-2024',
+                                                   'ratio': -1.25e-3, 'count': 1200.0}
+
+
+def main():
+    tests = [value for name, value in globals().items() if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"  ok  {test.__name__}")
+    print(f"{len(tests)} checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Checks skater_identity's name keys and the alias index seeding.
+
+- every spelling of a name gets the same key, with any federation-club
+  suffix stripped, listed in COUNTRIES or not
+- short last names are not mistaken for a bare country code
+- of several skaters with one name, seeding and add_skaters keep the first
+
+    python3 scripts/test_skater_identity.py    (or under pytest)
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from skater_identity import AliasIndex, add_skaters, clean_name, name_key, seed
+
+
+def test_spellings_share_a_key():
+    for name in ['CHEN\xa0Daniel USA-PSSP', 'Daniel Chen', 'CHEN, Daniel', '44CHEN Daniel*', 'chen daniel usa']:
+        assert name_key(name) == 'chen daniel', name
+
+
+def test_unlisted_federation_suffix():
+    assert name_key('CHEN Daniel NZL-AKL') == 'chen daniel'
+    assert name_key('Daniel CHEN hk-stc') == 'chen daniel'
+    assert clean_name('SMITH Anna NZ-1') == 'SMITH Anna'
+
+
+def test_short_last_names_are_kept():
+    assert name_key('Daniel Kim') == 'daniel kim'
+    assert name_key('LI Wen') == 'li wen'
+    assert name_key('Kristen SANTOS-GRISWOLD') == 'griswold kristen santos'
+
+
+def test_seed_keeps_the_first_skater():
+    with tempfile.TemporaryDirectory() as tmp:
+        skaters = Path(tmp) / 'skaters.json'
+        skaters.write_text(json.dumps([{'id': 'daniel-chen', 'name': 'Daniel Chen'},
+                                       {'id': 'daniel-chen-2', 'name': 'CHEN Daniel'}]))
+        index = AliasIndex(Path(tmp) / 'aliases.json')
+        seed(index, [skaters])
+        assert index.lookup('Daniel CHEN USA-PSSP') == 'daniel-chen'
+
+
+def test_add_skaters_keeps_the_first_skater():
+    with tempfile.TemporaryDirectory() as tmp:
+        index = AliasIndex(Path(tmp) / 'aliases.json')
+        index.add('old-id', ['Daniel Chen'])
+        add_skaters(index, [{'id': 'daniel-chen', 'name': 'Daniel Chen'},
+                            {'id': 'daniel-chen-2', 'name': 'CHEN Daniel'}])
+        assert index.lookup('Daniel Chen') == 'daniel-chen'
+
+
+def main():
+    tests = [value for name, value in globals().items() if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"  ok  {test.__name__}")
+    print(f"{len(tests)} checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Checks build_time_trends.dedupe_results on small hand-made result lists.
+
+The expected lists are what the pairwise scan it replaced kept:
+
+- a dated result within 2 days of a kept one is the same competition;
+  the faster stays, in the earlier one's place
+- a replacement moves the window to its own date, a slower match does not
+- undated results match on the first 30 characters of the competition,
+  dated or not; a faster one replaces its match and moves to the end
+- an unparseable date matches nothing
+
+    python3 scripts/test_time_trends_dedup.py    (or under pytest)
+"""
+
+import build_time_trends as btt
+
+
+def _result(date, time, competition='World Cup 1'):
+    return {'date': date, 'time': time, 'competition': competition}
+
+
+def test_same_competition_keeps_the_faster_in_place():
+    heat = _result('2020-01-10', 45.0)
+    final = _result('2020-01-11', 44.0)
+    later = _result('2020-01-20', 46.0, 'World Cup 2')
+    assert btt.dedupe_results([later, heat, final]) == [final, later]
+
+
+def test_slower_match_keeps_the_window_on_its_date():
+    first = _result('2020-01-01', 45.0)
+    slower = _result('2020-01-03', 46.0)
+    fastest = _result('2020-01-05', 44.0)
+    assert btt.dedupe_results([first, slower, fastest]) == [first, fastest]
+
+
+def test_faster_match_moves_the_window():
+    first = _result('2020-01-01', 45.0)
+    faster = _result('2020-01-03', 44.5)
+    fastest = _result('2020-01-05', 44.0)
+    assert btt.dedupe_results([first, faster, fastest]) == [fastest]
+
+
+def test_undated_results_match_on_competition_prefix():
+    dated = _result('2019-02-01', 45.0, 'US Championships 2019 - Salt Lake City')
+    undated_slower = _result(None, 46.0, 'US Championships 2019 - Salt Lake City, day 2')
+    undated_faster = _result(None, 44.0, 'US Championships 2019 - Salt Lake')
+    other = _result('2019-03-01', 47.0, 'AmCup Final')
+    kept = btt.dedupe_results([undated_slower, dated, other, undated_faster])
+    assert kept == [other, undated_faster]
+
+
+def test_unmatched_undated_and_unparseable_dates_are_kept():
+    dated = _result('2021-11-05', 45.0)
+    undated = _result(None, 44.0, 'Club Race')
+    odd = _result('2021-11-06?', 43.0)
+    assert btt.dedupe_results([odd, undated, dated]) == [dated, odd, undated]
+
+
+def main():
+    tests = [value for name, value in globals().items() if name.startswith('test_')]
+    for test in tests:
+        test()
+        print(f"  ok  {test.__name__}")
+    print(f"{len(tests)} checks passed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Extracted-text store sitting between pdfplumber and the regex parsers.
+
+Page text and tables are stored zlib-compressed in one SQLite file, keyed by
+the PDF's SHA-256, the extraction engine and the page number. Parsers call
+read_pages() or iter_pages() instead of opening the PDF themselves: the
+first call pays for layout analysis, every later call (e.g. after tuning a
+regex) is a few SQLite lookups.
+"""
+
+import json
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Iterator, Optional
+
+from parse_cache import KB_DIR, file_sha256
+
+STORE_PATH = KB_DIR / 'cache' / 'page_text.sqlite'
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS documents (
+        sha256 TEXT NOT NULL,
+        engine TEXT NOT NULL,
+        page_count INTEGER NOT NULL,
+        PRIMARY KEY (sha256, engine)
+    );
+
+    CREATE TABLE IF NOT EXISTS pages (
+        sha256 TEXT NOT NULL,
+        engine TEXT NOT NULL,
+        page INTEGER NOT NULL,
+        text BLOB NOT NULL,
+        tables BLOB,
+        PRIMARY KEY (sha256, engine, page)
+    );
+'''
+
+def connect(path: Path = STORE_PATH) -> sqlite3.Connection:
+    """Open (and create if needed) the page store."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=60)
+    # WAL lets several parser processes read and write concurrently
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _pack(value) -> bytes:
+    if isinstance(value, str):
+        return zlib.compress(value.encode('utf-8'))
+    return zlib.compress(json.dumps(value).encode('utf-8'))
+
+
+def _unpack_text(blob: bytes) -> str:
+    return zlib.decompress(blob).decode('utf-8')
+
+
+def _unpack_tables(blob: bytes) -> list:
+    return json.loads(zlib.decompress(blob))
+
+
+def _extract_pdfplumber(pdf_path: Path, start: int, stop: Optional[int],
+                        tables: bool) -> Iterator[tuple[int, dict]]:
+    """Yield (page_count, page) one page at a time."""
+    import pdfplumber
+    from page_analysis import analyze_page
+
+    with pdfplumber.open(pdf_path) as pdf:
+        page_count = len(pdf.pages)
+        for page in pdf.pages[start:stop]:
+            analyzed = analyze_page(page, tables=tables)
+            yield page_count, {
+                'text': analyzed['text'],
+                'tables': analyzed['tables'] if tables else None,
+            }
+
+
+def _extract_pdfminer(pdf_path: Path, start: int, stop: Optional[int],
+                      tables: bool) -> Iterator[tuple[int, dict]]:
+    """Yield (page_count, page); pdfminer extracts the whole document at once."""
+    from pdfminer.high_level import extract_text
+
+    # pdfminer terminates every page with a form feed
+    texts = extract_text(str(pdf_path)).split('\f')[:-1]
+    for text in texts[start:stop]:
+        yield len(texts), {'text': text, 'tables': None}
+
+
+EXTRACTORS = {
+    'pdfplumber': _extract_pdfplumber,
+    'pdfminer': _extract_pdfminer,
+}
+
+
+def iter_pages(pdf_path: Path, start: int = 0, stop: Optional[int] = None,
+               tables: bool = False, engine: str = 'pdfplumber',
+               conn: Optional[sqlite3.Connection] = None, refresh: bool = False) -> Iterator[dict]:
+    """Yield pages [start, stop) of a PDF as {'text', 'tables'} dicts.
+
+    Pages come from the store when the whole range is present; otherwise
+    they are extracted with the given engine, yielded as soon as each page is
+    done and written back once the range is complete. 'tables' is a list of
+    tables when tables=True and [] otherwise. Only pdfplumber extracts tables.
+    """
+    if engine not in EXTRACTORS:
+        raise ValueError(f"Unknown extraction engine: {engine}")
+    tables = tables and engine == 'pdfplumber'
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+    try:
+        digest = file_sha256(pdf_path)
+        if not refresh:
+            cached = _cached_range(conn, digest, engine, start, stop, tables)
+            if cached is not None:
+                yield from _load_pages(conn, digest, engine, *cached, tables)
+                return
+
+        # Only compressed rows are held back for the write, so memory stays
+        # flat however long the PDF is
+        rows = []
+        page_count = None
+        for i, (page_count, page) in enumerate(EXTRACTORS[engine](pdf_path, start, stop, tables)):
+            rows.append((digest, engine, start + i, _pack(page['text']),
+                         _pack(page['tables']) if page['tables'] is not None else None))
+            yield {'text': page['text'], 'tables': page['tables'] or []}
+
+        if page_count is None:
+            return
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO documents VALUES (?, ?, ?)',
+                         (digest, engine, page_count))
+            # Keep previously extracted tables when only text was re-extracted
+            conn.executemany(
+                'INSERT INTO pages VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (sha256, engine, page) DO UPDATE SET '
+                'text = excluded.text, tables = COALESCE(excluded.tables, pages.tables)',
+                rows
+            )
+    finally:
+        if own_conn:
+            conn.close()
+
+
+def read_pages(pdf_path: Path, start: int = 0, stop: Optional[int] = None,
+               tables: bool = False, engine: str = 'pdfplumber',
+               conn: Optional[sqlite3.Connection] = None, refresh: bool = False) -> list[dict]:
+    """Return pages [start, stop) of a PDF as a list; see iter_pages()."""
+    return list(iter_pages(pdf_path, start, stop, tables, engine, conn, refresh))
+
+
+def _cached_range(conn: sqlite3.Connection, digest: str, engine: str, start: int,
+                  stop: Optional[int], tables: bool) -> Optional[tuple[int, int]]:
+    """Return the (start, stop) range to load, or None unless it is fully cached."""
+    row = conn.execute('SELECT page_count FROM documents WHERE sha256 = ? AND engine = ?',
+                       (digest, engine)).fetchone()
+    if row is None:
+        return None
+    stop = row[0] if stop is None else min(stop, row[0])
+
+    count, with_tables = conn.execute(
+        'SELECT COUNT(*), COUNT(tables) FROM pages WHERE sha256 = ? AND engine = ? '
+        'AND page >= ? AND page < ?',
+        (digest, engine, start, stop)
+    ).fetchone()
+    expected = max(stop - start, 0)
+    if count != expected or (tables and with_tables != expected):
+        return None
+    return start, stop
+
+
+def _load_pages(conn: sqlite3.Connection, digest: str, engine: str, start: int,
+                stop: int, tables: bool) -> Iterator[dict]:
+    """Stream a cached page range from the store."""
+    cursor = conn.execute(
+        'SELECT text, tables FROM pages WHERE sha256 = ? AND engine = ? '
+        'AND page >= ? AND page < ? ORDER BY page',
+        (digest, engine, start, stop)
+    )
+    for text, t in cursor:
+        yield {
+            'text': _unpack_text(text),
+            'tables': _unpack_tables(t) if tables else [],
+        }
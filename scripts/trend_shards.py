@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Sharded copy of skater_time_trends.json, so a profile loads one skater's
+bucket instead of every skater's trends.
+
+Skater ids are hashed (32-bit FNV-1a of the UTF-8 id) into SHARD_BUCKETS
+buckets, and each bucket is written as one compact JSON file next to the
+trends file:
+
+    skater_time_trends/index.json  {'buckets': 256, 'shards': {'3f': {'file', 'bytes', 'hash', 'skaters'}}}
+    skater_time_trends/3f.json     {'trends': {skater id: trends by distance}}
+
+The client hashes the id the same way, and can use 'hash' (the first 16 hex
+digits of the shard's SHA-256) to cache shards across builds. Shards whose
+content has not changed are not rewritten.
+
+    python3 scripts/trend_shards.py [dist/data/skater_time_trends.json]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+SHARD_BUCKETS = 256
+INDEX_VERSION = 1
+DEFAULT_TRENDS = Path(__file__).parent.parent / 'dist' / 'data' / 'skater_time_trends.json'
+
+
+def fnv1a(text: str) -> int:
+    """32-bit FNV-1a hash of text's UTF-8 bytes (Math.imul-friendly on the client)."""
+    h = 0x811c9dc5
+    for byte in text.encode('utf-8'):
+        h = ((h ^ byte) * 0x01000193) & 0xffffffff
+    return h
+
+
+def bucket_of(skater_id: str, buckets: int = SHARD_BUCKETS) -> str:
+    return format(fnv1a(skater_id) % buckets, '02x')
+
+
+def shard_dir(trends_path) -> Path:
+    """'data/skater_time_trends.json' -> 'data/skater_time_trends/'"""
+    trends_path = Path(trends_path)
+    return trends_path.with_name(trends_path.stem)
+
+
+def load_index(directory: Path) -> Optional[dict]:
+    try:
+        with open(directory / 'index.json') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get('version') == INDEX_VERSION else None
+
+
+def _write(path: Path, data: bytes):
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def write_shards(trends: dict, directory: Path, buckets: int = SHARD_BUCKETS) -> dict:
+    """Write trends (skater id -> trends) as shards plus index.json into directory.
+
+    Returns counts of shards written, unchanged and removed.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    previous = load_index(directory)
+    if previous and previous['buckets'] != buckets:
+        previous = None
+    old_shards = previous['shards'] if previous else {}
+
+    by_bucket = {}
+    for skater_id, skater_trends in trends.items():
+        by_bucket.setdefault(bucket_of(skater_id, buckets), {})[skater_id] = skater_trends
+
+    shards = {}
+    counts = {'written': 0, 'unchanged': 0, 'removed': 0}
+    for bucket in sorted(by_bucket):
+        data = json.dumps({'trends': by_bucket[bucket]}, separators=(',', ':')).encode('utf-8')
+        entry = {
+            'file': f'{bucket}.json',
+            'bytes': len(data),
+            'hash': hashlib.sha256(data).hexdigest()[:16],
+            'skaters': len(by_bucket[bucket]),
+        }
+        path = directory / entry['file']
+        if old_shards.get(bucket) == entry and path.exists():
+            counts['unchanged'] += 1
+        else:
+            _write(path, data)
+            counts['written'] += 1
+        shards[bucket] = entry
+
+    for bucket, entry in old_shards.items():
+        if bucket not in shards:
+            (directory / entry['file']).unlink(missing_ok=True)
+            counts['removed'] += 1
+
+    index = {
+        'version': INDEX_VERSION,
+        'generated': datetime.now().isoformat(),
+        'hash': 'fnv1a32',
+        'buckets': buckets,
+        'total_skaters': len(trends),
+        'shards': shards,
+    }
+    _write(directory / 'index.json', json.dumps(index, separators=(',', ':')).encode('utf-8'))
+    return counts
+
+
+def remove_shards(directory: Path) -> int:
+    """Delete the index and the shards it lists (a trends file written without
+    shards would otherwise be shadowed by them). Returns the shards removed."""
+    index = load_index(directory)
+    (directory / 'index.json').unlink(missing_ok=True)
+    removed = 0
+    for entry in (index['shards'].values() if index else ()):
+        if (directory / entry['file']).exists():
+            (directory / entry['file']).unlink()
+            removed += 1
+    try:
+        directory.rmdir()
+    except OSError:
+        pass
+    return removed
+
+
+def read_skater(directory: Path, skater_id: str) -> Optional[dict]:
+    """One skater's trends, read the way the client does: index, then that skater's shard."""
+    index = load_index(directory)
+    if index is None:
+        return None
+    entry = index['shards'].get(bucket_of(skater_id, index['buckets']))
+    if entry is None:
+        return None
+    with open(directory / entry['file']) as f:
+        return json.load(f)['trends'].get(skater_id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shard a skater_time_trends.json by skater')
+    parser.add_argument('trends', nargs='?', type=Path, default=DEFAULT_TRENDS,
+                        help=f'trends file (default: {DEFAULT_TRENDS})')
+    parser.add_argument('--buckets', type=int, default=SHARD_BUCKETS,
+                        help=f'number of shards (default: {SHARD_BUCKETS})')
+    args = parser.parse_args()
+
+    with open(args.trends) as f:
+        trends = json.load(f)['trends']
+    directory = shard_dir(args.trends)
+    counts = write_shards(trends, directory, args.buckets)
+    index = load_index(directory)
+    sizes = [entry['bytes'] for entry in index['shards'].values()]
+    print(f"{len(trends)} skaters in {len(sizes)} shards under {directory}: "
+          f"{counts['written']} written, {counts['unchanged']} unchanged, {counts['removed']} removed")
+    if sizes:
+        print(f"  shard size: avg {sum(sizes) / len(sizes) / 1024:.1f} KB, max {max(sizes) / 1024:.1f} KB; "
+              f"index {(directory / 'index.json').stat().st_size / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
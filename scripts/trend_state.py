@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Saved state of the last time trend build, for incremental rebuilds.
+
+The state records, per source file, its fingerprint (size and mtime, then
+SHA-256 when those moved) and the parsed results it contributed to each
+name key, and per skater id its skaters.json entries. A rebuild reparses
+only the files whose fingerprint changed and diffs them against the stored
+rows: the skaters with a changed key or a changed entry are the dirty set,
+and only their trends need recomputing. The state sits next to the output
+it describes, and records that output's fingerprint too, so an output
+written by something else forces a full build.
+"""
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Iterable, Optional
+
+from parse_cache import file_sha256
+
+STATE_VERSION = 2
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS meta (
+        name TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS files (
+        name TEXT PRIMARY KEY,
+        position INTEGER NOT NULL,
+        size INTEGER,
+        mtime_ns INTEGER,
+        sha256 TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS results (
+        source TEXT NOT NULL,
+        key TEXT NOT NULL,
+        rows TEXT NOT NULL,
+        PRIMARY KEY (source, key)
+    );
+
+    CREATE TABLE IF NOT EXISTS skaters (
+        id TEXT PRIMARY KEY,
+        position INTEGER NOT NULL,
+        entries TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS skater_keys (
+        key TEXT NOT NULL,
+        id TEXT NOT NULL,
+        PRIMARY KEY (key, id)
+    );
+'''
+
+
+def state_path(output_path) -> Path:
+    """'dist/data/skater_time_trends.json' -> 'dist/data/.skater_time_trends.state.sqlite'"""
+    output_path = Path(output_path)
+    return output_path.with_name(f'.{output_path.stem}.state.sqlite')
+
+
+def fingerprint(path, previous: Optional[tuple] = None) -> tuple:
+    """(size, mtime_ns, sha256) of a file, (None, None, None) if it is missing.
+
+    The file is only hashed if its size or mtime differ from previous.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None, None, None
+    if previous and previous[:2] == (stat.st_size, stat.st_mtime_ns):
+        return previous
+    return stat.st_size, stat.st_mtime_ns, file_sha256(Path(path))
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class TrendState:
+    """The stored sources, rows and skaters of the last build."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, timeout=60)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def is_current(self, output_path) -> bool:
+        """Whether the state is this version's and output_path is the file it last wrote."""
+        row = self.conn.execute("SELECT value FROM meta WHERE name = 'version'").fetchone()
+        if not row or row[0] != str(STATE_VERSION):
+            return False
+        stored = self.file(str(output_path))
+        return stored is not None and stored[0] is not None and fingerprint(output_path, stored) == stored
+
+    def reset(self):
+        """Forget everything, before a full build."""
+        with self.conn:
+            for table in ('meta', 'files', 'results', 'skaters', 'skater_keys'):
+                self.conn.execute(f'DELETE FROM {table}')
+
+    def commit(self, output_path):
+        """Record output_path as written by this build and commit."""
+        self.set_file(str(output_path), -1, fingerprint(output_path))
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(STATE_VERSION),))
+        self.conn.commit()
+
+    # --- Files --------------------------------------------------------------
+
+    def file(self, name: str) -> Optional[tuple]:
+        """The stored (size, mtime_ns, sha256) of a file, None if it is not recorded."""
+        row = self.conn.execute('SELECT size, mtime_ns, sha256 FROM files WHERE name = ?',
+                                (name,)).fetchone()
+        return tuple(row) if row else None
+
+    def set_file(self, name: str, position: int, stat: tuple):
+        self.conn.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)',
+                          (name, position, *stat))
+
+    # --- Results --------------------------------------------------------------
+
+    def replace_results(self, source: str, rows_by_key: dict) -> set:
+        """Store a source's rows per name key; return the keys whose rows changed."""
+        stored = dict(self.conn.execute('SELECT key, rows FROM results WHERE source = ?', (source,)))
+        changed = set()
+        for key, rows in rows_by_key.items():
+            text = _dumps(rows)
+            if stored.pop(key, None) != text:
+                changed.add(key)
+                self.conn.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)', (source, key, text))
+        # Keys the source no longer has
+        changed.update(stored)
+        self.conn.executemany('DELETE FROM results WHERE source = ? AND key = ?',
+                              ((source, key) for key in stored))
+        return changed
+
+    def rows(self, key: str) -> list:
+        """A key's rows across all sources, in source order."""
+        rows = []
+        for (text,) in self.conn.execute(
+                'SELECT rows FROM results JOIN files ON files.name = results.source '
+                'WHERE key = ? ORDER BY files.position', (key,)):
+            rows.extend(json.loads(text))
+        return rows
+
+    # --- Skaters --------------------------------------------------------------
+
+    def replace_skaters(self, entries_by_id: dict, keys_by_id: dict) -> set:
+        """Store skaters.json grouped by id (in file order); return the ids whose entries changed."""
+        stored = dict(self.conn.execute('SELECT id, entries FROM skaters'))
+        changed = set()
+        self.conn.execute('DELETE FROM skaters')
+        for position, (skater_id, entries) in enumerate(entries_by_id.items()):
+            text = _dumps(entries)
+            if stored.pop(skater_id, None) != text:
+                changed.add(skater_id)
+            self.conn.execute('INSERT INTO skaters VALUES (?, ?, ?)', (skater_id, position, text))
+        changed.update(stored)
+        self.conn.execute('DELETE FROM skater_keys')
+        self.conn.executemany('INSERT OR IGNORE INTO skater_keys VALUES (?, ?)',
+                              ((key, skater_id) for skater_id, keys in keys_by_id.items() for key in keys))
+        return changed
+
+    def ids_for_keys(self, keys: Iterable[str]) -> set:
+        ids = set()
+        for key in keys:
+            ids.update(skater_id for (skater_id,) in
+                       self.conn.execute('SELECT id FROM skater_keys WHERE key = ?', (key,)))
+        return ids
+
+    def skater_entries(self, skater_id: str) -> Optional[list]:
+        row = self.conn.execute('SELECT entries FROM skaters WHERE id = ?', (skater_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def skater_order(self) -> list:
+        """Skater ids in skaters.json order."""
+        return [skater_id for (skater_id,) in self.conn.execute('SELECT id FROM skaters ORDER BY position')]
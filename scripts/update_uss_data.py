@@ -2,69 +2,61 @@
 """
 Complete USS data update workflow:
 1. Scrape PDF links from usspeedskating.org/results
-2. Download new PDFs
+2. Download new PDFs into the content-addressed PDF store
 3. Parse all PDFs
 4. Update uss_all_results.json
-5. Run build_time_trends.py
+5. Run build_time_trends.py --incremental --shards (only skaters with changed results)
 
-Usage: python3 scripts/update_uss_data.py
+Parsed results are cached by PDF content hash, so only new or changed PDFs
+are parsed again. Pass --no-cache to force a full re-parse, and --refresh to
+revalidate PDFs that are already stored.
+
+With --incremental the results page is diffed against the last update
+(uss_catalog.py) and the run stops there if no short track PDF changed.
+The link snapshot is only advanced once the results are saved, so links
+of a failed run are reported as new again by the next one.
+
+Usage: python3 scripts/update_uss_data.py [--no-cache] [--refresh] [--incremental]
 """
 
+import argparse
 import json
 import os
 import re
 import subprocess
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
-import pdfplumber
+
+import parse_cache
+import pdf_format
+import pdf_store
+import text_cache
+import uss_catalog
+from line_classifier import CATEGORY, DISTANCE, classify_update_line
 
 # Paths
 SCRIPT_DIR = Path(__file__).parent
 DATA_DIR = SCRIPT_DIR.parent / 'dist' / 'data'
 KB_DIR = Path.home() / 'clawd' / 'shorttrack-knowledge-base'
-PDF_DIR = KB_DIR / 'raw_data' / 'uss_pdfs'
 OUTPUT_PATH = KB_DIR / 'processed_data' / 'uss_all_results.json'
 
-PDF_DIR.mkdir(parents=True, exist_ok=True)
+# Bump whenever parse_pdf changes so cached results are re-parsed
+PARSER_VERSION = 'update_uss_data-2'
 
-def scrape_pdf_links() -> list[dict]:
-    """Scrape PDF links from USS results page."""
-    print("Scraping USS results page...")
-    
-    result = subprocess.run(
-        ['curl', '-s', 'https://www.usspeedskating.org/results'],
-        capture_output=True, text=True, timeout=60
-    )
-    html = result.stdout
-    
-    # Extract PDF links with dates using the pattern that matches the actual HTML
-    pattern = r'<a[^>]+href="(https://assets\.contentstack\.io/[^"]+\.pdf)"[^>]*>([^<]+)</a>'
-    matches = re.findall(pattern, html, re.IGNORECASE)
+def scrape_pdf_links(full: bool = True) -> tuple[list[dict], list[dict], dict]:
+    """Scrape PDF links from USS results page.
     
-    pdfs = []
-    seen_urls = set()
+    Returns (short track links, the ones new or changed since the last
+    update, the uss_catalog.check() result to commit once they are processed).
+    """
+    print("Scraping USS results page...")
     
-    for url, text in matches:
-        if url in seen_urls:
-            continue
-        seen_urls.add(url)
-        
-        text = text.strip()
-        # Decode HTML entities
-        text = text.replace('&amp;', '&').replace('&nbsp;', ' ')
-        
-        # Parse date from text (format: YYYY-MM-DD - Name)
-        date_match = re.match(r'(\d{4}-\d{2}-\d{2})\s*-\s*(.+)', text)
-        if date_match:
-            pdfs.append({
-                'url': url,
-                'date': date_match.group(1),
-                'name': date_match.group(2).strip()
-            })
-        else:
-            pdfs.append({'url': url, 'date': None, 'name': text})
+    catalog = uss_catalog.check(full=full)
+    uss_catalog.print_changes(catalog)
+    pdfs = catalog['links']
     
     # Filter for short track only
     st_keywords = ['short track', 'st ', ' st ', 'silver skates', 'heartland', 'nest', 
@@ -83,35 +75,19 @@ def scrape_pdf_links() -> list[dict]:
             if p['date']:  # Only if we have a date
                 st_pdfs.append(p)
     
-    print(f"  Found {len(pdfs)} total PDFs, {len(st_pdfs)} short track")
-    return st_pdfs
+    changed_urls = {p['url'] for p in uss_catalog.new_or_changed(catalog)}
+    changed = [p for p in st_pdfs if p['url'] in changed_urls]
+    print(f"  Found {len(pdfs)} total PDFs, {len(st_pdfs)} short track ({len(changed)} new or changed)")
+    return st_pdfs, changed, catalog
 
-def download_pdf(url: str, name: str) -> Optional[Path]:
-    """Download a PDF if not already present."""
-    # Sanitize filename
-    safe_name = re.sub(r'[<>:"/\\|?*]', '_', name)
-    safe_name = re.sub(r'\s+', '_', safe_name)[:80]
-    filename = f"{safe_name}.pdf"
-    filepath = PDF_DIR / filename
-    
-    if filepath.exists() and filepath.stat().st_size > 1000:
-        return filepath
-    
-    # Fix malformed URLs
-    if url.count('http') > 1:
-        url = 'https://assets' + url.split('https://assets')[-1]
-    
-    try:
-        result = subprocess.run(
-            ['curl', '-sL', '-o', str(filepath), url],
-            capture_output=True, timeout=120
-        )
-        if result.returncode == 0 and filepath.exists() and filepath.stat().st_size > 1000:
-            return filepath
-    except Exception as e:
-        print(f"    Error downloading {name}: {e}")
-    
-    return None
+def download_pdfs(pdf_links: list[dict], refresh: bool = False) -> list[dict]:
+    """Fetch all PDFs into the PDF store. Returns one pdf_store outcome per link.
+    
+    Links already in the store are not downloaded again; with refresh=True
+    they are revalidated with conditional GETs instead.
+    """
+    items = [{'url': pdf['url'], 'name': pdf['name'], 'date': pdf['date']} for pdf in pdf_links]
+    return pdf_store.fetch(items, refresh=refresh)
 
 def parse_time(time_str: str) -> Optional[str]:
     """Normalize time format."""
@@ -132,189 +108,224 @@ def parse_time(time_str: str) -> Optional[str]:
     
     return time_str if time_str else None
 
-def extract_distance(text: str) -> Optional[int]:
-    """Extract distance from text."""
-    match = re.search(r'(\d{3,4})\s*[mM]', text)
-    if match:
-        return int(match.group(1))
-    return None
-
-def extract_category(text: str) -> Optional[str]:
-    """Extract category/class from text."""
-    patterns = [
-        r'(JUNIOR\s+[A-G])',
-        r'(SENIOR\s+(?:MEN|WOMEN))',
-        r'(MASTERS?\s+(?:MEN|WOMEN)\s*\d*)',
-        r'(DIVISION\s+\d+)',
-        r'(NOVICE\s+[AB])',
-        r'((?:MEN|WOMEN|BOYS|GIRLS))',
-    ]
-    for p in patterns:
-        match = re.search(p, text, re.IGNORECASE)
-        if match:
-            return match.group(1).upper()
-    return None
-
-def parse_pdf(filepath: Path, comp_name: str, comp_date: str) -> list[dict]:
-    """Parse a single PDF and extract results."""
+def parse_pdf(filepath: Path, comp_name: str, comp_date: str,
+              fmt: Optional[str] = None) -> list[dict]:
+    """Parse a single PDF and extract results.
+    
+    Table cells are only extracted for PDFs whose format (detected when not
+    given) is tabular or unrecognised; Tempus and EVT layouts parse fully
+    from the line text. Errors (pdfplumber, a locked text cache, ...) are
+    raised, so the caller can tell a failed parse from a PDF without results.
+    """
     results = []
+    seen = set()  # (rank, distance, skater) already in results
     
-    try:
-        with pdfplumber.open(filepath) as pdf:
-            current_distance = None
-            current_category = None
+    fmt = fmt or pdf_format.detect_format(filepath)
+    use_tables = fmt in (pdf_format.TABULAR, pdf_format.TEXT)
+    # Line text and table cells come from a single layout pass per page
+    pages = text_cache.read_pages(filepath, tables=use_tables)
+    current_distance = None
+    current_category = None
+    
+    for page in pages:
+        text = page['text']
+        if not text:
+            continue
+        
+        for line in text.split('\n'):
+            line = line.strip()
+            if not line:
+                continue
             
-            for page in pdf.pages:
-                text = page.extract_text()
-                if not text:
-                    continue
+            token = classify_update_line(line)
+            if token is None:
+                continue
+            
+            # Distance header, possibly with the category on the same line
+            if token[0] == DISTANCE:
+                current_distance = token[1]
+                if token[2]:
+                    current_category = token[2]
+            # Category header
+            elif token[0] == CATEGORY:
+                current_category = token[1]
+            # Result line: place, time and the text between them
+            elif current_distance:
+                _, place, raw_time, name_part = token
+                time_str = parse_time(raw_time)
                 
-                for line in text.split('\n'):
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    # Check for distance header
-                    dist = extract_distance(line)
-                    if dist and dist in [222, 333, 500, 777, 1000, 1500, 3000]:
-                        current_distance = dist
-                        cat = extract_category(line)
-                        if cat:
-                            current_category = cat
-                        continue
-                    
-                    # Check for category header
-                    cat = extract_category(line)
-                    if cat and not re.match(r'^\d', line):
-                        current_category = cat
-                        continue
-                    
-                    # Try to parse as result line (starts with place number)
-                    match = re.match(r'^(\d{1,3})\.?\s+(.+)', line)
-                    if match and current_distance:
-                        place = int(match.group(1))
-                        rest = match.group(2)
-                        
-                        # Find time (last number with decimal)
-                        time_match = re.search(r'(\d{1,2}:\d{2}\.\d{2,3}|\d{1,2}\.\d{2,3})\s*$', rest)
-                        if time_match:
-                            time_str = parse_time(time_match.group(1))
-                            name_part = rest[:time_match.start()].strip()
-                            
-                            # Extract name (remove bib numbers, club codes)
-                            name_parts = name_part.split()
-                            # Filter out pure numbers (bib) and short codes (club)
-                            name_tokens = [p for p in name_parts if not p.isdigit() and len(p) > 3]
-                            name = ' '.join(name_tokens[:3]) if name_tokens else name_part
-                            
-                            if name and time_str:
-                                results.append({
-                                    'rank': place,
-                                    'skater': name,
-                                    'time': time_str,
-                                    'distance': f"{current_distance}m",
-                                    'category': current_category or 'Unknown',
-                                    'competition': comp_name,
-                                    'date': comp_date,
-                                })
+                # Extract name (remove bib numbers, club codes)
+                name_parts = name_part.split()
+                # Filter out pure numbers (bib) and short codes (club)
+                name_tokens = [p for p in name_parts if not p.isdigit() and len(p) > 3]
+                name = ' '.join(name_tokens[:3]) if name_tokens else name_part
                 
-                # Also try table extraction
-                tables = page.extract_tables()
-                for table in tables:
-                    if not table:
+                if name and time_str:
+                    seen.add((place, f"{current_distance}m", name))
+                    results.append({
+                        'rank': place,
+                        'skater': name,
+                        'time': time_str,
+                        'distance': f"{current_distance}m",
+                        'category': current_category or 'Unknown',
+                        'competition': comp_name,
+                        'date': comp_date,
+                    })
+        
+        # Also use the table cells
+        for table in page['tables']:
+            if not table:
+                continue
+            for row in table:
+                if not row or len(row) < 3:
+                    continue
+                # Look for rows that start with a place number
+                try:
+                    place = int(str(row[0]).strip().rstrip('.'))
+                    if place < 1 or place > 200:
                         continue
-                    for row in table:
-                        if not row or len(row) < 3:
-                            continue
-                        # Look for rows that start with a place number
-                        try:
-                            place = int(str(row[0]).strip().rstrip('.'))
-                            if place < 1 or place > 200:
-                                continue
-                            
-                            # Find name and time in row
-                            name = None
-                            time_str = None
-                            for cell in row[1:]:
-                                if not cell:
-                                    continue
-                                cell = str(cell).strip()
-                                if re.match(r'\d{1,2}:\d{2}\.\d{2,3}|\d{1,2}\.\d{2,3}', cell):
-                                    time_str = parse_time(cell)
-                                elif len(cell) > 5 and not cell.isdigit():
-                                    if not name:
-                                        name = cell
-                            
-                            if name and time_str and current_distance:
-                                # Check if we already have this result
-                                exists = any(
-                                    r['rank'] == place and 
-                                    r['distance'] == f"{current_distance}m" and
-                                    r['skater'] == name
-                                    for r in results
-                                )
-                                if not exists:
-                                    results.append({
-                                        'rank': place,
-                                        'skater': name,
-                                        'time': time_str,
-                                        'distance': f"{current_distance}m",
-                                        'category': current_category or 'Unknown',
-                                        'competition': comp_name,
-                                        'date': comp_date,
-                                    })
-                        except (ValueError, TypeError):
+                    
+                    # Find name and time in row
+                    name = None
+                    time_str = None
+                    for cell in row[1:]:
+                        if not cell:
                             continue
-    
-    except Exception as e:
-        print(f"    Error parsing {filepath.name}: {e}")
+                        cell = str(cell).strip()
+                        if re.match(r'\d{1,2}:\d{2}\.\d{2,3}|\d{1,2}\.\d{2,3}', cell):
+                            time_str = parse_time(cell)
+                        elif len(cell) > 5 and not cell.isdigit():
+                            if not name:
+                                name = cell
+                    
+                    if name and time_str and current_distance:
+                        # Check if we already have this result
+                        key = (place, f"{current_distance}m", name)
+                        if key not in seen:
+                            seen.add(key)
+                            results.append({
+                                'rank': place,
+                                'skater': name,
+                                'time': time_str,
+                                'distance': f"{current_distance}m",
+                                'category': current_category or 'Unknown',
+                                'competition': comp_name,
+                                'date': comp_date,
+                            })
+                except (ValueError, TypeError):
+                    continue
     
     return results
 
+def parse_pdf_cached(filepath: Path, comp_name: str, comp_date: str,
+                     use_cache: bool = True) -> tuple[list[dict], str, bool]:
+    """Parse a PDF through the content-hash cache.
+    
+    Returns (results, format, cache_hit); parse errors are raised.
+    """
+    digest = parse_cache.file_sha256(filepath)
+    if use_cache:
+        entry = parse_cache.load_entry(digest, PARSER_VERSION)
+        if entry is not None:
+            # The same bytes may be listed under another name or date
+            records = [dict(r, competition=comp_name, date=comp_date) for r in entry['records']]
+            return records, entry['format'], True
+    
+    # Only a miss needs the format (and so pdfplumber). A failed parse
+    # raises before anything is cached, so the next run tries again
+    fmt = pdf_format.detect_format(filepath)
+    results = parse_pdf(filepath, comp_name, comp_date, fmt)
+    parse_cache.store(digest, PARSER_VERSION, results, fmt=fmt)
+    return results, fmt, False
+
 def main():
+    parser = argparse.ArgumentParser(description='USS data update workflow')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-parse every PDF instead of using cached results')
+    parser.add_argument('--refresh', action='store_true',
+                        help='revalidate PDFs that are already stored')
+    parser.add_argument('--incremental', action='store_true',
+                        help='stop early when no short track PDF was added or changed')
+    args = parser.parse_args()
+    
     print("=" * 60)
     print("USS Data Update Workflow")
     print("=" * 60)
     
     # 1. Scrape PDF links
-    pdf_links = scrape_pdf_links()
+    pdf_links, changed, catalog = scrape_pdf_links(full=not args.incremental)
     
     if not pdf_links:
         print("No PDF links found. Check the scraping logic.")
         return
+    if args.incremental and not changed and not args.refresh and not args.no_cache:
+        print("\nNo new or changed PDFs; results are up to date.")
+        uss_catalog.commit(catalog)
+        return
     
     # 2. Download PDFs
     print(f"\nDownloading {len(pdf_links)} PDFs...")
     downloaded = []
-    for i, pdf in enumerate(pdf_links):
-        filepath = download_pdf(pdf['url'], pdf['name'])
-        if filepath:
-            downloaded.append({
-                'path': filepath,
-                'name': pdf['name'],
-                'date': pdf['date']
-            })
-            print(f"  [{i+1}/{len(pdf_links)}] ✓ {pdf['name'][:50]}")
-        else:
-            print(f"  [{i+1}/{len(pdf_links)}] ✗ {pdf['name'][:50]}")
+    status_counts = {}
+    parsed_as = {}
+    changed_urls = {pdf['url'] for pdf in changed}
+    changed_failed = 0
+    outcomes = download_pdfs(pdf_links, refresh=args.refresh)
+    for i, (pdf, outcome) in enumerate(zip(pdf_links, outcomes)):
+        status_counts[outcome['status']] = status_counts.get(outcome['status'], 0) + 1
+        # A failed refresh still leaves the stored copy
+        if not outcome['path']:
+            changed_failed += pdf['url'] in changed_urls
+            print(f"  [{i+1}/{len(pdf_links)}] ✗ {pdf['name'][:50]} ({outcome['message']})")
+            continue
+        # The same protocol listed twice is parsed once
+        if outcome['sha256'] in parsed_as:
+            print(f"  [{i+1}/{len(pdf_links)}] = {pdf['name'][:50]} (same PDF as {parsed_as[outcome['sha256']][:40]})")
+            continue
+        parsed_as[outcome['sha256']] = pdf['name']
+        downloaded.append({
+            'path': outcome['path'],
+            'name': pdf['name'],
+            'date': pdf['date']
+        })
+        print(f"  [{i+1}/{len(pdf_links)}] ✓ {pdf['name'][:50]}")
     
-    print(f"\nDownloaded {len(downloaded)} PDFs")
+    print(f"\n{len(downloaded)} distinct PDFs "
+          f"({', '.join(f'{count} {status}' for status, count in sorted(status_counts.items()))})")
     
     # 3. Parse all PDFs
     print(f"\nParsing PDFs...")
     all_results = []
     competitions = []
+    failed = []
+    cache_hits = 0
+    format_stats = pdf_format.new_stats()
     
     for pdf in downloaded:
-        results = parse_pdf(pdf['path'], pdf['name'], pdf['date'])
+        started = time.perf_counter()
+        try:
+            results, fmt, hit = parse_pdf_cached(pdf['path'], pdf['name'], pdf['date'],
+                                                 use_cache=not args.no_cache)
+        except Exception as e:
+            print(f"  ✗ {pdf['name'][:40]}: error parsing {Path(pdf['path']).name}: {e}")
+            failed.append({'name': pdf['name'], 'date': pdf['date'], 'error': str(e)})
+            continue
+        cache_hits += hit
+        if not hit:
+            pdf_format.record(format_stats, fmt, time.perf_counter() - started, len(results))
         if results:
             all_results.extend(results)
             competitions.append({
                 'name': pdf['name'],
                 'date': pdf['date'],
+                'format': fmt,
                 'result_count': len(results)
             })
-            print(f"  ✓ {pdf['name'][:40]}: {len(results)} results")
+            print(f"  ✓ {pdf['name'][:40]}: {len(results)} results ({fmt}){' (cached)' if hit else ''}")
+    
+    print(f"  {cache_hits} cached, {len(downloaded) - cache_hits - len(failed)} parsed, {len(failed)} failed")
+    if format_stats:
+        pdf_format.print_stats(format_stats)
     
     # 4. Save results
     print(f"\nSaving {len(all_results)} results from {len(competitions)} competitions...")
@@ -341,7 +352,7 @@ def main():
         'total_competitions': len(competitions),
         'competitions': competitions,
         'results': all_results,
-        'failed': []
+        'failed': failed
     }
     
     with open(OUTPUT_PATH, 'w') as f:
@@ -349,9 +360,17 @@ def main():
     
     print(f"Saved to {OUTPUT_PATH}")
     
-    # 5. Run build_time_trends.py
+    # The new and changed links are processed: advance the link snapshot,
+    # unless some PDF could not be downloaded or parsed (the next run retries them)
+    if changed_failed or failed:
+        print(f"  {changed_failed} new or changed PDFs not downloaded, {len(failed)} not parsed; "
+              f"link snapshot not advanced")
+    else:
+        uss_catalog.commit(catalog)
+    
+    # 5. Run build_time_trends.py, recomputing only the skaters whose results changed
     print("\nRebuilding time trends...")
-    subprocess.run([sys.executable, str(SCRIPT_DIR / 'build_time_trends.py')])
+    subprocess.run([sys.executable, str(SCRIPT_DIR / 'build_time_trends.py'), '--incremental', '--shards'])
     
     print("\n" + "=" * 60)
     print("Done!")
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Incremental catalog of the PDF links on usspeedskating.org/results.
+
+The page is fetched conditionally (a 304 means nothing changed) and fed
+through an html.parser tokenizer chunk by chunk as it downloads, instead
+of being regexed whole. The links are diffed against the last snapshot,
+data/uss_pdf_links.json, or data/us_pdf_catalog.json before there is one.
+Callers get the new and changed links to hand to the download and parse
+stages. check() only diffs; commit() saves the snapshot and appends the
+differences to data/uss_catalog_changes.jsonl, and is called by
+update_uss_data.py once those links are downloaded and parsed, so a
+check by another script (or a failed update) does not use them up.
+
+    python3 scripts/uss_catalog.py [--full]
+"""
+
+import argparse
+import json
+import os
+import re
+from datetime import datetime
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Iterable, Optional
+
+import http_fetch
+
+RESULTS_URL = 'https://www.usspeedskating.org/results'
+
+DATA_DIR = Path(__file__).parent.parent / 'data'
+SNAPSHOT_PATH = DATA_DIR / 'uss_pdf_links.json'
+CATALOG_PATH = DATA_DIR / 'us_pdf_catalog.json'
+CHANGELOG_PATH = DATA_DIR / 'uss_catalog_changes.jsonl'
+MAX_LISTED = 30  # Changes printed per run; the change log has all of them
+
+PDF_URL = re.compile(r'https://assets\.contentstack\.io/\S+\.pdf', re.IGNORECASE)
+# /v3/assets/<stack>/<asset uid>/<version>/<file>.pdf: a re-uploaded
+# protocol keeps its asset uid and gets a new version
+ASSET = re.compile(r'/v3/assets/([^/]+)/([^/]+)/')
+# Link text: 'YYYY-MM-DD - Name'
+LINK_TEXT = re.compile(r'(\d{4}-\d{2}-\d{2})\s*[-–]\s*(.+)')
+
+
+class LinkExtractor(HTMLParser):
+    """Collects (url, text) of <a> elements pointing at contentstack PDFs."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self.pdf_urls = set()  # In any attribute, linked or not
+        self._href = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        for _, value in attrs:
+            if value and PDF_URL.fullmatch(value):
+                self.pdf_urls.add(value)
+        if tag == 'a':
+            href = dict(attrs).get('href')
+            if href and PDF_URL.fullmatch(href):
+                self._href = href
+                self._text = []
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._href is not None:
+            text = ' '.join(''.join(self._text).split())
+            if text:
+                self.links.append((self._href, text))
+            self._href = None
+
+
+def parse_link_text(url: str, text: str) -> dict:
+    match = LINK_TEXT.match(text)
+    if match:
+        return {'url': url, 'name': match.group(2).strip(), 'date': match.group(1)}
+    return {'url': url, 'name': text, 'date': None}
+
+
+def extract_links(chunks: Iterable[str]) -> tuple[list[dict], set[str]]:
+    """Links ({url, name, date}, first occurrence of each URL) and every PDF URL in the page."""
+    parser = LinkExtractor()
+    for chunk in chunks:
+        parser.feed(chunk)
+    parser.close()
+
+    links = []
+    seen = set()
+    for url, text in parser.links:
+        if url not in seen:
+            seen.add(url)
+            links.append(parse_link_text(url, text))
+    return links, parser.pdf_urls | seen
+
+
+def season_of(date: Optional[str]) -> str:
+    """'2024-2025' for dates from August 2024 to July 2025."""
+    if not date:
+        return 'unknown'
+    year, month = int(date[:4]), int(date[5:7])
+    return f"{year}-{year+1}" if month >= 8 else f"{year-1}-{year}"
+
+
+def asset_key(url: str) -> str:
+    match = ASSET.search(url)
+    return f"{match.group(1)}/{match.group(2)}" if match else url
+
+
+# --- Snapshot ---------------------------------------------------------------
+
+def load_snapshot(path: Path = SNAPSHOT_PATH) -> Optional[dict]:
+    """The last scraped link list, or None if there is no usable one."""
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or not isinstance(snapshot.get('all_results'), list):
+        return None
+    return snapshot
+
+
+def catalog_links(path: Path = CATALOG_PATH) -> list[dict]:
+    """Links of the hand-built catalog, used as the baseline before the first snapshot."""
+    try:
+        with open(path) as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return []
+    return [{'url': comp['pdf_url'], 'name': comp['name'], 'date': comp.get('date')}
+            for season in catalog.get('seasons', []) for comp in season.get('competitions', [])
+            if comp.get('pdf_url')]
+
+
+def save_snapshot(links: list[dict], page: dict, path: Path = SNAPSHOT_PATH):
+    by_season = {}
+    for link in links:
+        by_season.setdefault(season_of(link['date']), []).append(link)
+    snapshot = {
+        'scraped_at': datetime.now().isoformat(),
+        'page': page,
+        'total_pdfs': len(links),
+        'by_season': by_season,
+        'all_results': links,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# --- Diff -------------------------------------------------------------------
+
+def diff(previous: list[dict], current: list[dict]) -> dict:
+    """Added, changed (new version or new name/date) and removed links, by asset."""
+    before = {asset_key(link['url']): link for link in previous}
+    after = {asset_key(link['url']): link for link in current}
+    changes = {'added': [], 'changed': [], 'removed': []}
+    for key, link in after.items():
+        old = before.get(key)
+        if old is None:
+            changes['added'].append(link)
+        elif (old['url'], old['name'], old.get('date')) != (link['url'], link['name'], link['date']):
+            changes['changed'].append({'previous': old, 'current': link})
+    changes['removed'] = [link for key, link in before.items() if key not in after]
+    return changes
+
+
+def log_changes(changes: dict, path: Path = CHANGELOG_PATH):
+    """Append one line per run that changed something."""
+    if not any(changes[kind] for kind in ('added', 'changed', 'removed')):
+        return
+    entry = {'checked_at': datetime.now().isoformat(), **changes}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(entry) + '\n')
+
+
+def check(full: bool = False) -> dict:
+    """Check the results page against the snapshot, without recording anything.
+
+    Returns {'links', 'added', 'changed', 'removed', 'not_modified', 'page'}:
+    every current link, the differences to the previous snapshot, and the
+    page validators for commit(). With full=True the page is fetched even
+    if the server says it is unchanged.
+    """
+    snapshot = load_snapshot()
+    validators = snapshot.get('page') if snapshot and not full else None
+    page, chunks = http_fetch.stream_text(RESULTS_URL, validators)
+    if chunks is None:
+        return {'links': snapshot['all_results'], 'added': [], 'changed': [], 'removed': [],
+                'not_modified': True, 'page': page}
+
+    links, _ = extract_links(chunks)
+    if not links:
+        raise RuntimeError(f"No PDF links found on {RESULTS_URL}; the page layout may have changed")
+
+    changes = diff(snapshot['all_results'] if snapshot else catalog_links(), links)
+    return {'links': links, **changes, 'not_modified': False, 'page': page}
+
+
+def commit(result: dict):
+    """Make a check() result the new snapshot and log its differences.
+
+    Called once its new and changed links are processed; until then every
+    check() reports them again.
+    """
+    if result['not_modified']:
+        return
+    save_snapshot(result['links'], result['page'])
+    log_changes({kind: result[kind] for kind in ('added', 'changed', 'removed')})
+
+
+def new_or_changed(result: dict) -> list[dict]:
+    """Links the download and parse stages have to look at."""
+    return result['added'] + [change['current'] for change in result['changed']]
+
+
+def print_changes(result: dict):
+    if result['not_modified']:
+        print("  Results page not modified since the last check")
+        return
+    print(f"  {len(result['links'])} PDF links: {len(result['added'])} new, "
+          f"{len(result['changed'])} changed, {len(result['removed'])} removed")
+    lines = ([('+', link) for link in result['added']] +
+             [('~', change['current']) for change in result['changed']] +
+             [('-', link) for link in result['removed']])
+    for mark, link in lines[:MAX_LISTED]:
+        print(f"    {mark} {link['date'] or '?':<10} {link['name'][:60]}")
+    if len(lines) > MAX_LISTED:
+        print(f"    ... and {len(lines) - MAX_LISTED} more (see {CHANGELOG_PATH.name})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Diff the USS results page against the last snapshot')
+    parser.add_argument('--full', action='store_true',
+                        help='fetch the page even if the server reports it unchanged')
+    args = parser.parse_args()
+
+    print(f"Checking {RESULTS_URL}...")
+    print_changes(check(full=args.full))
+
+
+if __name__ == '__main__':
+    main()
@@ -4,59 +4,26 @@ US Speed Skating Data Validation Script
 Phase 4: 验证数据完整性
 """
 
-import json
 from collections import defaultdict
 import re
 
-def parse_time_to_seconds(time_str):
-    """将时间字符串转换为秒数"""
-    if not time_str:
-        return None
-    
-    # 处理不同格式
-    # M:SS.mmm (如 2:38.840)
-    # M:SS.mm (如 1:23.45)
-    # SS.mmm (如 45.820)
-    
-    try:
-        if ':' in time_str:
-            parts = time_str.split(':')
-            if len(parts) == 2:
-                minutes = float(parts[0])
-                seconds = float(parts[1])
-                return minutes * 60 + seconds
-            elif len(parts) == 3:  # H:M:S
-                hours = float(parts[0])
-                minutes = float(parts[1])
-                seconds = float(parts[2])
-                return hours * 3600 + minutes * 60 + seconds
-        else:
-            return float(time_str)
-    except:
-        return None
+import numpy as np
+
+import event_times
+import name_dedup
+import record_stream
 
 def validate_data():
-    # 读取数据
-    with open('/Users/garychen/dev/shorttrack-analytics/public/data/us_historical_results.json', 'r') as f:
-        data = json.load(f)
-    
-    results = data['results']
-    total_records = len(results)
-    
-    print("=" * 70)
-    print("US Speed Skating 数据验证报告")
-    print("=" * 70)
-    print(f"\n总记录数: {total_records}")
-    print(f"覆盖赛季: {', '.join(data['seasons'])}")
-    
-    # 统计变量
-    issues = []
-    warnings = []
+    # 读取数据 (逐条流式读取, 不整体加载文件)
+    path = '/Users/garychen/dev/shorttrack-analytics/public/data/us_historical_results.json'
+    header = record_stream.read_header(path)
     
-    # 1. 基础字段检查
-    print("\n" + "=" * 70)
-    print("1. 基础字段完整性检查")
-    print("=" * 70)
+    # 定义合理范围（秒）
+    pb_ranges = {
+        '500m': (35, 60),    # 35秒 - 60秒
+        '1000m': (70, 120),  # 70秒 - 120秒
+        '1500m': (120, 180), # 120秒 - 180秒
+    }
     
     field_stats = {
         'skater': {'null': 0, 'empty': 0},
@@ -68,29 +35,130 @@ def validate_data():
         'place': {'null': 0, 'invalid': 0},
         'time': {'null': 0, 'empty': 0}
     }
+    time_formats = defaultdict(int)
+    invalid_times = []
+    pb_issues = defaultdict(list)
+    first_issue = {}
+    distance_stats = {}
+    skater_counts = defaultdict(int)  # 选手名 -> 记录数, 按首次出现的顺序
+    record_keys = defaultdict(int)  # 唯一键 -> 出现次数
+    category_counts = defaultdict(int)
+    season_counts = defaultdict(int)
+    total_records = 0
     
-    for r in results:
-        for field in ['skater', 'competition', 'season', 'distance', 'category']:
-            if r.get(field) is None:
-                field_stats[field]['null'] += 1
-            elif str(r.get(field)).strip() == '':
-                field_stats[field]['empty'] += 1
-        
-        if r.get('season') == 'unknown':
-            field_stats['season']['unknown'] += 1
+    # 一次遍历完成全部统计; 成绩按批整列解析
+    for results in record_stream.batched(record_stream.iter_records(path)):
+        offset = total_records
+        total_records += len(results)
         
-        if r.get('date') is None:
-            field_stats['date']['null'] += 1
+        for r in results:
+            # 1. 基础字段
+            for field in ['skater', 'competition', 'season', 'distance', 'category']:
+                if r.get(field) is None:
+                    field_stats[field]['null'] += 1
+                elif str(r.get(field)).strip() == '':
+                    field_stats[field]['empty'] += 1
+            
+            if r.get('season') == 'unknown':
+                field_stats['season']['unknown'] += 1
+            
+            if r.get('date') is None:
+                field_stats['date']['null'] += 1
+            
+            if r.get('place') is None:
+                field_stats['place']['null'] += 1
+            elif not isinstance(r.get('place'), int) or r.get('place') < 1:
+                field_stats['place']['invalid'] += 1
+            
+            if r.get('time') is None:
+                field_stats['time']['null'] += 1
+            elif str(r.get('time')).strip() == '':
+                field_stats['time']['empty'] += 1
+            
+            # 2. 时间格式
+            time_str = r.get('time')
+            if time_str:
+                if re.match(r'^\d+:\d{2}\.\d{2,3}$', str(time_str)):
+                    time_formats['M:SS.mmm'] += 1
+                elif re.match(r'^\d+:\d{2}:\d{2}\.\d{2,3}$', str(time_str)):
+                    time_formats['H:MM:SS.mmm'] += 1
+                elif re.match(r'^\d+\.\d{2,3}$', str(time_str)):
+                    time_formats['SS.mmm'] += 1
+                else:
+                    time_formats['其他'] += 1
+                    if len(invalid_times) < 10:
+                        invalid_times.append((r['skater'], r['distance'], time_str))
+            
+            # 4. 选手
+            skater = r.get('skater', '').strip()
+            if skater:
+                skater_counts[skater] += 1
+            
+            # 5. 唯一键：选手+比赛+距离+组别+名次+时间
+            record_keys[(
+                r.get('skater', ''),
+                r.get('competition', ''),
+                r.get('distance', ''),
+                r.get('category', ''),
+                r.get('place'),
+                r.get('time')
+            )] += 1
+            
+            # 6, 7. 组别, 赛季
+            category_counts[r.get('category', 'null')] += 1
+            season_counts[r.get('season', 'unknown')] += 1
         
-        if r.get('place') is None:
-            field_stats['place']['null'] += 1
-        elif not isinstance(r.get('place'), int) or r.get('place') < 1:
-            field_stats['place']['invalid'] += 1
+        # 3. 本批成绩整列解析, 按距离分组累计
+        dists = np.array([r.get('distance') or '' for r in results], dtype=np.str_)
+        seconds = event_times.parse_times_ms(r.get('time') for r in results) / 1000
+        timed = ~np.isnan(seconds)
         
-        if r.get('time') is None:
-            field_stats['time']['null'] += 1
-        elif str(r.get('time')).strip() == '':
-            field_stats['time']['empty'] += 1
+        for dist in np.unique(dists[dists != '']).tolist():
+            in_dist = dists == dist
+            dist_seconds = seconds[in_dist & timed]
+            stats = distance_stats.setdefault(dist, {
+                'total': 0,
+                'with_time': 0,
+                'out_of_range': 0,
+                'min': float('inf'),
+                'max': 0,
+            })
+            stats['total'] += int(in_dist.sum())
+            stats['with_time'] += len(dist_seconds)
+            if len(dist_seconds):
+                stats['min'] = min(stats['min'], float(dist_seconds.min()))
+                stats['max'] = max(stats['max'], float(dist_seconds.max()))
+            
+            if dist in pb_ranges:
+                min_t, max_t = pb_ranges[dist]
+                out_of_range = in_dist & timed & ((seconds < min_t) | (seconds > max_t))
+                stats['out_of_range'] += int(out_of_range.sum())
+                room = 5 - len(pb_issues.get(dist, ()))
+                issue_rows = np.flatnonzero(out_of_range)[:room].tolist()
+                if issue_rows and dist not in first_issue:
+                    first_issue[dist] = offset + issue_rows[0]
+                for i in issue_rows:
+                    pb_issues[dist].append({
+                        'skater': results[i]['skater'],
+                        'time': results[i]['time'],
+                        'seconds': float(seconds[i]),
+                        'competition': results[i]['competition']
+                    })
+    
+    print("=" * 70)
+    print("US Speed Skating 数据验证报告")
+    print("=" * 70)
+    print(f"\n总记录数: {total_records}")
+    print(f"覆盖赛季: {', '.join(header['seasons'])}")
+    
+    # 统计变量
+    issues = []
+    warnings = []
+    
+    # 1. 基础字段检查
+    print("\n" + "=" * 70)
+    print("1. 基础字段完整性检查")
+    print("=" * 70)
     
     print(f"\n字段 | 空值(null) | 空字符串 | 其他问题")
     print("-" * 50)
@@ -111,23 +179,6 @@ def validate_data():
     print("2. 时间格式统一性检查")
     print("=" * 70)
     
-    time_formats = defaultdict(int)
-    invalid_times = []
-    
-    for r in results:
-        time_str = r.get('time')
-        if time_str:
-            # 检测格式
-            if re.match(r'^\d+:\d{2}\.\d{2,3}$', str(time_str)):
-                time_formats['M:SS.mmm'] += 1
-            elif re.match(r'^\d+:\d{2}:\d{2}\.\d{2,3}$', str(time_str)):
-                time_formats['H:MM:SS.mmm'] += 1
-            elif re.match(r'^\d+\.\d{2,3}$', str(time_str)):
-                time_formats['SS.mmm'] += 1
-            else:
-                time_formats['其他'] += 1
-                if len(invalid_times) < 10:
-                    invalid_times.append((r['skater'], r['distance'], time_str))
     
     print("\n时间格式分布:")
     for fmt, count in sorted(time_formats.items(), key=lambda x: -x[1]):
@@ -143,41 +194,8 @@ def validate_data():
     print("3. 成绩合理性检查 (PB范围)")
     print("=" * 70)
     
-    # 定义合理范围（秒）
-    pb_ranges = {
-        '500m': (35, 60),    # 35秒 - 60秒
-        '1000m': (70, 120),  # 70秒 - 120秒
-        '1500m': (120, 180), # 120秒 - 180秒
-    }
-    
-    pb_issues = defaultdict(list)
-    distance_stats = defaultdict(lambda: {'total': 0, 'with_time': 0, 'out_of_range': 0, 'min': float('inf'), 'max': 0})
-    
-    for r in results:
-        dist = r.get('distance')
-        time_str = r.get('time')
-        
-        if dist:
-            distance_stats[dist]['total'] += 1
-            
-        if dist and time_str:
-            seconds = parse_time_to_seconds(time_str)
-            if seconds is not None:
-                distance_stats[dist]['with_time'] += 1
-                distance_stats[dist]['min'] = min(distance_stats[dist]['min'], seconds)
-                distance_stats[dist]['max'] = max(distance_stats[dist]['max'], seconds)
-                
-                if dist in pb_ranges:
-                    min_t, max_t = pb_ranges[dist]
-                    if seconds < min_t or seconds > max_t:
-                        distance_stats[dist]['out_of_range'] += 1
-                        if len(pb_issues[dist]) < 5:
-                            pb_issues[dist].append({
-                                'skater': r['skater'],
-                                'time': time_str,
-                                'seconds': seconds,
-                                'competition': r['competition']
-                            })
+    # 按第一条异常记录的顺序
+    pb_issues = dict(sorted(pb_issues.items(), key=lambda item: first_issue[item[0]]))
     
     print("\n距离 | 总数 | 有成绩 | 超出范围 | 最快 | 最慢")
     print("-" * 70)
@@ -199,18 +217,12 @@ def validate_data():
     print("4. 选手数据一致性检查")
     print("=" * 70)
     
-    skater_records = defaultdict(list)
-    for r in results:
-        skater = r.get('skater', '').strip()
-        if skater:
-            skater_records[skater].append(r)
-    
-    unique_skaters = len(skater_records)
+    unique_skaters = len(skater_counts)
     print(f"\n唯一选手数: {unique_skaters}")
     
     # 检查选手名带有特殊字符
     name_issues = []
-    for skater in skater_records.keys():
+    for skater in skater_counts.keys():
         if skater.endswith(' -') or skater.endswith('-'):
             name_issues.append(skater)
         if re.search(r'[^\w\s\-\'\.]', skater):
@@ -221,26 +233,11 @@ def validate_data():
         for name in list(set(name_issues))[:10]:
             print(f"  - '{name}'")
     
-    # 检查可能的重复选手（名字相似）
-    from difflib import SequenceMatcher
-    similar_names = []
-    skater_list = list(skater_records.keys())
-    
-    # 只检查前1000个选手以节省时间
-    check_limit = min(500, len(skater_list))
-    for i in range(check_limit):
-        for j in range(i+1, check_limit):
-            name1, name2 = skater_list[i], skater_list[j]
-            # 跳过完全相同
-            if name1 == name2:
-                continue
-            # 检查相似度
-            ratio = SequenceMatcher(None, name1.lower(), name2.lower()).ratio()
-            if ratio > 0.85 and ratio < 1.0:
-                similar_names.append((name1, name2, ratio))
+    # 检查可能的重复选手（名字相似），分块后覆盖全部选手
+    similar_names = name_dedup.similar_names(list(skater_counts.keys()), include_aliases=True)
     
     if similar_names:
-        print(f"\n可能的重复选手 (名字相似度>85%, 共{len(similar_names)}对):")
+        print(f"\n可能的重复选手 (名字相似度>85%或仅姓名顺序不同, 共{len(similar_names)}对):")
         for n1, n2, r in similar_names[:15]:
             print(f"  '{n1}' <-> '{n2}' (相似度: {r:.1%})")
     
@@ -249,40 +246,21 @@ def validate_data():
     print("5. 重复数据检测")
     print("=" * 70)
     
-    # 创建唯一键：选手+比赛+距离+组别+名次+时间
-    record_keys = defaultdict(list)
-    for idx, r in enumerate(results):
-        key = (
-            r.get('skater', ''),
-            r.get('competition', ''),
-            r.get('distance', ''),
-            r.get('category', ''),
-            r.get('place'),
-            r.get('time')
-        )
-        record_keys[key].append(idx)
-    
-    duplicates = {k: v for k, v in record_keys.items() if len(v) > 1}
-    dup_count = sum(len(v) - 1 for v in duplicates.values())
+    duplicates = {k: n for k, n in record_keys.items() if n > 1}
+    dup_count = sum(n - 1 for n in duplicates.values())
     
     print(f"\n完全重复记录: {dup_count} 条")
     if duplicates:
         print(f"涉及 {len(duplicates)} 组数据")
         print("\n重复示例:")
-        for key, indices in list(duplicates.items())[:5]:
-            r = results[indices[0]]
-            print(f"  {r['skater']} @ {r['competition']} - {r['distance']} ({len(indices)}次重复)")
+        for (skater, competition, distance, *_), n in list(duplicates.items())[:5]:
+            print(f"  {skater} @ {competition} - {distance} ({n}次重复)")
     
     # 6. 类别/组别一致性
     print("\n" + "=" * 70)
     print("6. 组别分布检查")
     print("=" * 70)
     
-    category_counts = defaultdict(int)
-    for r in results:
-        cat = r.get('category', 'null')
-        category_counts[cat] += 1
-    
     print("\n组别分布 (按数量排序):")
     for cat, count in sorted(category_counts.items(), key=lambda x: -x[1])[:20]:
         print(f"  {cat}: {count}")
@@ -301,11 +279,6 @@ def validate_data():
     print("7. 赛季分布检查")
     print("=" * 70)
     
-    season_counts = defaultdict(int)
-    for r in results:
-        season = r.get('season', 'unknown')
-        season_counts[season] += 1
-    
     print("\n赛季分布:")
     for season in sorted(season_counts.keys()):
         count = season_counts[season]
@@ -104,10 +104,7 @@ export default function App() {
             <Route
               path="/skater"
               element={
-                <SkaterProfile
-                  skaters={data.skaters}
-                  timeTrends={data.timeTrends}
-                />
+                <SkaterProfile skaters={data.skaters} />
               }
             />
             <Route path="/about" element={<About />} />
@@ -1,22 +1,6 @@
 import { useState, useEffect, useCallback } from 'react';
 import type { Manifest, Skater, Event, Heat, PassEvent, Models, Incident, CrashEvent, MedalRecord } from '../types/data';
 
-interface TimeTrendEntry {
-  distance: number;
-  time: number;
-  time_str: string;
-  competition: string;
-  date: string | null;
-  place: number | null;
-  source: 'uss' | 'stl';
-}
-
-interface TimeTrendsData {
-  generated: string;
-  total_skaters: number;
-  trends: Record<string, Record<number, TimeTrendEntry[]>>;
-}
-
 interface AppData {
   manifest: Manifest | null;
   skaters: Skater[];
@@ -27,7 +11,6 @@ interface AppData {
   incidents: Incident[];
   crashes: CrashEvent[];
   medals: MedalRecord[];
-  timeTrends: TimeTrendsData | null;
   loading: boolean;
   error: string | null;
 }
@@ -42,7 +25,6 @@ const initialState: AppData = {
   incidents: [],
   crashes: [],
   medals: [],
-  timeTrends: null,
   loading: true,
   error: null,
 };
@@ -59,7 +41,7 @@ export function useData() {
   const loadData = useCallback(async () => {
     setData(prev => ({ ...prev, loading: true, error: null }));
     try {
-      const [manifest, skaters, events, heats, passes, models, incidents, crashes, medals, timeTrends] = await Promise.all([
+      const [manifest, skaters, events, heats, passes, models, incidents, crashes, medals] = await Promise.all([
         fetchJSON<Manifest>('/data/manifest.json'),
         fetchJSON<Skater[]>('/data/skaters.json'),
         fetchJSON<Event[]>('/data/events.json'),
@@ -69,9 +51,8 @@ export function useData() {
         fetchJSON<Incident[]>('/data/incidents.json').catch(() => [] as Incident[]),
         fetchJSON<CrashEvent[]>('/data/crashes.json').catch(() => [] as CrashEvent[]),
         fetchJSON<MedalRecord[]>('/data/medals.json').catch(() => [] as MedalRecord[]),
-        fetchJSON<TimeTrendsData>('/data/skater_time_trends.json').catch(() => null),
       ]);
-      setData({ manifest, skaters, events, heats, passes, models, incidents, crashes, medals, timeTrends, loading: false, error: null });
+      setData({ manifest, skaters, events, heats, passes, models, incidents, crashes, medals, loading: false, error: null });
     } catch (err) {
       setData(prev => ({ ...prev, loading: false, error: (err as Error).message }));
     }
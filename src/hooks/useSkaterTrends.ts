@@ -0,0 +1,97 @@
+import { useState, useEffect } from 'react';
+
+export interface TimeTrendEntry {
+  distance: number;
+  time: number;
+  time_str: string;
+  competition: string;
+  date: string | null;
+  place: number | null;
+  source: 'uss' | 'stl';
+}
+
+export type SkaterTrends = Record<number, TimeTrendEntry[]>;
+
+interface TimeTrendsData {
+  generated: string;
+  total_skaters: number;
+  trends: Record<string, SkaterTrends>;
+}
+
+// Written by scripts/trend_shards.py: skater ids are hashed into buckets,
+// one compact file per bucket
+interface ShardIndex {
+  version: number;
+  buckets: number;
+  shards: Record<string, { file: string; bytes: number; hash: string; skaters: number }>;
+}
+
+const SHARD_DIR = '/data/skater_time_trends';
+
+let indexRequest: Promise<ShardIndex | null> | null = null;
+let fullRequest: Promise<TimeTrendsData | null> | null = null;
+const shardRequests = new Map<string, Promise<Record<string, SkaterTrends>>>();
+
+async function fetchJSON<T>(path: string): Promise<T> {
+  const res = await fetch(path);
+  if (!res.ok) throw new Error(`Failed to load ${path}: ${res.status}`);
+  return res.json();
+}
+
+// 32-bit FNV-1a of the UTF-8 id, as in trend_shards.fnv1a
+function fnv1a(text: string): number {
+  let hash = 0x811c9dc5;
+  for (const byte of new TextEncoder().encode(text)) {
+    hash ^= byte;
+    hash = Math.imul(hash, 0x01000193) >>> 0;
+  }
+  return hash;
+}
+
+function loadIndex(): Promise<ShardIndex | null> {
+  indexRequest ??= fetchJSON<ShardIndex>(`${SHARD_DIR}/index.json`).catch(() => null);
+  return indexRequest;
+}
+
+function loadShard(file: string, hash: string): Promise<Record<string, SkaterTrends>> {
+  // The content hash keeps a cached shard valid until the shard changes
+  const url = `${SHARD_DIR}/${file}?v=${hash}`;
+  let request = shardRequests.get(url);
+  if (!request) {
+    request = fetchJSON<{ trends: Record<string, SkaterTrends> }>(url).then(shard => shard.trends);
+    shardRequests.set(url, request);
+  }
+  return request;
+}
+
+async function loadSkaterTrends(skaterId: string): Promise<SkaterTrends | null> {
+  const index = await loadIndex();
+  if (index) {
+    const bucket = (fnv1a(skaterId) % index.buckets).toString(16).padStart(2, '0');
+    const entry = index.shards[bucket];
+    if (!entry) return null;
+    const trends = await loadShard(entry.file, entry.hash);
+    return trends[skaterId] ?? null;
+  }
+  // No shards built: fall back to the single trends file
+  fullRequest ??= fetchJSON<TimeTrendsData>('/data/skater_time_trends.json').catch(() => null);
+  const full = await fullRequest;
+  return full?.trends[skaterId] ?? null;
+}
+
+export function useSkaterTrends(skaterId: string | null) {
+  const [trends, setTrends] = useState<{ skaterId: string; trends: SkaterTrends | null } | null>(null);
+
+  useEffect(() => {
+    if (!skaterId) return;
+    let cancelled = false;
+    loadSkaterTrends(skaterId)
+      .catch(() => null)
+      .then(result => {
+        if (!cancelled) setTrends({ skaterId, trends: result });
+      });
+    return () => { cancelled = true; };
+  }, [skaterId]);
+
+  return trends && trends.skaterId === skaterId ? trends.trends : null;
+}
@@ -18,26 +18,10 @@ import {
 } from 'recharts';
 import type { Skater } from '../types/data';
 import { STYLE_LABELS, CATEGORY_LABELS } from '../types/data';
-
-interface TimeTrendEntry {
-  distance: number;
-  time: number;
-  time_str: string;
-  competition: string;
-  date: string | null;
-  place: number | null;
-  source: 'uss' | 'stl';
-}
-
-interface TimeTrendsData {
-  generated: string;
-  total_skaters: number;
-  trends: Record<string, Record<number, TimeTrendEntry[]>>;
-}
+import { useSkaterTrends } from '../hooks/useSkaterTrends';
 
 interface Props {
   skaters: Skater[];
-  timeTrends: TimeTrendsData | null;
 }
 
 function formatTime(seconds: number): string {
@@ -69,7 +53,7 @@ const CHART_COLORS = {
 
 const SAVED_SKATER_KEY = 'shorttrack_my_skater';
 
-export default function SkaterProfile({ skaters, timeTrends }: Props) {
+export default function SkaterProfile({ skaters }: Props) {
   const [searchQuery, setSearchQuery] = useState('');
   const [selectedSkater, setSelectedSkater] = useState<Skater | null>(null);
   const [isSaved, setIsSaved] = useState(false);
@@ -121,13 +105,10 @@ export default function SkaterProfile({ skaters, timeTrends }: Props) {
       .slice(0, 20);
   }, [skaters, searchQuery]);
 
-  // Get time trend data from pre-computed USS+STL merged data
+  // Get time trend data from pre-computed USS+STL merged data (just this skater's shard)
+  const skaterTrends = useSkaterTrends(selectedSkater?.id ?? null);
   const timeTrendData = useMemo(() => {
-    if (!selectedSkater || !timeTrends) return {};
-    
-    const skaterId = selectedSkater.id;
-    const skaterTrends = timeTrends.trends[skaterId];
-    if (!skaterTrends) return {};
+    if (!selectedSkater || !skaterTrends) return {};
     
     const byDistance: Record<number, { date: Date; time: number; competition: string; dateStr: string; source: string }[]> = {};
     
@@ -158,7 +139,7 @@ export default function SkaterProfile({ skaters, timeTrends }: Props) {
     }
     
     return byDistance;
-  }, [selectedSkater, timeTrends]);
+  }, [selectedSkater, skaterTrends]);
 
   // Overtake style data (from Progress page)
   const overtakeStyleData = useMemo(() => {